@@ -0,0 +1,153 @@
+"""
+Gemeinsame Auflösung des aktuellen Users (Bearer-Token UND Browser-Session).
+
+Der User-Lookup ist die häufigste Query der App. Deshalb liegt davor ein
+kleiner TTL/LRU-Cache (id -> User, email -> id). Ändert sich eine User-Zeile
+über das ORM, wird der Eintrag nach dem Commit verworfen; in anderen Worker-Prozessen
+begrenzt die TTL, wie lange ein veralteter Eintrag leben kann.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import Request
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app import metrics
+from app.config import settings
+from app.models.user import User
+
+USER_CACHE_LOOKUPS = metrics.counter("user_cache_lookups_total", "User cache lookups", ["key", "result"])
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Schlanke, sessionunabhängige Kopie der User-Zeile (nur was die Routen brauchen)."""
+    id: int
+    email: str
+    username: str
+
+    @classmethod
+    def from_orm(cls, user: User) -> "CachedUser":
+        return cls(id=user.id, email=user.email, username=user.username)
+
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._by_id = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._id_by_email = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get_by_id(self, user_id: int) -> Optional[CachedUser]:
+        with self._lock:
+            user = self._by_id.get(user_id)
+        USER_CACHE_LOOKUPS.inc(key="id", result="hit" if user else "miss")
+        return user
+
+    def get_by_email(self, email: str) -> Optional[CachedUser]:
+        with self._lock:
+            user_id = self._id_by_email.get(email)
+            user = self._by_id.get(user_id) if user_id is not None else None
+        USER_CACHE_LOOKUPS.inc(key="email", result="hit" if user else "miss")
+        return user
+
+    def put(self, user: CachedUser):
+        with self._lock:
+            self._by_id[user.id] = user
+            self._id_by_email[user.email] = user.id
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None):
+        with self._lock:
+            cached = self._by_id.pop(user_id, None) if user_id is not None else None
+            for key in {email, cached.email if cached else None} - {None}:
+                self._id_by_email.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._id_by_email.clear()
+
+
+user_cache = UserCache(maxsize=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds)
+
+
+# Beim Flush geänderte User (id, E-Mails) - verworfen wird erst nach dem Commit,
+# sonst könnte ein paralleler Request die alte Zeile sofort wieder cachen
+_STALE_USERS = "stale_users"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target):
+    # Alte E-Mail mit merken, falls sie sich gerade geändert hat
+    emails = {target.email, *(inspect(target).attrs.email.history.deleted or ())}
+    object_session(target).info.setdefault(_STALE_USERS, {}).setdefault(target.id, set()).update(emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id, emails in session.info.pop(_STALE_USERS, {}).items():
+        user_cache.invalidate(user_id=user_id)
+        for email in emails:
+            user_cache.invalidate(email=email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop(_STALE_USERS, None)
+
+
+# =================================================================
+# Auflösen: Bearer-Token (sync) und Browser-Session (async)
+# =================================================================
+
+def resolve_user_by_id(db: Session, user_id: int) -> Optional[CachedUser]:
+    user = user_cache.get_by_id(user_id)
+    if user is None:
+        db_user = db.get(User, user_id)
+        if db_user is None:
+            return None
+        user = CachedUser.from_orm(db_user)
+        user_cache.put(user)
+    return user
+
+
+async def get_session_user(request: Request, db: AsyncSession) -> Optional[CachedUser]:
+    """
+    Holt den lokalen User zur Auth0 Browser-Session.
+    Die lokale User-ID steht seit dem Login in der Session ('user_id'),
+    die E-Mail-Suche ist nur noch der Rückweg für ältere Sessions.
+    """
+    auth0_user = request.session.get('user')
+    if not auth0_user:
+        return None
+
+    user_id = request.session.get('user_id')
+    if user_id is not None:
+        user = user_cache.get_by_id(user_id)
+        if user is None:
+            db_user = await db.get(User, user_id)
+            if db_user is not None:
+                user = CachedUser.from_orm(db_user)
+                user_cache.put(user)
+        if user is not None:
+            return user
+
+    user_email = auth0_user.get('email')
+    if not user_email:
+        return None
+
+    user = user_cache.get_by_email(user_email)
+    if user is None:
+        result = await db.execute(select(User).where(User.email == user_email))
+        db_user = result.scalars().first()
+        if db_user is None:
+            return None
+        user = CachedUser.from_orm(db_user)
+        user_cache.put(user)
+
+    request.session['user_id'] = user.id
+    return user
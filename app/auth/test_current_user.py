@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.auth.current_user import CachedUser, UserCache, resolve_user_by_id, user_cache
+from app.models.base import Base
+from app.models.user import User
+
+
+def make_session() -> Session:
+    # Jede Test-DB fängt wieder bei id 1 an
+    user_cache.clear()
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return Session(engine)
+
+
+def make_user(db: Session, email: str = "a@b.de") -> User:
+    user = User(username="anna", email=email, hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_cache_lookup_by_id_and_email():
+    cache = UserCache(maxsize=10, ttl=60)
+    cache.put(CachedUser(id=1, email="a@b.de", username="anna"))
+    assert cache.get_by_id(1).username == "anna"
+    assert cache.get_by_email("a@b.de").id == 1
+
+    cache.invalidate(user_id=1)
+    assert cache.get_by_id(1) is None
+    assert cache.get_by_email("a@b.de") is None
+
+
+def test_changed_user_is_evicted_on_commit_not_on_flush():
+    db = make_session()
+    user = make_user(db)
+    assert resolve_user_by_id(db, user.id).username == "anna"
+
+    user.username = "anna2"
+    db.flush()
+    assert user_cache.get_by_id(user.id).username == "anna"
+
+    db.commit()
+    assert user_cache.get_by_id(user.id) is None
+    assert resolve_user_by_id(db, user.id).username == "anna2"
+
+
+def test_rollback_keeps_the_cached_user():
+    db = make_session()
+    user = make_user(db, "rollback@b.de")
+    resolve_user_by_id(db, user.id)
+
+    user.username = "egal"
+    db.flush()
+    db.rollback()
+    assert user_cache.get_by_id(user.id).username == "anna"
+
+
+def test_email_change_drops_old_email():
+    db = make_session()
+    user = make_user(db, "alt@b.de")
+    resolve_user_by_id(db, user.id)
+
+    user.email = "neu@b.de"
+    db.commit()
+    assert user_cache.get_by_email("alt@b.de") is None
+
+    db.delete(user)
+    db.commit()
+    assert user_cache.get_by_id(user.id) is None
@@ -0,0 +1,143 @@
+"""
+KI-Benchmark ohne Netzwerk: Durchsatz und Tail-Latenz der KI-Routen
+gegen den Offline-Provider (künstliche Latenz + Fehlerrate).
+
+    python -m app.bench_ai --concurrency 20 --requests 200 --latency-ms 800 --jitter-ms 400
+    python -m app.bench_ai --routes ai,projects_web --error-rate 0.1 --distinct-prompts 5
+
+Routen: ai (/ai/generate), tasks (/tasks/generate), tasks_web (/tasks/generate_web),
+projects_web (/projects/create_web, zusätzlich Laufzeit der Hintergrund-Jobs).
+--distinct-prompts 0 = jeder Request hat einen eigenen Prompt (kein Cache-Effekt).
+Ohne eigene .env läuft alles gegen eine temporäre SQLite-Datenbank.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.bench_common import setup_env, report, percentile
+
+ROUTES = ("ai", "tasks", "tasks_web", "projects_web")
+EMAIL = "bench-ai@example.com"
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import select
+
+    import main
+    from app.config import settings
+    from app.database import SessionLocal, async_engine
+    from app.models.ai_job import AIJob, JOB_DONE, JOB_FAILED
+    from app.models.project import Project
+    from app.models.user import User
+    from app.oauth2 import create_access_token
+    from app.sessions import create_session
+
+    async with main.app.router.lifespan_context(main.app):
+        with SessionLocal() as db:
+            user = db.query(User).filter(User.email == EMAIL).first()
+            if not user:
+                user = User(email=EMAIL, username="bench-ai", hashed_password="AUTH0_EXTERNAL_LOGIN")
+                db.add(user)
+                db.commit()
+            project = Project(title="Bench", owner_id=user.id)
+            db.add(project)
+            db.commit()
+            user_id, project_id = user.id, project.id
+
+        token = create_access_token(data={"sub": str(user_id)})
+        cookie = create_session(main.session_store, settings.app_secret_key,
+                                {"user": {"email": EMAIL}, "user_id": user_id}, settings.session_max_age_seconds)
+
+        def prompt(route: str, i: int) -> str:
+            # Pro Route eigene Prompts, sonst trifft die zweite Route den Cache der ersten
+            n = i % args.distinct_prompts if args.distinct_prompts else i
+            return f"Bench-Projekt {route} {n} planen"
+
+        def request_for(route: str, i: int):
+            text = prompt(route, i)
+            if route == "ai":
+                return "POST", "/ai/generate", {"json": {"text": text}}
+            if route == "tasks":
+                return "POST", "/tasks/generate", {"json": {"text": text, "project_id": project_id},
+                                                   "headers": {"Authorization": f"Bearer {token}"}}
+            if route == "tasks_web":
+                return "POST", "/tasks/generate_web", {"data": {"description": text}}
+            return "POST", "/projects/create_web", {"data": {"title": f"Bench {i}", "start_date": "2030-01-01",
+                                                             "ai_instructions": text}}
+
+        print(f"provider={settings.ai_provider} latency={settings.ai_offline_latency_ms}ms "
+              f"jitter={settings.ai_offline_jitter_ms}ms error_rate={settings.ai_offline_error_rate} "
+              f"max_concurrency={settings.ai_max_concurrency} timeout={settings.ai_timeout_seconds}s "
+              f"rate_limit={settings.ai_rate_limit_per_minute}/min "
+              f"concurrency={args.concurrency} requests={args.requests}")
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     cookies={"session": cookie}, timeout=None) as client:
+            for route in args.routes:
+                latencies, statuses = [], []
+                counter = iter(range(args.requests))
+
+                async def worker():
+                    for i in counter:
+                        method, url, kwargs = request_for(route, i)
+                        start = time.perf_counter()
+                        r = await client.request(method, url, **kwargs)
+                        latencies.append(time.perf_counter() - start)
+                        statuses.append(r.status_code)
+
+                started = time.perf_counter()
+                await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+                elapsed = time.perf_counter() - started
+                ok = (200, 201, 303)
+                report(route, latencies, statuses, ok_statuses=ok)
+                print(f"{'':<24} throughput={len(latencies) / elapsed:7.1f} req/s wall={elapsed:.2f}s "
+                      f"errors={sum(1 for s in statuses if s not in ok)}")
+
+                if route == "projects_web":
+                    # Warten, bis alle Hintergrund-Jobs durch sind
+                    while True:
+                        with SessionLocal() as db:
+                            jobs = db.execute(select(AIJob.status, AIJob.created_at, AIJob.finished_at)).all()
+                        if all(status in (JOB_DONE, JOB_FAILED) for status, _, _ in jobs):
+                            break
+                        await asyncio.sleep(0.2)
+                    durations = [(finished - created).total_seconds()
+                                 for status, created, finished in jobs if finished and created]
+                    done = sum(1 for status, _, _ in jobs if status == JOB_DONE)
+                    print(f"{'  jobs':<24} n={len(jobs):<5} done={done:<5} failed={len(jobs) - done:<4} "
+                          f"p50={percentile(durations, 50) * 1000:7.1f}ms "
+                          f"p95={percentile(durations, 95) * 1000:7.1f}ms "
+                          f"p99={percentile(durations, 99) * 1000:7.1f}ms "
+                          f"(queued -> finished, inkl. Retries)")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--routes", default=",".join(ROUTES),
+                        type=lambda value: [r for r in value.split(",") if r in ROUTES])
+    parser.add_argument("--distinct-prompts", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--jitter-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--rate-limit-per-minute", type=float, default=0.0, help="0 = kein Rate-Limit")
+    args = parser.parse_args()
+
+    # Kommandozeile schlägt .env/Umgebung; KI-Cache nur im Speicher (keine Treffer aus früheren Läufen)
+    for key, value in {"AI_OFFLINE_LATENCY_MS": args.latency_ms, "AI_OFFLINE_JITTER_MS": args.jitter_ms,
+                       "AI_OFFLINE_ERROR_RATE": args.error_rate}.items():
+        if value is not None:
+            os.environ[key] = str(value)
+    os.environ["AI_PROVIDER"] = "offline"
+    os.environ["AI_RATE_LIMIT_PER_MINUTE"] = str(args.rate_limit_per_minute)
+    setup_env("bench_ai_", AI_CACHE_PATH="", AI_JOB_RETRY_BACKOFF_SECONDS="0.1")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
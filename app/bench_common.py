@@ -0,0 +1,43 @@
+"""
+Gemeinsame Helfer für die Benchmarks (app/bench_*.py).
+
+setup_env() muss VOR dem ersten Import von app.config laufen.
+"""
+import os
+import statistics
+import tempfile
+
+
+def setup_env(prefix: str, **overrides):
+    """Setzt Defaults für alle Pflicht-Settings + temporäre SQLite-Datenbank (eigene .env gewinnt)."""
+    tmp_db = os.path.join(tempfile.mkdtemp(prefix=prefix), "bench.db")
+    defaults = {
+        "DATABASE_URL": f"sqlite:///{tmp_db}",
+        "JWT_SECRET_KEY": "bench-secret",
+        "AUTH0_DOMAIN": "example.invalid",
+        "AUTH0_CLIENT_ID": "bench",
+        "AUTH0_CLIENT_SECRET": "bench",
+        "APP_SECRET_KEY": "bench",
+        # Bench-Sessions nicht in sessions.sqlite3 im Arbeitsverzeichnis ablegen
+        "SESSION_BACKEND": "memory",
+    }
+    defaults.update(overrides)
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(name, latencies, statuses, ok_statuses=(200,)):
+    ok = sum(1 for s in statuses if s in ok_statuses)
+    print(f"{name:<24} n={len(latencies):<5} ok={ok:<5} busy(503)={statuses.count(503):<4} "
+          f"p50={percentile(latencies, 50) * 1000:7.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:7.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:7.1f}ms "
+          f"mean={statistics.mean(latencies) * 1000 if latencies else 0:7.1f}ms")
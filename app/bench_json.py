@@ -0,0 +1,99 @@
+"""
+JSON-Microbenchmark für große Tasklisten (GET /tasks/): Encode-Zeit und
+Bytes auf der Leitung, ohne Datenbank und ohne HTTP.
+
+    python -m app.bench_json --tasks 10000 --repeat 5
+    python -m app.bench_json --gzip-level 9 --brotli-quality 5
+
+Pfade:
+  pydantic+json   TaskOut pro Zeile, jsonable_encoder, json.dumps (alter Weg mit response_model)
+  dicts+json      dicts aus den Zeilen, jsonable_encoder, json.dumps (Standard-JSONResponse)
+  rows+orjson     dicts aus den Zeilen direkt an orjson (FastJSONResponse, heutiger Weg)
+Danach: Größe und Zeit für gzip/br (br nur mit installiertem Paket brotli).
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+
+def make_rows(count: int, seed: int = 42):
+    """Zeilen wie aus der Query in GET /tasks/ (Spalten in der Reihenfolge von TaskOut)."""
+    from app.schemas.task import TaskOut
+
+    fields = tuple(TaskOut.model_fields)
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, 8, 0, 0)
+    values = {
+        "title": lambda i: f"Aufgabe {i}: {rng.choice(('Angebot prüfen', 'Zeitplan erstellen', 'Material besorgen'))}",
+        "description": lambda i: rng.choice((None, "Kurze Beschreibung", "Etwas längere Beschreibung mit Details " * 3)),
+        "due_date": lambda i: rng.choice((None, start + timedelta(days=rng.randint(0, 90)))),
+        "completed": lambda i: rng.random() < 0.3,
+        "priority": lambda i: rng.choice(("Urgent", "Medium", "Easy")),
+        "category": lambda i: rng.choice(("Work", "Private", "Shopping", "General")),
+        "status": lambda i: rng.choice(("todo", "in_progress", "done")),
+        "is_locked": lambda i: rng.random() < 0.3,
+        "id": lambda i: i + 1,
+        "created_at": lambda i: start + timedelta(minutes=i, microseconds=rng.randint(0, 999999)),
+        "owner_id": lambda i: 1,
+        "project_id": lambda i: 1 + i // 500,
+    }
+    return fields, [tuple(values[f](i) for f in fields) for i in range(count)]
+
+
+def timed(fn, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def run(args):
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    from app.compression import _Compressor, brotli
+    from app.responses import FastJSONResponse
+    from app.schemas.task import TaskOut
+
+    fields, rows = make_rows(args.tasks)
+    paths = {
+        "pydantic+json": lambda: JSONResponse(jsonable_encoder(
+            [TaskOut.model_validate(dict(zip(fields, row))) for row in rows])).body,
+        "dicts+json": lambda: JSONResponse(jsonable_encoder([dict(zip(fields, row)) for row in rows])).body,
+        "rows+orjson": lambda: FastJSONResponse([dict(zip(fields, row)) for row in rows]).body,
+    }
+
+    print(f"tasks={args.tasks} repeat={args.repeat} (Median)")
+    bodies = {}
+    baseline = None
+    for name, fn in paths.items():
+        seconds, body = timed(fn, args.repeat)
+        bodies[name] = body
+        baseline = baseline or seconds
+        print(f"{name:<16} encode={seconds * 1000:8.1f}ms  x{baseline / seconds:5.1f}  bytes={len(body):>10,}")
+
+    body = bodies["rows+orjson"]
+    same = body == bodies["dicts+json"] == bodies["pydantic+json"]
+    print(f"Antworten byte-gleich: {'ja' if same else 'NEIN'}")
+    encodings = [("gzip", args.gzip_level)] + ([("br", args.brotli_quality)] if brotli is not None else [])
+    print(f"{'identity':<16} {'':>17}  bytes={len(body):>10,}")
+    for encoding, level in encodings:
+        seconds, compressed = timed(
+            lambda: _Compressor(encoding, gzip_level=level, brotli_quality=level).finish(body), args.repeat)
+        print(f"{encoding + f'({level})':<16} compress={seconds * 1000:6.1f}ms  "
+              f"bytes={len(compressed):>10,}  ({len(compressed) / len(body):.1%})")
+    if brotli is None:
+        print("br               übersprungen (pip install brotli)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    run(parser.parse_args())
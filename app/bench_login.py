@@ -0,0 +1,80 @@
+"""
+Login-Benchmark: viele gleichzeitige Logins + normale Requests daneben.
+
+Zeigt p50/p95/p99 für /auth/login und für einen billigen Request
+(/internal/pool), der während des Login-Ansturms nicht verhungern darf.
+
+    python -m app.bench_login --concurrency 50 --requests 400
+
+Ohne eigene .env läuft alles gegen eine temporäre SQLite-Datenbank.
+"""
+import argparse
+import asyncio
+import time
+
+from app.bench_common import setup_env, report
+
+setup_env("bench_login_")
+
+import httpx  # noqa: E402
+
+from app.database import init_db, SessionLocal, async_engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.security import password_hasher  # noqa: E402
+from app.config import settings  # noqa: E402
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+async def run(concurrency: int, total: int):
+    import main
+
+    init_db()
+    with SessionLocal() as db:
+        if not db.query(User).filter(User.email == EMAIL).first():
+            db.add(User(email=EMAIL, username="bench", hashed_password=password_hasher.hash(PASSWORD)))
+            db.commit()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_lat, login_status = [], []
+        other_lat, other_status = [], []
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        async def login_worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.post("/auth/login", data={"username": EMAIL, "password": PASSWORD})
+                login_lat.append(time.perf_counter() - start)
+                login_status.append(r.status_code)
+
+        async def other_worker():
+            while not queue.empty():
+                start = time.perf_counter()
+                r = await client.get("/internal/pool")
+                other_lat.append(time.perf_counter() - start)
+                other_status.append(r.status_code)
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[login_worker() for _ in range(concurrency)], other_worker())
+        elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+
+    print(f"scheme={settings.password_scheme} rounds={settings.password_hash_rounds} "
+          f"workers={settings.password_hash_workers} max_queue={settings.password_hash_max_queue} "
+          f"concurrency={concurrency} wall={elapsed:.2f}s")
+    report("POST /auth/login", login_lat, login_status)
+    report("GET /internal/pool", other_lat, other_status)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.requests))
@@ -0,0 +1,113 @@
+"""
+Startzeit-Check: wie lange braucht `import main` und der Start der App
+(Lifespan: DB-Init, Job-Worker) – und wer kostet dabei die Zeit?
+
+    python -m app.check_startup
+    python -m app.check_startup --import-budget-ms 1200 --startup-budget-ms 2000 --top 20
+
+Jede Messung läuft in einem frischen Python-Prozess (kein warmer Modul-Cache).
+Exit-Code 1, wenn ein Budget überschritten ist oder ein Modul aus LAZY_MODULES
+schon beim Start geladen wird (die sollen erst bei der ersten Nutzung kommen).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app.bench_common import setup_env
+
+# Schwere Abhängigkeiten, die erst bei Bedarf importiert werden
+# (Gemini-SDK in ai_providers, Authlib in oauth_config)
+LAZY_MODULES = ("google.generativeai", "grpc", "authlib")
+
+STARTUP_SCRIPT = """
+import asyncio, json, resource, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": sorted(sys.modules),
+}))
+"""
+
+
+def _run(args) -> subprocess.CompletedProcess:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.run([sys.executable, *args], cwd=root, capture_output=True, text=True, check=True)
+
+
+def import_profile() -> list:
+    """`python -X importtime -c "import main"` -> [(modul, eigene_ms, kumuliert_ms), ...]"""
+    result = _run(["-X", "importtime", "-c", "import main"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def startup_profile() -> dict:
+    """Import + Lifespan-Start in einem frischen Prozess (Sekunden, RSS, geladene Module)."""
+    result = _run(["-c", STARTUP_SCRIPT])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def eagerly_loaded(module_names) -> list:
+    """Welche LAZY_MODULES (oder deren Untermodule) schon geladen sind."""
+    return sorted({
+        lazy for lazy in LAZY_MODULES for name in module_names
+        if name == lazy or name.startswith(lazy + ".")
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--startup-budget-ms", type=float, default=2500.0, help="Import + Lifespan-Start")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    setup_env("check_startup_", AI_CACHE_PATH="")
+
+    rows = import_profile()
+    print(f"{'Modul':<60} {'eigen':>9} {'kumuliert':>11}")
+    for name, self_ms, cumulative_ms in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{name:<60} {self_ms:7.1f}ms {cumulative_ms:9.1f}ms")
+
+    startup = startup_profile()
+    import_ms = startup["import_s"] * 1000
+    total_ms = (startup["import_s"] + startup["startup_s"]) * 1000
+    print()
+    print(f"import main:  {import_ms:7.1f}ms (Budget {args.import_budget_ms:.0f}ms)")
+    print(f"bis bereit:   {total_ms:7.1f}ms (Budget {args.startup_budget_ms:.0f}ms)")
+    print(f"max RSS:      {startup['max_rss_kb'] / 1024:7.1f}MB, {len(startup['loaded'])} Module geladen")
+
+    problems = []
+    if import_ms > args.import_budget_ms:
+        problems.append(f"import main dauert {import_ms:.0f}ms > {args.import_budget_ms:.0f}ms")
+    if total_ms > args.startup_budget_ms:
+        problems.append(f"Start dauert {total_ms:.0f}ms > {args.startup_budget_ms:.0f}ms")
+    for lazy in eagerly_loaded(startup["loaded"]):
+        problems.append(f"{lazy} wird schon beim Start importiert (soll erst bei Bedarf laden)")
+
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("✅ Startzeit im Budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Komprimierung der Antworten (Brotli oder gzip, je nach Accept-Encoding).
+
+- Ausgehandelt über die q-Werte im Accept-Encoding; bei Gleichstand gewinnt br.
+  Brotli nur, wenn das Paket installiert ist (pip install brotli), sonst gzip.
+- Kleine Antworten (< minimum_size Bytes) bleiben unkomprimiert.
+- Übersprungen: Server-Sent Events (jeder Event muss sofort raus), Antworten
+  mit eigenem Content-Encoding, 204/304 und bereits komprimierte Formate.
+- Gestreamte Antworten (z.B. CSV-Export) werden stückweise komprimiert.
+- Ein starker ETag wird schwach (W/"..."), weil sich die Bytes ändern;
+  If-None-Match vergleicht schwach (app/services/version_stamps.py).
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:   # optional
+    brotli = None
+
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Beste unterstützte Kodierung laut Accept-Encoding (None = unkomprimiert)."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Stück komprimieren und sofort ausgeben (Streaming)."""
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self).send)
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: str, options: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.options = options
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _skip(self, headers: Headers) -> bool:
+        return (
+            self.start["status"] in (204, 304)
+            or "content-encoding" in headers
+            or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+        )
+
+    def _compressed_headers(self, streaming: bool, length: int = 0) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        if streaming:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Header erst abschicken, wenn der erste Body-Teil da ist
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if self.compressor is None:
+            headers = Headers(raw=self.start["headers"])
+            if self._skip(headers) or (not more_body and len(body) < self.options.minimum_size):
+                self.passthrough = True
+                if not self._skip(headers):
+                    # Gleiche URL könnte groß genug sein -> Caches müssen trotzdem nach Kodierung trennen
+                    MutableHeaders(raw=self.start["headers"]).add_vary_header("Accept-Encoding")
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.compressor = _Compressor(self.encoding, self.options.gzip_level, self.options.brotli_quality)
+            if not more_body:
+                compressed = self.compressor.finish(body)
+                self._compressed_headers(streaming=False, length=len(compressed))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            self._compressed_headers(streaming=True)
+            await self._send(self.start)
+
+        if more_body:
+            await self._send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self.compressor.finish(body)})
@@ -1,18 +1,107 @@
 #config file
 
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    # Optional: wird sonst aus database_url abgeleitet (asyncpg / aiosqlite)
+    async_database_url: str | None = None
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
-    gemini_api_key: str
+    # Nur für ai_provider="gemini" nötig
+    gemini_api_key: str | None = None
 
     auth0_domain: str
     auth0_client_id: str
     auth0_client_secret: str
     app_secret_key: str
 
+    # Connection-Pool (gilt für den Sync- und den Async-Engine)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0   # Sekunden Warten auf eine freie Verbindung
+    db_pool_recycle: int = 1800     # Verbindungen nach 30 Minuten erneuern
+    db_pool_pre_ping: bool = True   # Tote Verbindungen vor Benutzung erkennen
+
+    # Cache für den User-Lookup (Token- und Session-Auth)
+    user_cache_ttl_seconds: int = 300
+    user_cache_max_size: int = 10000
+
+    # Passwort-Hashing: Schema + Kosten, eigener begrenzter Thread-Pool
+    # (ändert man Schema/Kosten, werden alte Hashes beim nächsten Login umgestellt)
+    password_scheme: str = "bcrypt"
+    password_hash_rounds: int | None = 12
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+
+    # KI: Provider ("gemini" oder "offline" für Lasttests ohne Netzwerk),
+    # Modell, Zeitlimit pro Aufruf, gleichzeitige Aufrufe pro Worker
+    ai_provider: Literal["gemini", "offline"] = "gemini"
+    ai_model: str = "gemini-flash-latest"
+    ai_timeout_seconds: float = 30.0
+    ai_max_concurrency: int = 4
+    # So viele Projektbeschreibungen teilen sich höchstens einen Batch-Aufruf
+    ai_batch_max_items: int = 10
+
+    # Offline-Provider: künstliche Latenz (+/- Jitter), Fehlerrate 0..1, fester Seed
+    ai_offline_latency_ms: float = 800.0
+    ai_offline_jitter_ms: float = 400.0
+    ai_offline_error_rate: float = 0.0
+    ai_offline_seed: int = 42
+
+    # Cache für KI-Antworten (Speicher + SQLite-Datei; leerer Pfad = nur Speicher)
+    ai_cache_path: str = "ai_cache.sqlite3"
+    ai_cache_ttl_seconds: int = 7 * 24 * 3600
+    ai_cache_max_size: int = 1000
+
+    # Hintergrund-Jobs für die KI-Zerlegung (Worker pro Prozess, Versuche, Wartezeit vor Retry)
+    ai_job_workers: int = 2
+    ai_job_max_attempts: int = 3
+    ai_job_retry_backoff_seconds: float = 2.0
+
+    # Provider-Störungen: Circuit-Breaker (Fehler in Folge bis "open", Pause bis zur Probe)
+    # und Rate-Limit passend zur Quota (0 = aus; länger als max_wait warten -> sofort ablehnen)
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_recovery_seconds: float = 30.0
+    ai_breaker_half_open_probes: int = 1
+    ai_rate_limit_per_minute: float = 60.0
+    ai_rate_limit_burst: int = 10
+    ai_rate_limit_max_wait_seconds: float = 2.0
+    # Antwort, solange der Provider gesperrt ist: "fallback" (Platzhalter-Task)
+    # oder "offline" (deterministische Offline-Antwort); Cache-Treffer gehen immer vor
+    ai_degraded_mode: Literal["fallback", "offline"] = "fallback"
+
+    # Live-Updates fürs Board: "memory" (ein Worker-Prozess) oder "redis" (mehrere, braucht REDIS_URL);
+    # so viele Events pro Projekt kann ein Board nach einem Verbindungsabbruch nachholen
+    change_feed_backend: Literal["memory", "redis"] = "memory"
+    change_feed_replay_size: int = 200
+    redis_url: str | None = None
+
+    # Jinja2: kompilierte Templates im Speicher halten; auto_reload (mtime-Prüfung
+    # bei jedem Render) nur für die Entwicklung einschalten
+    templates_auto_reload: bool = False
+    templates_cache_size: int = 400
+
+    # Komprimierung der Antworten (br, falls das Paket brotli installiert ist, sonst gzip);
+    # kleinere Antworten gehen unkomprimiert raus
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Sessions serverseitig (im Cookie nur die signierte ID): "sqlite" (Standard),
+    # "redis" (mehrere Hosts, braucht REDIS_URL) oder "memory" (ein Prozess);
+    # Cache im Prozess davor - mit mehreren Workern sieht ein anderer Worker
+    # Änderungen (z.B. Logout) erst nach session_cache_ttl_seconds, daher kurz
+    session_backend: Literal["memory", "sqlite", "redis"] = "sqlite"
+    session_store_path: str = "sessions.sqlite3"
+    session_max_age_seconds: int = 14 * 24 * 3600
+    session_cache_size: int = 10000
+    session_cache_ttl_seconds: float = 5.0
+
+    # Schutz für /internal/* (leer = nur direkt von localhost erreichbar)
+    internal_api_token: str | None = None
+
     class Config:
         env_file = ".env"
 
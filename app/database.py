@@ -1,14 +1,156 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
 from app.models.base import Base
+from app.migrations import run_migrations
+from app import metrics
+from app.services import version_stamps  # noqa: F401 - registriert die Session-Listener für die ETags
 from fastapi import Depends
 
-engine = create_engine(settings.database_url)
+# Async-Treiber passend zum synchronen Treiber aus der DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def build_async_url(database_url: str) -> str:
+    """
+    Leitet aus der synchronen DATABASE_URL die URL für den Async-Engine ab
+    (z.B. postgresql://... -> postgresql+asyncpg://...).
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Kein Async-Treiber für '{backend}' bekannt - bitte ASYNC_DATABASE_URL setzen.")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# =================================================================
+# Pool-Statistiken (werden unter /internal/pool und /internal/metrics gezeigt)
+# =================================================================
+
+POOL_CHECKOUTS = metrics.counter("db_pool_checkouts_total", "Connections checked out of the pool", ["engine"])
+POOL_CHECKINS = metrics.counter("db_pool_checkins_total", "Connections returned to the pool", ["engine"])
+POOL_CONNECTS = metrics.counter("db_pool_connects_total", "New DBAPI connections opened", ["engine"])
+POOL_INVALIDATIONS = metrics.counter("db_pool_invalidations_total", "Connections invalidated", ["engine"])
+POOL_TIMEOUTS = metrics.counter("db_pool_timeouts_total", "Checkouts that hit pool_timeout", ["engine"])
+POOL_WAIT_SECONDS = metrics.counter("db_pool_wait_seconds_total", "Total time spent waiting for a connection", ["engine"])
+POOL_CHECKOUT_SECONDS = metrics.histogram("db_pool_checkout_seconds", "Latency of a pool checkout", ["engine"])
+
+
+class _TimedCheckoutMixin:
+    """Misst, wie lange ein Checkout auf eine freie Verbindung warten muss."""
+    stats_label = "sync"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.stats_label)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            POOL_WAIT_SECONDS.inc(elapsed, engine=self.stats_label)
+            POOL_CHECKOUT_SECONDS.observe(elapsed, engine=self.stats_label)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    stats_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    stats_label = "async"
+
+
+def pool_options(database_url: str, poolclass) -> dict:
+    """Pool-Einstellungen aus den Settings (In-Memory-SQLite hat keinen QueuePool)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_engine(sync_engine, label: str):
+    """Hängt die Pool-Events an (gilt auch für den Pool nach engine.dispose())."""
+    event.listen(sync_engine, "checkout", lambda *args: POOL_CHECKOUTS.inc(engine=label))
+    event.listen(sync_engine, "checkin", lambda *args: POOL_CHECKINS.inc(engine=label))
+    event.listen(sync_engine, "connect", lambda *args: POOL_CONNECTS.inc(engine=label))
+    event.listen(sync_engine, "invalidate", lambda *args: POOL_INVALIDATIONS.inc(engine=label))
+
+
+# Synchron: für die normalen "def"-Routen (laufen im Threadpool)
+engine = create_engine(settings.database_url, **pool_options(settings.database_url, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asynchron: für die "async def"-Routen, damit Queries den Event-Loop nicht blockieren
+_async_url = settings.async_database_url or build_async_url(settings.database_url)
+async_engine = create_async_engine(_async_url, **pool_options(_async_url, InstrumentedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+ENGINES = {"sync": engine, "async": async_engine.sync_engine}
+for _label, _engine in ENGINES.items():
+    instrument_engine(_engine, _label)
+
+
+def _pool_gauge(method_name: str):
+    def read():
+        values = {}
+        for label, eng in ENGINES.items():
+            method = getattr(eng.pool, method_name, None)
+            if callable(method):
+                values[(label,)] = method()
+        return values
+    return read
+
+
+metrics.gauge("db_pool_size", "Configured pool size", ["engine"], callback=_pool_gauge("size"))
+metrics.gauge("db_pool_checked_out", "Connections currently checked out", ["engine"], callback=_pool_gauge("checkedout"))
+metrics.gauge("db_pool_checked_in", "Idle connections in the pool", ["engine"], callback=_pool_gauge("checkedin"))
+metrics.gauge("db_pool_overflow", "Current overflow connections", ["engine"], callback=_pool_gauge("overflow"))
+
+
+def pool_status() -> dict:
+    """Live-Status beider Pools für /internal/pool."""
+    histograms = POOL_CHECKOUT_SECONDS.snapshot()
+    result = {}
+    for label, eng in ENGINES.items():
+        pool = eng.pool
+        info = {"pool_class": type(pool).__name__, "status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                info[name] = method()
+        info.update({
+            "checkouts_total": POOL_CHECKOUTS.value(engine=label),
+            "checkins_total": POOL_CHECKINS.value(engine=label),
+            "connects_total": POOL_CONNECTS.value(engine=label),
+            "invalidations_total": POOL_INVALIDATIONS.value(engine=label),
+            "timeouts_total": POOL_TIMEOUTS.value(engine=label),
+            "wait_seconds_total": POOL_WAIT_SECONDS.value(engine=label),
+            "checkout_latency": histograms.get(label, {}),
+        })
+        result[label] = info
+    return result
+
+
 def init_db():
+    # Neue Tabellen anlegen, danach bestehende per Migration nachziehen
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +158,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
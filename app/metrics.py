@@ -0,0 +1,184 @@
+"""
+Minimal in-process metrics (Counter, Gauge, Histogram).
+Alle Metriken landen in REGISTRY und werden unter /internal/metrics
+im Prometheus-Textformat ausgegeben.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Standard-Buckets in Sekunden (1ms bis 30s)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+        return "{" + inner + "}"
+
+    def samples(self):
+        raise NotImplementedError
+
+    def snapshot(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler (z.B. Anzahl Checkouts)."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name + self._format_labels(key), value
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(key) or "_": value for key, value in self._values.items()}
+
+
+class Gauge(_Metric):
+    """
+    Momentaufnahme. Entweder per set() gesetzt oder über eine Callback-Funktion
+    beim Auslesen berechnet (z.B. aktuell ausgecheckte Verbindungen).
+    """
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable[[], Dict[LabelKey, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _current(self) -> Dict[LabelKey, float]:
+        if self._callback is not None:
+            return dict(self._callback())
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self):
+        for key, value in self._current().items():
+            yield self.name + self._format_labels(key), value
+
+    def snapshot(self):
+        return {",".join(key) or "_": value for key, value in self._current().items()}
+
+
+class Histogram(_Metric):
+    """Verteilung mit festen Buckets (kumulativ wie bei Prometheus)."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # pro Label-Kombination: [counts pro Bucket..., +Inf], sum, count
+        self._data: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                data = self._data[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            data[0][index] += 1
+            data[1] += value
+            data[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(d[0]), d[1], d[2]) for key, d in self._data.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield self.name + "_bucket" + self._format_labels(key, {"le": le}), cumulative
+            yield self.name + "_sum" + self._format_labels(key), total
+            yield self.name + "_count" + self._format_labels(key), count
+
+    def snapshot(self):
+        with self._lock:
+            items = [(key, list(d[0]), d[1], d[2]) for key, d in self._data.items()]
+        result = {}
+        for key, counts, total, count in items:
+            labels = [repr(b) for b in self.buckets] + ["+Inf"]
+            result[",".join(key) or "_"] = {
+                "count": count,
+                "sum": total,
+                "buckets": dict(zip(labels, counts)),
+            }
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Beim Neuladen eines Moduls nicht doppelt registrieren
+            return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, value in metric.samples():
+                lines.append(f"{sample_name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=(), callback=None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, callback))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
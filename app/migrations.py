@@ -0,0 +1,113 @@
+"""
+Versionierte Schema-Migrationen.
+
+create_all() legt nur fehlende Tabellen an, ändert aber bestehende nie.
+Alles, was an einer bestehenden Datenbank nachgezogen werden muss
+(neue Indizes, neue Spalten), kommt deshalb als nummerierte Migration hierher.
+Welche Versionen schon gelaufen sind, steht in der Tabelle "schema_migrations".
+
+Ausführen: läuft automatisch in init_db(), manuell mit
+    python -m app.migrations
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Eigene MetaData, damit die Verwaltungstabelle nicht bei den Models auftaucht
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Beliebige, aber feste Nummer für pg_advisory_xact_lock (mehrere Worker starten gleichzeitig)
+_PG_LOCK_ID = 7_310_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _execute_all(*statements: str) -> Callable[[Connection], None]:
+    def upgrade(conn: Connection):
+        for statement in statements:
+            conn.execute(text(statement))
+    return upgrade
+
+
+def _add_column(table: str, column: str, ddl_type: str) -> Callable[[Connection], None]:
+    # ADD COLUMN IF NOT EXISTS kann SQLite nicht; bei neuen Datenbanken legt create_all() die Spalte schon an
+    def upgrade(conn: Connection):
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    return upgrade
+
+
+# Reihenfolge = Versionsnummer. Bestehende Einträge nie mehr ändern, nur neue anhängen!
+# Hinweis: Auf sehr großen Tabellen den Index vorher per CREATE INDEX CONCURRENTLY
+# anlegen - IF NOT EXISTS überspringt ihn dann hier.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Composite indexes for hot task/project queries",
+        _execute_all(
+            "CREATE INDEX IF NOT EXISTS ix_tasks_owner_id_created_at ON tasks (owner_id, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_project_id_status ON tasks (project_id, status, id)",
+            "CREATE INDEX IF NOT EXISTS ix_projects_owner_id_start_date ON projects (owner_id, start_date)",
+        ),
+    ),
+    Migration(
+        2,
+        "Heartbeat column for running AI jobs",
+        _add_column("ai_jobs", "heartbeat_at", "TIMESTAMP"),
+    ),
+]
+
+
+def applied_versions(conn: Connection) -> set:
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Spielt alle noch fehlenden Migrationen in einer Transaktion ein.
+    Gibt die neu angewendeten Versionen zurück.
+    """
+    applied_now = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PG_LOCK_ID})
+        _meta.create_all(bind=conn)
+
+        done = applied_versions(conn)
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            if migration.version in done:
+                continue
+            print(f"🛠️ Migration {migration.version}: {migration.description}")
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.now(timezone.utc),
+            ))
+            applied_now.append(migration.version)
+    return applied_now
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    new_versions = run_migrations(engine)
+    if new_versions:
+        print(f"✅ Angewendet: {new_versions}")
+    else:
+        print("✅ Schema ist aktuell.")
@@ -2,4 +2,5 @@ from .base import Base
 from .user import User
 from .task import Task
 from .project import Project
-
+from .ai_job import AIJob
+from .version_stamp import VersionStamp
@@ -0,0 +1,51 @@
+"""
+AI Job Database Model.
+Ein Hintergrund-Auftrag an die KI (z.B. Projekt in Tasks zerlegen).
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class AIJob(Base):
+    """
+    Status, Fortschritt (0-100) und Versuche eines KI-Jobs.
+    Die Queue selbst lebt im Prozess, die DB-Zeile ist der dauerhafte Zustand.
+    """
+    # pylint: disable=too-few-public-methods
+
+    __tablename__ = "ai_jobs"
+    __table_args__ = (
+        # Board: neuester Job eines Projekts
+        Index("ix_ai_jobs_project_id_id", "project_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, default="decompose")
+    status = Column(String, nullable=False, default=JOB_QUEUED, index=True)
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(Text, nullable=True)
+
+    # Eingabe für die KI und Cache-Verhalten des auslösenden Requests
+    prompt = Column(Text, nullable=False)
+    cache_mode = Column(String, nullable=False, default="default")
+    tasks_created = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    # Lebenszeichen des Workers, der den Job gerade bearbeitet (nur bei "running")
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+
+    project = relationship("app.models.project.Project", back_populates="ai_jobs")
@@ -1,11 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Kalender: Projekte eines Users in einem Datumsbereich
+        Index("ix_projects_owner_id_start_date", "owner_id", "start_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
@@ -19,4 +23,5 @@ class Project(Base):
 
     # Beziehungen
     owner = relationship("app.models.user.User", back_populates="projects")
-    tasks = relationship("app.models.task.Task", back_populates="project", cascade="all, delete")
\ No newline at end of file
+    tasks = relationship("app.models.task.Task", back_populates="project", cascade="all, delete")
+    ai_jobs = relationship("app.models.ai_job.AIJob", back_populates="project", cascade="all, delete")
\ No newline at end of file
@@ -2,7 +2,7 @@
 Task Database Model.
 Represents a single unit of work in the system.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.models.base import Base
@@ -15,6 +15,12 @@ class Task(Base):
     # pylint: disable=too-few-public-methods
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # "Meine Tasks" (GET /tasks/): owner_id filtern, nach created_at/id blättern
+        Index("ix_tasks_owner_id_created_at", "owner_id", "created_at", "id"),
+        # Kanban-Board: project_id + status, innerhalb der Spalte nach id sortiert
+        Index("ix_tasks_project_id_status", "project_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
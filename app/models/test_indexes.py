@@ -0,0 +1,90 @@
+# Query-Plan-Check: Die heißen Queries müssen ihre Indizes benutzen.
+# Läuft gegen SQLite im Arbeitsspeicher (EXPLAIN QUERY PLAN).
+
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, inspect, select, text, tuple_
+
+from app.migrations import MIGRATIONS, run_migrations
+from app.models.base import Base
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+
+def make_engine():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def assert_uses_index(engine, statement, index_name):
+    plan = query_plan(engine, statement)
+    assert index_name in plan, f"Query nutzt {index_name} nicht mehr: {plan}"
+
+
+def test_my_tasks_uses_owner_index():
+    engine = make_engine()
+    stmt = (
+        select(Task)
+        .where(Task.owner_id == 1)
+        .where(tuple_(Task.created_at, Task.id) > (datetime(2026, 1, 1), 10))
+        .order_by(Task.created_at, Task.id)
+        .limit(50)
+    )
+    assert_uses_index(engine, stmt, "ix_tasks_owner_id_created_at")
+    # Kein extra Sortierschritt: der Index liefert die Reihenfolge schon
+    assert "TEMP B-TREE" not in query_plan(engine, stmt)
+
+
+def test_board_uses_project_status_index():
+    engine = make_engine()
+    counts = select(Task.status, func.count()).where(Task.project_id == 1).group_by(Task.status)
+    assert_uses_index(engine, counts, "ix_tasks_project_id_status")
+
+    column = (
+        select(Task)
+        .where(Task.project_id == 1, Task.status == "todo")
+        .order_by(Task.id)
+        .limit(50)
+    )
+    assert_uses_index(engine, column, "ix_tasks_project_id_status")
+
+
+def test_calendar_uses_project_owner_date_index():
+    engine = make_engine()
+    stmt = select(Project.id, Project.title, Project.start_date).where(
+        Project.owner_id == 1,
+        Project.start_date >= datetime(2026, 10, 1),
+        Project.start_date < datetime(2026, 11, 1),
+    )
+    assert_uses_index(engine, stmt, "ix_projects_owner_id_start_date")
+
+
+def test_user_lookup_by_email_uses_index():
+    engine = make_engine()
+    stmt = select(User).where(User.email == "test@example.com")
+    assert_uses_index(engine, stmt, "ix_users_email")
+
+
+def test_migrations_add_indexes_to_existing_database():
+    engine = make_engine()
+    # Alte Datenbank simulieren: Tabellen ohne die neuen Indizes
+    with engine.begin() as conn:
+        for name in ("ix_tasks_owner_id_created_at", "ix_tasks_project_id_status", "ix_projects_owner_id_start_date"):
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    assert run_migrations(engine) == []  # zweiter Lauf macht nichts
+
+    task_indexes = {ix["name"] for ix in inspect(engine).get_indexes("tasks")}
+    assert {"ix_tasks_owner_id_created_at", "ix_tasks_project_id_status"} <= task_indexes
+    project_indexes = {ix["name"] for ix in inspect(engine).get_indexes("projects")}
+    assert "ix_projects_owner_id_start_date" in project_indexes
@@ -0,0 +1,23 @@
+"""
+Version Stamp Database Model.
+Zähler pro "Sicht" (Board, Kalender, Taskliste), der bei jedem Schreibzugriff
+hochgezählt wird - Grundlage für ETag/Last-Modified (app/services/version_stamps.py).
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.base import Base
+
+
+class VersionStamp(Base):
+    """
+    scope z.B. "board:7", "calendar:3", "tasks:3"; updated_at in UTC (naiv).
+    """
+    # pylint: disable=too-few-public-methods
+
+    __tablename__ = "version_stamps"
+
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<VersionStamp(scope='{self.scope}', version={self.version})>"
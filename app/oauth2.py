@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.user import User
+from app.auth.current_user import resolve_user_by_id
 from app.config import settings
 
 # Das sagt FastAPI, wo der Login-Endpunkt ist (für die Docs)
@@ -35,8 +35,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
-    # 3. User aus der Datenbank laden
-    user = db.query(User).filter(User.id == user_id).first()
+    # 3. User laden (aus dem Cache, sonst aus der Datenbank)
+    try:
+        user = resolve_user_by_id(db, int(user_id))
+    except ValueError:
+        raise credentials_exception
     if user is None:
         raise credentials_exception
     return user
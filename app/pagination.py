@@ -0,0 +1,26 @@
+"""
+Cursor für Keyset-Pagination.
+
+Der Cursor ist die Sortier-Position des letzten gelieferten Eintrags
+(created_at, id), URL-sicher base64-kodiert. Der Client reicht ihn
+unverändert als ?cursor=... zurück.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Wirft ValueError, wenn der Cursor kaputt oder manipuliert ist."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,20 @@
+"""
+Schneller JSON-Encoder für die API (orjson statt json.dumps).
+
+FastJSONResponse ist die Standard-Response-Klasse der App. Routen mit großen
+Listen (GET /tasks/) geben sie direkt zurück: die Zeilen gehen als einfache
+dicts an orjson, ohne Pydantic-Modell und ohne jsonable_encoder.
+orjson schreibt datetime/date/UUID selbst (ISO 8601, wie jsonable_encoder)
+und erlaubt int-Keys (z.B. Kalendertage).
+"""
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
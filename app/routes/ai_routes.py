@@ -1,5 +1,6 @@
-from fastapi import APIRouter
-from app.services.ai_services import analyze_task_with_ai
+from fastapi import APIRouter, Request
+from app.services.ai_services import suggest_task_with_ai
+from app.services.ai_cache import cache_mode_from_headers
 from schemas import TaskGenerateRequest, TaskGenerateResponse
 
 router = APIRouter(
@@ -8,10 +9,11 @@ router = APIRouter(
 )
 
 @router.post("/generate", response_model=TaskGenerateResponse)
-def generate_task_suggestion(request: TaskGenerateRequest):
+def generate_task_suggestion(request: TaskGenerateRequest, http_request: Request):
     """
     Nimmt einen Text, sendet ihn an Gemini und liefert einen strukturierten Task-Vorschlag.
+    Cache-Control: no-cache fragt Gemini neu, no-store umgeht den Cache ganz.
     """
-    # Hier rufen wir deinen Service auf
-    ai_result = analyze_task_with_ai(request.text)
+    # Sync-Route -> läuft im Threadpool, blockiert den Event-Loop nicht
+    ai_result = suggest_task_with_ai(request.text, cache_mode=cache_mode_from_headers(http_request.headers))
     return ai_result
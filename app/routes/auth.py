@@ -1,27 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.user import User
-from app.utils import verify_password
+from app.database import get_async_db
+from app.routes.user_routes import authenticate
 from app.oauth2 import create_access_token
 
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/auth/login")
-def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    # 1. User suchen
-    user = db.query(User).filter(User.email == user_credentials.username).first()
+async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    # 1. + 2. User suchen und Passwort prüfen (gleicher Weg wie user_routes.login)
+    user, _error = await authenticate(db, user_credentials.username, user_credentials.password)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials")
 
-    # 2. Passwort prüfen
-    if not verify_password(user_credentials.password, user.hashed_password):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid Credentials")
-
     # 3. Token erstellen
     access_token = create_access_token(data={"sub": str(user.id)})
 
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.responses import StreamingResponse
+
+from app.database import get_db, SessionLocal
+from app.models.project import Project
+from app.models.task import Task
+from app.oauth2 import get_current_user
+from app.auth.current_user import CachedUser
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# So viele Zeilen holt der Server-Side-Cursor pro Runde aus der DB
+EXPORT_BATCH_SIZE = 1000
+
+TASK_EXPORT_COLUMNS = [
+    Task.id, Task.title, Task.description, Task.status, Task.is_locked, Task.completed,
+    Task.priority, Task.category, Task.due_date, Task.created_at, Task.owner_id, Task.project_id,
+]
+PROJECT_EXPORT_COLUMNS = [
+    Project.id, Project.title, Project.description, Project.start_date, Project.owner_id,
+]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _iter_batches(statement) -> Iterator[list]:
+    """
+    Liest die Zeilen in Blöcken über einen Server-Side-Cursor (yield_per).
+    Eigene Session, weil der Stream länger lebt als die Request-Dependency.
+    """
+    with SessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield partition
+
+
+def _encode_ndjson(batches: Iterable[list], names: List[str]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+def _encode_csv(batches: Iterable[list], names: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in batches:
+        writer.writerows(
+            [v.isoformat() if isinstance(v, (datetime, date)) else v for v in row] for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Komprimiert on-the-fly (wbits=31 -> gzip-Format)."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(statement, columns, export_format: str, compress: Optional[str], filename: str):
+    names = [column.key for column in columns]
+    encoder = _encode_ndjson if export_format == "ndjson" else _encode_csv
+    body = encoder(_iter_batches(statement), names)
+
+    filename = f"{filename}.{export_format}"
+    media_type = MEDIA_TYPES[export_format]
+    if compress == "gzip":
+        body = _gzip(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/tasks")
+def export_tasks(
+        export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        project_id: Optional[int] = None,
+        compress: Optional[Literal["gzip"]] = None,
+        db: Session = Depends(get_db),
+        current_user: CachedUser = Depends(get_current_user)
+):
+    """
+    Alle Tasks des Users (oder eines seiner Projekte) als NDJSON/CSV-Stream.
+    Der Speicherbedarf bleibt konstant, egal wie viele Zeilen es sind.
+    """
+    statement = select(*TASK_EXPORT_COLUMNS).order_by(Task.id)
+    filename = f"tasks-{date.today().isoformat()}"
+
+    if project_id is not None:
+        project = db.get(Project, project_id)
+        if not project or project.owner_id != current_user.id:
+            raise HTTPException(status_code=404, detail="Project not found")
+        statement = statement.where(Task.project_id == project_id)
+        filename = f"project-{project_id}-tasks-{date.today().isoformat()}"
+    else:
+        statement = statement.where(Task.owner_id == current_user.id)
+
+    return stream_export(statement, TASK_EXPORT_COLUMNS, export_format, compress, filename)
+
+
+@router.get("/projects")
+def export_projects(
+        export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        compress: Optional[Literal["gzip"]] = None,
+        current_user: CachedUser = Depends(get_current_user)
+):
+    """Alle Projekte des Users als NDJSON/CSV-Stream."""
+    statement = (
+        select(*PROJECT_EXPORT_COLUMNS)
+        .where(Project.owner_id == current_user.id)
+        .order_by(Project.id)
+    )
+    filename = f"projects-{date.today().isoformat()}"
+    return stream_export(statement, PROJECT_EXPORT_COLUMNS, export_format, compress, filename)
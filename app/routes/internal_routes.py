@@ -0,0 +1,87 @@
+import secrets
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from starlette.responses import PlainTextResponse
+
+from app import database
+from app.config import settings
+from app.metrics import REGISTRY
+from app.services.ai_cache import ai_cache
+from app.services.ai_services import ai_breaker, ai_cache_key, ai_rate_limiter
+from app.services.ai_telemetry import RECENT_CALLS_MAX, recent_calls
+
+
+LOOPBACK_HOSTS = ("127.0.0.1", "::1")
+FORWARDED_HEADERS = ("x-forwarded-for", "forwarded", "x-real-ip")
+
+
+def is_local_request(request: Request) -> bool:
+    """Direkt von localhost (nicht über einen Proxy weitergereicht)."""
+    if request.client is None or request.client.host not in LOOPBACK_HOSTS:
+        return False
+    return not any(name in request.headers for name in FORWARDED_HEADERS)
+
+
+def require_internal_token(request: Request, x_internal_token: str | None = Header(None)):
+    """
+    Mit INTERNAL_API_TOKEN muss er als X-Internal-Token mitkommen.
+    Ohne Token sind /internal/* nur direkt von localhost erreichbar.
+    """
+    expected = settings.internal_api_token
+    if expected:
+        allowed = bool(x_internal_token) and secrets.compare_digest(x_internal_token, expected)
+    else:
+        allowed = is_local_request(request)
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/pool")
+def get_pool_stats():
+    """Live-Zustand der DB-Connection-Pools (ausgecheckt, Overflow, Wartezeiten)."""
+    return database.pool_status()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Alle Metriken im Prometheus-Textformat."""
+    return REGISTRY.render_prometheus()
+
+
+@router.get("/ai-cache")
+def get_ai_cache_stats():
+    """Größe und Trefferquote des KI-Caches."""
+    return ai_cache.stats()
+
+
+@router.delete("/ai-cache")
+def purge_ai_cache(kind: Optional[Literal["decompose", "suggest"]] = None, text: Optional[str] = None):
+    """
+    Leert den KI-Cache: alles, nur eine Art (?kind=) oder
+    die Einträge zu einem Prompt-Text (?text=, optional mit ?kind=).
+    """
+    if text is not None:
+        kinds = [kind] if kind else ["decompose", "suggest"]
+        removed = sum(ai_cache.purge(key=ai_cache_key(k, text)) for k in kinds)
+    else:
+        removed = ai_cache.purge(kind=kind)
+    return {"removed": removed}
+
+
+@router.get("/ai-resilience")
+def get_ai_resilience():
+    """Zustand von Circuit-Breaker und Rate-Limit vor dem KI-Provider."""
+    return {"breaker": ai_breaker.stats(), "rate_limit": ai_rate_limiter.stats()}
+
+
+@router.get("/ai-calls")
+def get_recent_ai_calls(limit: int = Query(50, ge=1, le=RECENT_CALLS_MAX)):
+    """Die letzten KI-Aufrufe mit Trace-ID, Dauer, Ausgang und Tokens (neueste zuerst)."""
+    return recent_calls(limit)
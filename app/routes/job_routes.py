@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse, RedirectResponse
+
+from app.database import get_async_db
+from app.models.ai_job import AIJob, JOB_FAILED, JOB_QUEUED
+from app.schemas.ai_job import AIJobOut
+from app.auth.current_user import get_session_user
+from app.services.ai_jobs import ai_job_runner
+from app.services.board_feed import publish_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+async def get_own_job(request: Request, job_id: int, db: AsyncSession) -> AIJob:
+    user = await get_session_user(request, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    job = await db.get(AIJob, job_id)
+    if not job or job.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=AIJobOut)
+async def get_job_status(request: Request, job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Status und Fortschritt eines KI-Jobs (das Board pollt hier)."""
+    return await get_own_job(request, job_id, db)
+
+
+@router.post("/{job_id}/retry")
+async def retry_job(request: Request, job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Fehlgeschlagenen Job mit frischen Versuchen erneut einreihen."""
+    job = await get_own_job(request, job_id, db)
+    if job.status != JOB_FAILED:
+        return JSONResponse({"error": f"Job is {job.status}"}, status_code=409)
+
+    job.status = JOB_QUEUED
+    job.attempts = 0
+    job.progress = 0
+    job.error = None
+    job.finished_at = None
+    await db.commit()
+    publish_job(job)
+    ai_job_runner.enqueue(job.id)
+    return RedirectResponse(url=f"/projects/{job.project_id}/board", status_code=303)
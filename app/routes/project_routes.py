@@ -1,16 +1,70 @@
+import json
 from datetime import datetime
-from fastapi import APIRouter, Depends, Form, Request, HTTPException
-from starlette.responses import RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, Form, Request, HTTPException, status
+from starlette.responses import RedirectResponse, JSONResponse, StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.database import get_async_db
+from app.templating import render_fragment, templates, template_fingerprint, wants_fragment
 from app.models.project import Project
 from app.models.task import Task
-from app.models.user import User
-from app.services.ai_services import analyze_task_with_ai
+from app.auth.current_user import CachedUser, get_session_user
+from app.oauth2 import get_current_user
+from app.schemas.project import ProjectBulkCreate, ProjectBulkResult, ProjectBulkResultItem
+from app.models.ai_job import AIJob
+from app.config import settings
+from app.services.ai_cache import cache_mode_from_headers
+from app.services.ai_jobs import ai_job_runner
+from app.services.board_feed import project_channel, publish_project_deleted, publish_task
+from app.services.change_feed import change_feed
+from app.services.version_stamps import board_scope, is_not_modified, load_stamp_async, not_modified, validators
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+# Kanban: Spalten, Seitengröße und welche Spalten erst auf Klick geladen werden
+BOARD_COLUMNS = ("todo", "in_progress", "done")
+BOARD_PAGE_SIZE = 50
+BOARD_COLLAPSED_COLUMNS = {"done"}
+
+# POST /projects/bulk: maximale Anzahl Projekte pro Request
+PROJECT_BULK_MAX_ITEMS = 200
+
+# Live-Updates: so lange wartet ein Feed-Read, dann kommt ein Keep-Alive-Kommentar
+SSE_HEARTBEAT_SECONDS = 15
+
+
+async def count_tasks_by_status(db: AsyncSession, project_id: int) -> dict:
+    """Eine gruppierte Query liefert die Anzahl Tasks pro Spalte."""
+    result = await db.execute(
+        select(Task.status, func.count())
+        .where(Task.project_id == project_id)
+        .group_by(Task.status)
+    )
+    counts = dict.fromkeys(BOARD_COLUMNS, 0)
+    counts.update({task_status: count for task_status, count in result})
+    return counts
+
+
+async def load_column_page(db: AsyncSession, project_id: int, task_status: str, after_id: int = 0,
+                           limit: int = BOARD_PAGE_SIZE):
+    """
+    Eine Seite einer Spalte (Keyset über die id, Index ix_tasks_project_id_status).
+    Gibt die Tasks und die URL der nächsten Seite (oder None) zurück.
+    """
+    result = await db.execute(
+        select(Task)
+        .where(Task.project_id == project_id, Task.status == task_status, Task.id > after_id)
+        .order_by(Task.id)
+        .limit(limit + 1)
+    )
+    tasks = list(result.scalars())
+    next_url = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_url = f"/projects/{project_id}/board/columns/{task_status}?after_id={tasks[-1].id}&limit={limit}"
+    return tasks, next_url
 
 @router.post("/projects/create_web")
 async def create_project_web(
@@ -18,15 +72,10 @@ async def create_project_web(
         title: str = Form(...),
         start_date: str = Form(...),  # Kommt als String vom HTML-Kalenderpicker
         ai_instructions: str = Form(None),  # Optional! Wenn leer -> Manuelles Projekt
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. User checken
-    user_info = request.session.get('user')
-    if not user_info:
-        return RedirectResponse(url="/login", status_code=303)
-
-    user_email = user_info.get('email')
-    user = db.query(User).filter(User.email == user_email).first()
+    user = await get_session_user(request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
@@ -44,56 +93,199 @@ async def create_project_web(
         owner_id=user.id
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)  # Damit wir die ID bekommen (new_project.id)
+    await db.commit()  # Danach ist new_project.id gesetzt
 
     # 4. Hybrid-Weiche: KI oder Manuell?
     if ai_instructions and len(ai_instructions.strip()) > 0:
-        print(f"🤖 KI wird aktiviert für Projekt: {title}")
-        try:
-            # KI generiert Tasks
-            ai_tasks = analyze_task_with_ai (ai_instructions)
-
-            # Tasks in DB speichern und mit Projekt verknüpfen
-            for t_data in ai_tasks:
-                task = Task(
-                    title=t_data.get('title'),
-                    description=t_data.get('estimated_time'),
-                    owner_id=user.id,
-                    project_id=new_project.id,  # <--- Hier verknüpfen wir es!
-                    created_at=dt_start  # Tasks starten am Projekttag
-                )
-                db.add(task)
-            db.commit()
-        except Exception as e:
-            print(f"❌ KI Fehler: {e}")
+        # Die KI läuft als Hintergrund-Job, das Board zeigt solange "generiert..."
+        job = AIJob(
+            prompt=ai_instructions,
+            cache_mode=cache_mode_from_headers(request.headers),
+            max_attempts=settings.ai_job_max_attempts,
+            owner_id=user.id,
+            project_id=new_project.id,
+        )
+        db.add(job)
+        await db.commit()
+        ai_job_runner.enqueue(job.id)
+        print(f"🤖 KI-Job {job.id} eingereiht für Projekt: {title}")
     else:
         print(f"👤 Manuelles Projekt angelegt: {title}")
 
     # Zurück zum Kalender
     return RedirectResponse(url="/", status_code=303)
 
+@router.post("/projects/bulk", response_model=ProjectBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_projects_bulk(
+        payload: ProjectBulkCreate,
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: CachedUser = Depends(get_current_user)
+):
+    """
+    Viele Projekte auf einmal (z.B. die Roadmap eines Quartals).
+    Alle Projekte + KI-Jobs in einer Transaktion; die KI-Zerlegung läuft im
+    Hintergrund gebündelt (mehrere Projekte pro Modell-Aufruf).
+    """
+    if len(payload.projects) > PROJECT_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many projects (max {PROJECT_BULK_MAX_ITEMS})")
+
+    cache_mode = cache_mode_from_headers(request.headers)
+    projects, jobs = [], []
+    for item in payload.projects:
+        instructions = (item.ai_instructions or "").strip()
+        project = Project(
+            title=item.title,
+            description=item.description or ("KI-generiertes Projekt" if instructions else None),
+            start_date=datetime.combine(item.start_date, datetime.min.time()) if item.start_date else datetime.now(),
+            owner_id=current_user.id,
+        )
+        projects.append(project)
+        jobs.append(AIJob(
+            prompt=instructions,
+            cache_mode=cache_mode,
+            max_attempts=settings.ai_job_max_attempts,
+            owner_id=current_user.id,
+            project=project,
+        ) if instructions else None)
+
+    db.add_all(projects)
+    db.add_all([job for job in jobs if job is not None])
+    await db.commit()
+
+    ai_job_runner.enqueue_batch([job.id for job in jobs if job is not None])
+    return ProjectBulkResult(projects=[
+        ProjectBulkResultItem(id=project.id, title=project.title, job_id=job.id if job else None)
+        for project, job in zip(projects, jobs)
+    ])
+
+
 @router.get("/projects/{project_id}/board")
-async def get_project_board(request: Request, project_id: int, db: Session = Depends(get_db)):
+async def get_project_board(request: Request, project_id: int, db: AsyncSession = Depends(get_async_db)):
     user_info = request.session.get('user')
     if not user_info: return RedirectResponse(url="/login", status_code=303)
+    user = await get_session_user(request, db)
+    if not user: return RedirectResponse(url="/login", status_code=303)
 
-    # Projekt laden
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    # Projekt laden (ohne Tasks - die kommen spaltenweise); fremde Projekte wie fehlende behandeln
+    project = await db.get(Project, project_id)
+    if not project or project.owner_id != user.id:
         return RedirectResponse(url="/", status_code=303)
 
-    # Tasks nach Status sortieren
-    tasks_todo = [t for t in project.tasks if t.status == "todo"]
-    tasks_progress = [t for t in project.tasks if t.status == "in_progress"]
-    tasks_done = [t for t in project.tasks if t.status == "done"]
+    # Feed-Position VOR dem Laden merken: was danach passiert, holt das Board per SSE nach
+    feed_cursor = change_feed.cursor(project_channel(project_id))
+
+    # Nichts geändert seit dem letzten Abruf? -> 304 ohne Task-Queries und Rendering.
+    # Die Seite hängt außerdem am Session-User (Header), Feed-Cursor und den Templates.
+    stamp = await load_stamp_async(db, board_scope(project_id))
+    current = validators(stamp, json.dumps(user_info, sort_keys=True), feed_cursor, template_fingerprint())
+    if is_not_modified(request, current):
+        return not_modified(current)
+
+    # Anzahl pro Spalte, dann nur die erste Seite der offenen Spalten.
+    # "Erledigt" bleibt zugeklappt und wird erst auf Klick nachgeladen.
+    counts = await count_tasks_by_status(db, project_id)
+    columns = {}
+    for task_status in BOARD_COLUMNS:
+        if task_status in BOARD_COLLAPSED_COLUMNS:
+            columns[task_status] = {"tasks": [], "next_url": None, "collapsed": True}
+        else:
+            tasks, next_url = await load_column_page(db, project_id, task_status)
+            columns[task_status] = {"tasks": tasks, "next_url": next_url, "collapsed": False}
+
+    # Neuester KI-Job: läuft er noch ("generiert...") oder ist er fehlgeschlagen?
+    ai_job = (await db.execute(
+        select(AIJob).where(AIJob.project_id == project_id).order_by(AIJob.id.desc()).limit(1)
+    )).scalars().first()
 
     return templates.TemplateResponse("kanban.html", {
         "request": request,
         "project": project,
-        "todo": tasks_todo,
-        "progress": tasks_progress,
-        "done": tasks_done
+        "counts": counts,
+        "columns": columns,
+        "page_size": BOARD_PAGE_SIZE,
+        "ai_job": ai_job,
+        "feed_cursor": feed_cursor,
+    }, headers=current.headers())
+
+
+def sse_message(event_id: Optional[str], event: str, data: dict) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/projects/{project_id}/events")
+async def stream_project_events(
+        request: Request,
+        project_id: int,
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Live-Updates fürs Board (Server-Sent Events, siehe app/services/board_feed.py).
+    ?after= ist der feed_cursor der gerenderten Seite; nach einem Abbruch schickt
+    der Browser Last-Event-ID und bekommt die verpassten Events. Zu alt -> "resync".
+    """
+    user = await get_session_user(request, db)
+    if not user:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    project = await db.get(Project, project_id)
+    if not project or project.owner_id != user.id:
+        return JSONResponse({"error": "Project not found"}, status_code=404)
+    # Die Verbindung bleibt offen -> DB-Verbindung nicht bis zum Ende festhalten
+    await db.close()
+
+    channel = project_channel(project_id)
+    cursor = request.headers.get("last-event-id") or after or change_feed.cursor(channel)
+
+    async def stream():
+        nonlocal cursor
+        with change_feed.listening():
+            while True:
+                events = await change_feed.read(channel, cursor, SSE_HEARTBEAT_SECONDS) if cursor else None
+                if events is None:
+                    yield sse_message(None, "resync", {})
+                    return
+                if not events:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                for event in events:
+                    yield sse_message(event.id, event.event, event.data)
+                    if event.event == "project_deleted":
+                        return
+                cursor = events[-1].id
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/projects/{project_id}/board/columns/{task_status}")
+async def get_board_column_page(
+        request: Request,
+        project_id: int,
+        task_status: str,
+        after_id: int = 0,
+        limit: int = BOARD_PAGE_SIZE,
+        db: AsyncSession = Depends(get_async_db)
+):
+    """HTML-Fragment mit der nächsten Seite einer Spalte (Nachladen beim Scrollen)."""
+    user = await get_session_user(request, db)
+    if not user:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    if task_status not in BOARD_COLUMNS:
+        return JSONResponse({"error": "Unknown column"}, status_code=404)
+    project = await db.get(Project, project_id)
+    if not project or project.owner_id != user.id:
+        return JSONResponse({"error": "Project not found"}, status_code=404)
+
+    limit = max(1, min(limit, 200))
+    tasks, next_url = await load_column_page(db, project_id, task_status, after_id, limit)
+    return templates.TemplateResponse("partials/task_column_page.html", {
+        "request": request,
+        "tasks": tasks,
+        "next_url": next_url,
     })
 
 
@@ -105,13 +297,20 @@ async def create_task_in_project(
         description: str = Form(None),
         priority: str = Form("Medium"),
         request: Request = None,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    user_info = request.session.get('user')
-    if not user_info: return RedirectResponse(url="/login", status_code=303)
+    # User finden
+    fragment = wants_fragment(request)
+    user = await get_session_user(request, db)
+    if not user:
+        if fragment: return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return RedirectResponse(url="/login", status_code=303)
 
-    # User ID finden
-    user = db.query(User).filter(User.email == user_info.get('email')).first()
+    # Nur ins eigene Projekt (fremde wie fehlende behandeln)
+    project = await db.get(Project, project_id)
+    if not project or project.owner_id != user.id:
+        if fragment: return JSONResponse({"error": "Project not found"}, status_code=404)
+        return RedirectResponse(url="/", status_code=303)
 
     # Task erstellen
     new_task = Task(
@@ -123,7 +322,12 @@ async def create_task_in_project(
         owner_id=user.id
     )
     db.add(new_task)
-    db.commit()
+    await db.commit()
+    publish_task(new_task)
+
+    # Board per fetch: nur die neue Karte zurück
+    if fragment:
+        return render_fragment("partials/task_card.html", status_code=201, task=new_task)
 
     # Zurück zum Board
     return RedirectResponse(url=f"/projects/{project_id}/board", status_code=303)
@@ -131,20 +335,29 @@ async def create_task_in_project(
 
 # --- Projekt LÖSCHEN ---
 @router.post("/projects/{project_id}/delete")
-async def delete_project(project_id: int, request: Request, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     user_info = request.session.get('user')
     if not user_info: return RedirectResponse(url="/login", status_code=303)
+    user = await get_session_user(request, db)
+    if not user: return RedirectResponse(url="/login", status_code=303)
 
-    # Projekt suchen
-    project = db.query(Project).filter(Project.id == project_id).first()
+    # Projekt suchen (Tasks + KI-Jobs mitladen, damit der ORM-Cascade sie löschen kann)
+    result = await db.execute(
+        select(Project)
+        .options(selectinload(Project.tasks), selectinload(Project.ai_jobs))
+        .where(Project.id == project_id)
+    )
+    project = result.scalars().first()
 
-    if project:
+    # Nur eigene Projekte löschen (und nur deren Board benachrichtigen)
+    if project and project.owner_id == user.id:
         # Hinweis: Wenn in der Datenbank "cascade='all, delete'" eingestellt ist,
         # werden Tasks automatisch mitgelöscht. Falls nicht, müssten wir sie hier manuell löschen.
         # db.query(Task).filter(Task.project_id == project_id).delete()
 
-        db.delete(project)
-        db.commit()
+        await db.delete(project)
+        await db.commit()
+        publish_project_deleted(project_id)
 
     # Zurück zur Übersicht
     return RedirectResponse(url="/", status_code=303)
@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, Form, Request, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, Form, Query, Request, HTTPException, status
+from sqlalchemy import select, tuple_, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from starlette.responses import RedirectResponse, JSONResponse  # <--- WICHTIG: JSONResponse hat gefehlt
+from typing import List, Optional
+from starlette.responses import RedirectResponse, JSONResponse, HTMLResponse  # <--- WICHTIG: JSONResponse hat gefehlt
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.task import Task
 from app.models.project import Project
-from app.models.user import User
-from app.schemas.task import TaskCreate, TaskOut
+from app.schemas.task import TaskCreate, TaskOut, TaskBatch, TaskBatchResult, TaskBatchItemResult
 from app.oauth2 import get_current_user
-from app.services.ai_services import analyze_task_with_ai
+from app.auth.current_user import CachedUser, get_session_user
+from app.pagination import encode_cursor, decode_cursor
+from app.services.ai_services import suggest_task_with_ai, suggest_task_with_ai_async
+from app.services.ai_cache import cache_mode_from_headers
+from app.services.board_feed import publish_task, publish_task_deleted
+from app.templating import render_fragment, wants_fragment
+from app.responses import FastJSONResponse
+from app.services.version_stamps import (
+    board_scope, is_not_modified, load_stamp, not_modified, tasks_scope, touch, validators,
+)
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# GET /tasks/: Seitengröße und erlaubte Felder für ?fields=
+TASK_PAGE_SIZE = 100
+TASK_PAGE_SIZE_MAX = 500
+TASK_LIST_FIELDS = tuple(TaskOut.model_fields)
+
+# POST /tasks/batch: maximale Anzahl Einträge über alle Operationen
+TASK_BATCH_MAX_ITEMS = 1000
+
 
 class AISentence(BaseModel):
     text: str
@@ -21,23 +41,17 @@ class AISentence(BaseModel):
 
 
 # =================================================================
-# 1. HILFSFUNKTIONEN (Für Web-Session Handling)
+# 1. HILFSFUNKTIONEN
 # =================================================================
 
-def get_local_user_from_session(request: Request, db: Session):
+def status_change(new_status: str) -> dict:
     """
-    Holt den User aus der Datenbank basierend auf der Auth0 Browser-Session.
+    Felder für einen Statuswechsel: "done" sperrt den Task und hakt ihn ab,
+    jeder andere Status entsperrt ihn wieder.
     """
-    auth0_user = request.session.get('user')
-    if not auth0_user:
-        return None
-
-    # Wir suchen den User über die Email (die von Auth0 kommt)
-    user_email = auth0_user.get('email')
-    if not user_email:
-        return None
-
-    return db.query(User).filter(User.email == user_email).first()
+    clean_status = new_status.strip().lower()
+    is_done = clean_status == "done"
+    return {"status": clean_status, "is_locked": is_done, "completed": is_done}
 
 
 # =================================================================
@@ -57,35 +71,25 @@ async def move_task_web(
         task_id: int,
         status: str = Form(...),
         request: Request = None,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Validierung
-    user = get_local_user_from_session(request, db)
+    user = await get_session_user(request, db)
     if not user: return JSONResponse({"error": "Unauthorized"}, status_code=401)
 
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
     if not task: return JSONResponse({"error": "Task not found"}, status_code=404)
     if task.owner_id != user.id: return JSONResponse({"error": "Forbidden"}, status_code=403)
 
-    # 2. Status säubern
-    clean_status = status.strip().lower()
-
-    # 3. Zuweisen
-    task.status = clean_status
-
-    # 4. DIE LOGIK (Jetzt wird sie funktionieren!)
-    if clean_status == "done":
-        print(f"Task {task_id} -> DONE. Sperre zu.") # Kleiner Print zur Sicherheit
-        task.is_locked = True
-        task.completed = True
-    else:
-        print(f"Task {task_id} -> {clean_status}. Sperre auf.")
-        task.is_locked = False
-        task.completed = False
+    # 2. Status säubern, zuweisen und Sperre setzen (done = gesperrt)
+    previous_status = task.status
+    for field, value in status_change(status).items():
+        setattr(task, field, value)
+    print(f"Task {task_id} -> {task.status}. Sperre {'zu' if task.is_locked else 'auf'}.")
 
-    # 5. Speichern
-    db.commit()
-    db.refresh(task)
+    # 5. Speichern und an offene Boards melden
+    await db.commit()
+    publish_task(task, previous_status)
 
     # 6. Antwort mit Lock-Status
     return JSONResponse({
@@ -102,22 +106,31 @@ async def update_task_web(
         description: str = Form(None),
         priority: str = Form(...),
         request: Request = None,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    user = get_local_user_from_session(request, db)
-    if not user: return RedirectResponse(url="/login", status_code=303)
+    fragment = wants_fragment(request)
+    user = await get_session_user(request, db)
+    if not user:
+        if fragment: return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return RedirectResponse(url="/login", status_code=303)
 
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
 
     # Sicherheits-Check
     if not task or task.owner_id != user.id:
+        if fragment: return JSONResponse({"error": "Task not found"}, status_code=404)
         return RedirectResponse(url="/", status_code=303)
 
     # Update
     task.title = title
     task.description = description
     task.priority = priority
-    db.commit()
+    await db.commit()
+    publish_task(task, task.status)
+
+    # Board per fetch: nur die geänderte Karte zurück
+    if fragment:
+        return render_fragment("partials/task_card.html", task=task)
 
     # Zurück zum Board des Projekts
     return RedirectResponse(url=f"/projects/{task.project_id}/board", status_code=303)
@@ -128,22 +141,31 @@ async def update_task_web(
 async def delete_task_web(
         task_id: int,
         request: Request,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    user = get_local_user_from_session(request, db)
-    if not user: return RedirectResponse(url="/login", status_code=303)
+    fragment = wants_fragment(request)
+    user = await get_session_user(request, db)
+    if not user:
+        if fragment: return JSONResponse({"error": "Unauthorized"}, status_code=401)
+        return RedirectResponse(url="/login", status_code=303)
 
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await db.get(Task, task_id)
 
     # Sicherheits-Check
     if not task or task.owner_id != user.id:
+        if fragment: return JSONResponse({"error": "Task not found"}, status_code=404)
         return RedirectResponse(url="/", status_code=303)
 
     # Projekt ID merken für den Redirect
     redir_project_id = task.project_id
 
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
+    publish_task_deleted(redir_project_id, task.id, task.status)
+
+    # Board per fetch: leeres Fragment = Karte entfernen (ID + Spalte für den Zähler im Header)
+    if fragment:
+        return HTMLResponse("", headers={"X-Task-Id": str(task.id), "X-Task-Status": task.status})
 
     if redir_project_id:
         return RedirectResponse(url=f"/projects/{redir_project_id}/board", status_code=303)
@@ -156,13 +178,13 @@ async def delete_task_web(
 async def create_task_ai_web(
         request: Request,
         description: str = Form(...),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    user = get_local_user_from_session(request, db)
+    user = await get_session_user(request, db)
     if not user: return RedirectResponse(url="/login", status_code=303)
 
     # KI fragen
-    ai_data = analyze_task_with_ai(description)
+    ai_data = await suggest_task_with_ai_async(description, cache_mode=cache_mode_from_headers(request.headers))
 
     # Task speichern
     new_task = Task(
@@ -175,7 +197,7 @@ async def create_task_ai_web(
     )
 
     db.add(new_task)
-    db.commit()
+    await db.commit()
 
     return RedirectResponse(url="/", status_code=303)
 
@@ -188,14 +210,16 @@ async def create_task_ai_web(
 @router.post("/generate", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
 def create_task_with_ai_api(
         payload: AISentence,
+        request: Request,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: CachedUser = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(Project.id == payload.project_id).first()
+    # Fremde Projekte wie fehlende behandeln (sonst landen Karten auf fremden Boards)
+    project = db.query(Project).filter(Project.id == payload.project_id, Project.owner_id == current_user.id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    ai_data = analyze_task_with_ai(payload.text)
+    ai_data = suggest_task_with_ai(payload.text, cache_mode=cache_mode_from_headers(request.headers))
 
     new_task = Task(
         title=ai_data.get("summary"),
@@ -209,6 +233,7 @@ def create_task_with_ai_api(
     db.add(new_task)
     db.commit()
     db.refresh(new_task)
+    publish_task(new_task)
     return new_task
 
 
@@ -216,9 +241,10 @@ def create_task_with_ai_api(
 def create_task_api(
         task_data: TaskCreate,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: CachedUser = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(Project.id == task_data.project_id).first()
+    # Fremde Projekte wie fehlende behandeln (sonst landen Karten auf fremden Boards)
+    project = db.query(Project).filter(Project.id == task_data.project_id, Project.owner_id == current_user.id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -230,23 +256,205 @@ def create_task_api(
     db.add(new_task)
     db.commit()
     db.refresh(new_task)
+    publish_task(new_task)
     return new_task
 
 
-@router.get("/", response_model=List[TaskOut])
+@router.post("/batch", response_model=TaskBatchResult)
+def batch_tasks_api(
+        batch: TaskBatch,
+        db: Session = Depends(get_db),
+        current_user: CachedUser = Depends(get_current_user)
+):
+    """
+    Viele Tasks auf einmal anlegen, ändern, verschieben und löschen.
+    Alles läuft in EINER Transaktion mit Multi-Row INSERT/UPDATE/DELETE.
+    Pro Eintrag gibt es ein Ergebnis; abgelehnte Einträge (404/403) werden
+    übersprungen, der Rest wird gespeichert.
+    """
+    total = len(batch.create) + len(batch.update) + len(batch.move) + len(batch.delete)
+    if total > TASK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {TASK_BATCH_MAX_ITEMS} items)")
+
+    results = []
+
+    # 1. Besitzer (+ Projekt/Status für die Live-Updates) aller betroffenen Tasks mit einer Query holen
+    touched_ids = {item.id for item in batch.update} | {item.id for item in batch.move} | set(batch.delete)
+    touched = {
+        row.id: row for row in db.execute(
+            select(Task.id, Task.owner_id, Task.project_id, Task.status).where(Task.id.in_(touched_ids))
+        )
+    } if touched_ids else {}
+
+    def check_owner(op: str, index: int, task_id: int) -> bool:
+        if task_id not in touched:
+            results.append(TaskBatchItemResult(op=op, index=index, id=task_id, ok=False, error="Task not found"))
+            return False
+        if touched[task_id].owner_id != current_user.id:
+            results.append(TaskBatchItemResult(op=op, index=index, id=task_id, ok=False, error="Forbidden"))
+            return False
+        return True
+
+    # 2. Anlegen: Projekt muss existieren und dem User gehören (fremde Projekte = "nicht gefunden")
+    project_ids = {item.project_id for item in batch.create}
+    own_projects = set(db.scalars(
+        select(Project.id).where(Project.id.in_(project_ids), Project.owner_id == current_user.id)
+    )) if project_ids else set()
+
+    create_rows, create_indexes = [], []
+    for index, item in enumerate(batch.create):
+        if item.project_id not in own_projects:
+            results.append(TaskBatchItemResult(op="create", index=index, ok=False, error="Project not found"))
+            continue
+        create_rows.append({**item.model_dump(), "owner_id": current_user.id})
+        create_indexes.append(index)
+
+    # 3. Ändern (nur mitgeschickte Felder) und Verschieben (Status + Sperre)
+    update_rows, update_results = [], []
+    for index, item in enumerate(batch.update):
+        if check_owner("update", index, item.id):
+            changes = item.model_dump(exclude_unset=True, exclude={"id"})
+            if changes:
+                update_rows.append({"id": item.id, **changes})
+            update_results.append(TaskBatchItemResult(op="update", index=index, id=item.id, ok=True))
+
+    for index, item in enumerate(batch.move):
+        if check_owner("move", index, item.id):
+            update_rows.append({"id": item.id, **status_change(item.status)})
+            update_results.append(TaskBatchItemResult(op="move", index=index, id=item.id, ok=True))
+
+    # 4. Löschen
+    delete_ids, delete_results = [], []
+    for index, task_id in enumerate(batch.delete):
+        if check_owner("delete", index, task_id):
+            delete_ids.append(task_id)
+            delete_results.append(TaskBatchItemResult(op="delete", index=index, id=task_id, ok=True))
+
+    # 5. Alles in einer Transaktion schreiben
+    new_ids = []
+    try:
+        if create_rows:
+            new_ids = db.scalars(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                create_rows,
+            ).all()
+            results.extend(
+                TaskBatchItemResult(op="create", index=index, id=new_id, ok=True)
+                for index, new_id in zip(create_indexes, new_ids)
+            )
+        if update_rows:
+            db.execute(update(Task), update_rows)
+        if delete_ids:
+            db.execute(delete(Task).where(Task.id.in_(delete_ids)))
+        # Core-Statements laufen an der Unit of Work vorbei -> ETag-Stempel selbst melden
+        if create_rows or update_rows or delete_ids:
+            touch(db, tasks_scope(current_user.id),
+                  *(board_scope(row["project_id"]) for row in create_rows),
+                  *(board_scope(touched[task_id].project_id)
+                    for task_id in {row["id"] for row in update_rows} | set(delete_ids)
+                    if touched[task_id].project_id))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"❌ Batch fehlgeschlagen: {e}")
+        raise HTTPException(status_code=400, detail="Batch failed, nothing was saved")
+
+    # 6. Offene Boards aktualisieren (eine Query für alle neuen/geänderten Karten)
+    changed_ids = set(new_ids) | {row["id"] for row in update_rows}
+    if changed_ids:
+        for task in db.scalars(select(Task).where(Task.id.in_(changed_ids))):
+            before = touched.get(task.id)
+            publish_task(task, before.status if before else None)
+    for task_id in delete_ids:
+        publish_task_deleted(touched[task_id].project_id, task_id, touched[task_id].status)
+
+    results.extend(update_results)
+    results.extend(delete_results)
+    op_order = {"create": 0, "update": 1, "move": 2, "delete": 3}
+    results.sort(key=lambda r: (op_order[r.op], r.index))
+    return TaskBatchResult(results=results)
+
+
+@router.get("/", response_model=None, responses={200: {"model": List[TaskOut]}})
 def get_my_tasks_api(
+        request: Request,
+        cursor: Optional[str] = None,
+        limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_SIZE_MAX),
+        task_status: Optional[str] = Query(None, alias="status"),
+        priority: Optional[str] = None,
+        category: Optional[str] = None,
+        project_id: Optional[int] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        fields: Optional[str] = Query(None, description="Komma-getrennt, z.B. id,title,status"),
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: CachedUser = Depends(get_current_user)
 ):
-    tasks = db.query(Task).filter(Task.owner_id == current_user.id).all()
-    return tasks
+    """
+    Tasks des Users, seitenweise (Keyset über created_at, id).
+    Die nächste Seite steht im Header X-Next-Cursor bzw. Link: <...>; rel="next".
+    Die Zeilen gehen direkt als dicts an orjson (kein TaskOut pro Zeile, kein jsonable_encoder).
+    """
+    # 1. Welche Felder will der Client?
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in TASK_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        selected = list(TASK_LIST_FIELDS)
+
+    # Seit dem letzten Abruf keine Task des Users geändert? -> 304 ohne Task-Query
+    current = validators(load_stamp(db, tasks_scope(current_user.id)), current_user.id, request.url.query,
+                         vary="Authorization")
+    if is_not_modified(request, current):
+        return not_modified(current)
+    headers = current.headers()
+
+    # 2. Nur diese Spalten laden (+ created_at/id für den Cursor)
+    columns = [getattr(Task, f) for f in selected]
+    query = db.query(*columns, Task.created_at.label("_cursor_created_at"), Task.id.label("_cursor_id"))
+    query = query.filter(Task.owner_id == current_user.id)
+
+    # 3. Filter
+    if task_status is not None:
+        query = query.filter(Task.status == task_status)
+    if priority is not None:
+        query = query.filter(Task.priority == priority)
+    if category is not None:
+        query = query.filter(Task.category == category)
+    if project_id is not None:
+        query = query.filter(Task.project_id == project_id)
+    if due_after is not None:
+        query = query.filter(Task.due_date >= due_after)
+    if due_before is not None:
+        query = query.filter(Task.due_date < due_before)
+
+    # 4. Keyset: alles nach dem letzten Eintrag der vorigen Seite
+    if cursor:
+        try:
+            after_created_at, after_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(Task.created_at, Task.id) > (after_created_at, after_id))
+
+    rows = query.order_by(Task.created_at, Task.id).limit(limit + 1).all()
+
+    # 5. Gibt es eine nächste Seite?
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._cursor_created_at, rows[-1]._cursor_id)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+    return FastJSONResponse([dict(zip(selected, row)) for row in rows], headers=headers)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task_api(
         task_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: CachedUser = Depends(get_current_user)
 ):
     task_query = db.query(Task).filter(Task.id == task_id)
     task = task_query.first()
@@ -258,5 +466,7 @@ def delete_task_api(
         raise HTTPException(status_code=403, detail="Not authorized to delete this task")
 
     task_query.delete(synchronize_session=False)
+    touch(db, tasks_scope(task.owner_id), board_scope(task.project_id) if task.project_id else None)
     db.commit()
+    publish_task_deleted(task.project_id, task.id, task.status)
     return
\ No newline at end of file
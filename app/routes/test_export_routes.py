@@ -0,0 +1,55 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.task import Task
+from app.routes.export_routes import _encode_csv, _encode_ndjson, _gzip
+
+
+def test_encoders_emit_one_chunk_per_batch():
+    batches = [[(1, "a", datetime(2026, 1, 2, 3, 4))], [(2, "b,c", None)]]
+    ndjson = list(_encode_ndjson(batches, ["id", "title", "due"]))
+    assert len(ndjson) == 2
+    assert json.loads(ndjson[0]) == {"id": 1, "title": "a", "due": "2026-01-02T03:04:00"}
+
+    chunks = list(_encode_csv(batches, ["id", "title", "due"]))
+    assert len(chunks) == 2
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows == [["id", "title", "due"], ["1", "a", "2026-01-02T03:04:00"], ["2", "b,c", ""]]
+
+    assert gzip.decompress(b"".join(_gzip(iter(chunks)))) == b"".join(chunks)
+
+
+def make_project(owner_id: int, tasks: int) -> int:
+    with SessionLocal() as db:
+        project = Project(title="Export", owner_id=owner_id)
+        db.add(project)
+        db.flush()
+        db.add_all(Task(title=f"T{i}", owner_id=owner_id, project_id=project.id) for i in range(tasks))
+        db.commit()
+        return project.id
+
+
+def test_task_export_streams_only_own_tasks(client, make_user, bearer):
+    user_id, _ = make_user()
+    project_id = make_project(user_id, 3)
+    other_id, _ = make_user()
+    other_project = make_project(other_id, 2)
+
+    response = client.get("/export/tasks", headers=bearer(user_id))
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3 and {row["project_id"] for row in rows} == {project_id}
+
+    response = client.get("/export/tasks", params={"format": "csv", "compress": "gzip",
+                                                   "project_id": project_id}, headers=bearer(user_id))
+    assert response.headers["content-disposition"].endswith('.csv.gz"')
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert lines[0].startswith("id,title,") and len(lines) == 4
+
+    assert client.get("/export/tasks", params={"project_id": other_project},
+                      headers=bearer(user_id)).status_code == 404
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.config import settings
+from app.routes.internal_routes import require_internal_token
+
+
+def make_request(host: str, **headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw, "client": (host, 1234)})
+
+
+def test_without_token_only_direct_local_requests_pass(monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", None)
+    require_internal_token(make_request("127.0.0.1"), None)
+    require_internal_token(make_request("::1"), None)
+    for request in (make_request("10.0.0.5"), make_request("127.0.0.1", x_forwarded_for="203.0.113.9")):
+        with pytest.raises(HTTPException) as err:
+            require_internal_token(request, None)
+        assert err.value.status_code == 403
+
+
+def test_configured_token_is_required_everywhere(monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "geheim")
+    require_internal_token(make_request("10.0.0.5"), "geheim")
+    for token in (None, "falsch"):
+        with pytest.raises(HTTPException):
+            require_internal_token(make_request("127.0.0.1"), token)
@@ -0,0 +1,115 @@
+from app.database import SessionLocal
+from app.models.ai_job import AIJob
+from app.models.project import Project
+from app.models.task import Task
+from app.routes import project_routes
+
+
+def make_project(owner_id: int, tasks: int = 0) -> int:
+    with SessionLocal() as db:
+        project = Project(title="Board", owner_id=owner_id)
+        db.add(project)
+        db.flush()
+        db.add_all(Task(title=f"T{i}", owner_id=owner_id, project_id=project.id, status="todo") for i in range(tasks))
+        db.commit()
+        return project.id
+
+
+def test_board_and_column_pages_only_for_the_owner(client, make_user, login):
+    owner_id, owner_email = make_user()
+    _, other_email = make_user()
+    project_id = make_project(owner_id, tasks=3)
+
+    login(client, owner_email)
+    assert client.get(f"/projects/{project_id}/board").status_code == 200
+    page = client.get(f"/projects/{project_id}/board/columns/todo", params={"limit": 2})
+    assert page.status_code == 200
+    assert page.text.count("data-status") == 2
+
+    login(client, other_email)
+    board = client.get(f"/projects/{project_id}/board", follow_redirects=False)
+    assert board.status_code == 303 and board.headers["location"] == "/"
+    assert client.get(f"/projects/{project_id}/board/columns/todo").status_code == 404
+
+
+def test_column_page_requires_login(client, make_user):
+    owner_id, _ = make_user()
+    project_id = make_project(owner_id)
+    assert client.get(f"/projects/{project_id}/board/columns/todo").status_code == 401
+
+
+def test_bulk_creates_projects_and_one_job_per_ai_project(client, make_user, bearer, monkeypatch):
+    queued = []
+    monkeypatch.setattr(project_routes.ai_job_runner, "enqueue_batch", queued.extend)
+    user_id, _ = make_user()
+
+    response = client.post("/projects/bulk", headers={**bearer(user_id), "Cache-Control": "no-cache"}, json={
+        "projects": [
+            {"title": "Manuell", "start_date": "2026-01-05"},
+            {"title": "Umzug", "ai_instructions": "Umzug nach Berlin planen"},
+            {"title": "Hochzeit", "ai_instructions": "  Hochzeit planen "},
+        ],
+    })
+    assert response.status_code == 201
+    items = response.json()["projects"]
+    assert [item["title"] for item in items] == ["Manuell", "Umzug", "Hochzeit"]
+    assert items[0]["job_id"] is None
+    assert queued == [items[1]["job_id"], items[2]["job_id"]]
+
+    with SessionLocal() as db:
+        assert {p.owner_id for p in db.query(Project).filter(Project.id.in_([i["id"] for i in items]))} == {user_id}
+        job = db.get(AIJob, items[2]["job_id"])
+        assert (job.project_id, job.prompt, job.cache_mode) == (items[2]["id"], "Hochzeit planen", "refresh")
+
+
+def test_bulk_rejects_too_many_projects(client, make_user, bearer, monkeypatch):
+    monkeypatch.setattr(project_routes, "PROJECT_BULK_MAX_ITEMS", 2)
+    user_id, _ = make_user()
+    response = client.post("/projects/bulk", headers=bearer(user_id),
+                           json={"projects": [{"title": f"P{i}"} for i in range(3)]})
+    assert response.status_code == 413
+
+
+def test_create_task_as_fragment_returns_only_the_new_card(client, make_user, login):
+    owner_id, owner_email = make_user()
+    project_id = make_project(owner_id)
+    login(client, owner_email)
+
+    response = client.post(f"/projects/{project_id}/tasks/create", headers={"X-Fragment": "1"},
+                           data={"title": "Kisten packen", "priority": "High"})
+    assert response.status_code == 201
+    assert 'data-status="todo"' in response.text and "Kisten packen" in response.text
+    assert "<html" not in response.text
+
+    # Ohne Header wie bisher zurück aufs Board
+    response = client.post(f"/projects/{project_id}/tasks/create", data={"title": "X"}, follow_redirects=False)
+    assert response.status_code == 303 and response.headers["location"] == f"/projects/{project_id}/board"
+
+
+def test_foreign_board_gets_no_new_tasks_and_cannot_be_deleted(client, make_user, login):
+    owner_id, _ = make_user()
+    _, other_email = make_user()
+    project_id = make_project(owner_id, tasks=1)
+    login(client, other_email)
+
+    response = client.post(f"/projects/{project_id}/tasks/create", headers={"X-Fragment": "1"},
+                           data={"title": "Fremd"})
+    assert response.status_code == 404 and response.json() == {"error": "Project not found"}
+    response = client.post(f"/projects/{project_id}/tasks/create", data={"title": "Fremd"}, follow_redirects=False)
+    assert response.status_code == 303 and response.headers["location"] == "/"
+
+    response = client.post(f"/projects/{project_id}/delete", follow_redirects=False)
+    assert response.status_code == 303
+    with SessionLocal() as db:
+        assert db.get(Project, project_id) is not None
+        assert db.query(Task).filter(Task.project_id == project_id).count() == 1
+
+
+def test_owner_deletes_project(client, make_user, login):
+    owner_id, owner_email = make_user()
+    project_id = make_project(owner_id, tasks=2)
+    login(client, owner_email)
+    assert client.post(f"/projects/{project_id}/delete", follow_redirects=False).status_code == 303
+    with SessionLocal() as db:
+        assert db.get(Project, project_id) is None
+
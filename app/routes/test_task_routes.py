@@ -0,0 +1,168 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.task import Task
+from app.routes.task_routes import TASK_BATCH_MAX_ITEMS
+from app.services.version_stamps import board_scope, load_stamp, tasks_scope
+
+
+def make_tasks(owner_id: int, count: int, **values) -> int:
+    """Projekt mit count Tasks; alle mit demselben created_at, damit die id die Reihenfolge entscheidet."""
+    with SessionLocal() as db:
+        project = Project(title="P", owner_id=owner_id)
+        db.add(project)
+        db.flush()
+        created_at = datetime(2026, 1, 1, 9, 0, 0)
+        db.add_all(Task(title=f"T{i}", owner_id=owner_id, project_id=project.id, created_at=created_at, **values)
+                   for i in range(count))
+        db.commit()
+        return project.id
+
+
+def test_task_list_pages_through_everything_with_the_cursor(client, make_user, bearer):
+    user_id, _ = make_user()
+    make_tasks(user_id, 7)
+    other_id, _ = make_user()
+    make_tasks(other_id, 3)
+
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/", params=params, headers=bearer(user_id))
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers["link"]
+
+    assert pages == 3
+    assert len(ids) == 7 and ids == sorted(set(ids))
+
+
+def test_task_list_filters_and_sparse_fields(client, make_user, bearer):
+    user_id, _ = make_user()
+    project_id = make_tasks(user_id, 2, status="done", priority="Urgent")
+    make_tasks(user_id, 3, status="todo")
+
+    response = client.get("/tasks/", params={"status": "done", "fields": "id,title,project_id"},
+                          headers=bearer(user_id))
+    rows = response.json()
+    assert len(rows) == 2
+    assert all(set(row) == {"id", "title", "project_id"} and row["project_id"] == project_id for row in rows)
+
+    assert len(client.get("/tasks/", params={"priority": "Urgent"}, headers=bearer(user_id)).json()) == 2
+    assert client.get("/tasks/", params={"fields": "id,password"}, headers=bearer(user_id)).status_code == 400
+    assert client.get("/tasks/", params={"cursor": "kaputt"}, headers=bearer(user_id)).status_code == 400
+
+
+def task_ids(project_id: int) -> list:
+    with SessionLocal() as db:
+        return sorted(db.scalars(select(Task.id).where(Task.project_id == project_id)))
+
+
+def test_batch_applies_mixed_ops_and_reports_rejected_items(client, make_user, bearer):
+    user_id, _ = make_user()
+    project_id = make_tasks(user_id, 3)
+    first, second, third = task_ids(project_id)
+    other_id, _ = make_user()
+    other_project = make_tasks(other_id, 1)
+    (foreign_task,) = task_ids(other_project)
+
+    with SessionLocal() as db:
+        before = load_stamp(db, board_scope(project_id), tasks_scope(user_id)).versions
+
+    response = client.post("/tasks/batch", headers=bearer(user_id), json={
+        "create": [{"title": "Neu", "project_id": project_id}, {"title": "Fremd", "project_id": other_project}],
+        "update": [{"id": first, "title": "Umbenannt"}, {"id": foreign_task, "title": "Gekapert"}],
+        "move": [{"id": second, "status": "done"}],
+        "delete": [third, 999999],
+    })
+    assert response.status_code == 200
+    results = [(r["op"], r["index"], r["ok"], r["error"]) for r in response.json()["results"]]
+    assert results == [
+        ("create", 0, True, None), ("create", 1, False, "Project not found"),
+        ("update", 0, True, None), ("update", 1, False, "Forbidden"),
+        ("move", 0, True, None),
+        ("delete", 0, True, None), ("delete", 1, False, "Task not found"),
+    ]
+
+    with SessionLocal() as db:
+        tasks = {task.id: task for task in db.scalars(select(Task).where(Task.project_id == project_id))}
+        assert tasks[first].title == "Umbenannt"
+        assert tasks[second].status == "done"
+        assert third not in tasks and len(tasks) == 3
+        assert db.get(Task, foreign_task).title == "T0"
+        assert not db.scalars(select(Task).where(Task.project_id == other_project, Task.title == "Fremd")).all()
+        # Core-Statements melden ihre Scopes selbst -> Board und Taskliste sind neu
+        after = load_stamp(db, board_scope(project_id), tasks_scope(user_id)).versions
+        assert all(a > b for a, b in zip(after, before))
+
+
+def test_batch_rejects_oversized_requests(client, make_user, bearer):
+    user_id, _ = make_user()
+    response = client.post("/tasks/batch", headers=bearer(user_id),
+                           json={"delete": list(range(TASK_BATCH_MAX_ITEMS + 1))})
+    assert response.status_code == 413
+
+
+def test_update_and_delete_as_fragment(client, make_user, login):
+    owner_id, owner_email = make_user()
+    project_id = make_tasks(owner_id, 1, status="in_progress")
+    with SessionLocal() as db:
+        task_id = db.scalar(select(Task.id).where(Task.project_id == project_id))
+    login(client, owner_email)
+    fragment = {"X-Fragment": "1"}
+
+    response = client.post(f"/tasks/{task_id}/update", headers=fragment,
+                           data={"title": "Neu", "description": "Text", "priority": "Low"})
+    assert response.status_code == 200
+    assert f'id="task-{task_id}"' in response.text and 'data-title="Neu"' in response.text
+    assert "<html" not in response.text
+
+    response = client.post(f"/tasks/{task_id}/delete", headers=fragment)
+    assert response.status_code == 200 and response.text == ""
+    assert response.headers["x-task-id"] == str(task_id)
+    assert response.headers["x-task-status"] == "in_progress"
+
+
+def test_fragment_requests_for_foreign_or_missing_tasks_get_json_errors(client, make_user, login):
+    owner_id, _ = make_user()
+    _, other_email = make_user()
+    project_id = make_tasks(owner_id, 1)
+    with SessionLocal() as db:
+        task_id = db.scalar(select(Task.id).where(Task.project_id == project_id))
+    fragment = {"X-Fragment": "1"}
+    form = {"title": "Fremd", "priority": "Low"}
+
+    client.cookies.clear()
+    assert client.post(f"/tasks/{task_id}/update", headers=fragment, data=form).status_code == 401
+
+    login(client, other_email)
+    for url in (f"/tasks/{task_id}/update", "/tasks/999999/update"):
+        response = client.post(url, headers=fragment, data=form)
+        assert response.status_code == 404 and response.json() == {"error": "Task not found"}
+    assert client.post(f"/tasks/{task_id}/delete", headers=fragment).status_code == 404
+    with SessionLocal() as db:
+        assert db.get(Task, task_id).title == "T0"
+
+
+def test_api_creates_tasks_only_in_own_projects(client, make_user, bearer):
+    owner_id, _ = make_user()
+    other_id, _ = make_user()
+    project_id = make_tasks(owner_id, 0)
+
+    for url, payload in (("/tasks/", {"title": "Fremd", "project_id": project_id}),
+                         ("/tasks/generate", {"text": "Fremd", "project_id": project_id})):
+        response = client.post(url, headers=bearer(other_id), json=payload)
+        assert response.status_code == 404
+    with SessionLocal() as db:
+        assert db.query(Task).filter(Task.project_id == project_id).count() == 0
+
+    response = client.post("/tasks/", headers=bearer(owner_id), json={"title": "Eigen", "project_id": project_id})
+    assert response.status_code == 201
+
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.project import Project
+
+
+@pytest.mark.parametrize("year, month", [(0, 5), (10000, 1), (2026, 13)])
+def test_calendar_data_rejects_invalid_dates(client, make_user, login, year, month):
+    _, email = make_user()
+    login(client, email)
+    response = client.get(f"/calendar/{year}/{month}")
+    assert response.status_code == 400
+
+
+def test_december_range_ends_before_next_year(client, make_user, login):
+    user_id, email = make_user()
+    with SessionLocal() as db:
+        db.add_all([Project(title="Dez", owner_id=user_id, start_date=datetime(2026, 12, 31, 9, 0)),
+                    Project(title="Jan", owner_id=user_id, start_date=datetime(2027, 1, 1, 9, 0))])
+        db.commit()
+    login(client, email)
+    response = client.get("/calendar/2026/12", params={"counts_only": True})
+    assert response.json()["days"] == {"31": {"count": 1}}
+    response = client.get("/calendar/2026/12")
+    assert response.json()["days"]["31"]["projects"][0]["title"] == "Dez"
+
+
+@pytest.mark.parametrize("year, month", [(0, 5), (9999, 12), (10000, 1)])
+def test_home_renders_years_outside_the_calendar_range(client, make_user, login, year, month):
+    _, email = make_user()
+    login(client, email)
+    response = client.get("/", params={"year": year, "month": month})
+    assert response.status_code == 200
@@ -1,37 +1,80 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, UserLogin, Token
-from app.security import hash_password, verify_password, create_access_token # <-- Importieren unserer Hashing-Funktion
+from app.security import password_hasher, HashingOverloaded, PASSWORD_REHASHED, create_access_token
 
 # Wir erstellen einen neuen Router
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def hashing_busy() -> HTTPException:
+    """Hashing-Pool ist voll: lieber sofort 503 als alle anderen Requests ausbremsen."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login attempts, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+
+async def authenticate(db: AsyncSession, email: str, password: str):
+    """
+    Sucht den User und prüft das Passwort im Hashing-Pool.
+    Gibt (user, fehler) zurück. Veraltete Hashes (Schema/Kosten) werden dabei neu gespeichert.
+    """
+    user = await get_user_by_email(db, email)
+    if not user:
+        return None, "User not found"
+
+    try:
+        valid, new_hash = await password_hasher.verify_and_update_async(password, user.hashed_password)
+    except HashingOverloaded:
+        raise hashing_busy()
+    if not valid:
+        return None, "Incorrect password"
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        PASSWORD_REHASHED.inc()
+    return user, None
+
+
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Erstellt einen neuen Benutzer in der Datenbank.
     """
 
     # 1. Prüfen, ob der User (Username oder E-Mail) schon existiert
-    db_user_email = db.query(User).filter(User.email == user_data.email).first()
+    db_user_email = await get_user_by_email(db, user_data.email)
     if db_user_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    db_user_username = db.query(User).filter(User.username == user_data.username).first()
+    result = await db.execute(select(User).where(User.username == user_data.username))
+    db_user_username = result.scalars().first()
     if db_user_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
 
-    # 2. Das Passwort hashen
-    hashed_pw = hash_password(user_data.password)
+    # 2. Das Passwort hashen (im Hashing-Pool, nicht im Event-Loop)
+    try:
+        hashed_pw = await password_hasher.hash_async(user_data.password)
+    except HashingOverloaded:
+        raise hashing_busy()
 
     # 3. Den neuen User erstellen (mit dem gehashten Passwort)
     #    Wir müssen das 'password' aus dem user_data-Objekt entfernen
@@ -44,15 +87,14 @@ def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return new_user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
         user_credentials: OAuth2PasswordRequestForm = Depends(),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Prüft Email & Passwort und gibt ein JWT Token zürück
@@ -60,18 +102,12 @@ def login(
     :param db:
     :return:
     """
-    # 1. User in der DB suchen (per Email)
-    user = db.query(User).filter(User.email == user_credentials.username).first()
-    # 2. Prüfen : Gibt es den User und stimmt das Passwort ?
+    # 1. + 2. User suchen und Passwort prüfen
+    user, error = await authenticate(db, user_credentials.username, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not found"
-        )
-    if not verify_password(user_credentials.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Incorrect password"
+            detail=error
         )
 
     # 3. Erstelle ein JWT Token
@@ -79,4 +115,3 @@ def login(
     access_token = create_access_token(data={"sub": str(user.id)})
 
     return {"access_token": access_token, "token_type": "bearer"}
-
@@ -1,23 +1,65 @@
 import calendar
-from datetime import datetime
+import json
+from datetime import MAXYEAR, MINYEAR, datetime, time, timezone
 from fastapi import APIRouter, Request, Depends
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from app.database import get_db
+from starlette.responses import JSONResponse
+from sqlalchemy import select, func, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.templating import templates, template_fingerprint
+from app.services.version_stamps import calendar_scope, is_not_modified, load_stamp_async, not_modified, validators
 from app.models.project import Project  # <--- WICHTIG: Projekt importieren
-from app.models.user import User
+from app.auth.current_user import get_session_user
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 DEUTSCHE_MONATE = {
     1: "Januar", 2: "Februar", 3: "März", 4: "April", 5: "Mai", 6: "Juni",
     7: "Juli", 8: "August", 9: "September", 10: "Oktober", 11: "November", 12: "Dezember"
 }
 
+# month_range() braucht für Dezember noch den 1.1. des Folgejahres
+CALENDAR_YEARS = range(MINYEAR, MAXYEAR)
+
+
+def month_range(year: int, month: int):
+    """Erster Tag des Monats (inklusive) bis erster Tag des Folgemonats (exklusive)."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+async def load_month_projects(db: AsyncSession, owner_id: int, year: int, month: int) -> dict:
+    """
+    Holt nur die Projekte des angezeigten Monats (Index ix_projects_owner_id_start_date)
+    und gruppiert sie nach Tag. Es werden nur id/title geladen, keine ganzen Project-Objekte.
+    """
+    start, end = month_range(year, month)
+    result = await db.execute(
+        select(Project.id, Project.title, Project.start_date)
+        .where(Project.owner_id == owner_id, Project.start_date >= start, Project.start_date < end)
+        .order_by(Project.start_date, Project.id)
+    )
+    projects_by_date = {}
+    for row in result:
+        projects_by_date.setdefault(row.start_date.day, []).append(row)
+    return projects_by_date
+
+
+async def count_month_projects(db: AsyncSession, owner_id: int, year: int, month: int) -> dict:
+    """Nur die Anzahl Projekte pro Tag - die Gruppierung macht die Datenbank."""
+    start, end = month_range(year, month)
+    day = extract("day", Project.start_date)
+    result = await db.execute(
+        select(day, func.count())
+        .where(Project.owner_id == owner_id, Project.start_date >= start, Project.start_date < end)
+        .group_by(day)
+    )
+    return {int(d): count for d, count in result}
+
 
 @router.get("/")
-async def home(request: Request, year: int = None, month: int = None, db: Session = Depends(get_db)):
+async def home(request: Request, year: int = None, month: int = None, db: AsyncSession = Depends(get_async_db)):
     user_info = request.session.get('user')
     projects_by_date = {}  # <--- Wir sammeln jetzt Projekte
 
@@ -40,22 +82,24 @@ async def home(request: Request, year: int = None, month: int = None, db: Sessio
     month_days = cal.monthdayscalendar(year, month)
 
     # Daten laden
+    current = None
     if user_info:
-        user_email = user_info.get('email')
-        db_user = db.query(User).filter(User.email == user_email).first()
+        db_user = await get_session_user(request, db)
 
         if db_user:
-            # Wir holen alle PROJEKTE des Users
-            all_projects = db.query(Project).filter(Project.owner_id == db_user.id).all()
-
-            for p in all_projects:
-                # Wir nutzen das Startdatum des Projekts
-                p_date = p.start_date
-                if p_date.month == month and p_date.year == year:
-                    day = p_date.day
-                    if day not in projects_by_date:
-                        projects_by_date[day] = []
-                    projects_by_date[day].append(p)
+            # Unverändert seit dem letzten Abruf? -> 304 ohne Projekt-Query und Rendering.
+            # Die Seite markiert "heute" -> ab Mitternacht ist sie neu.
+            stamp = await load_stamp_async(db, calendar_scope(db_user.id))
+            midnight = datetime.combine(now.date(), time.min).astimezone(timezone.utc).replace(tzinfo=None)
+            current = validators(stamp, json.dumps(user_info, sort_keys=True), year, month, now.date(),
+                                 template_fingerprint(), not_before=midnight)
+            if is_not_modified(request, current):
+                return not_modified(current)
+
+            # Nur die PROJEKTE des angezeigten Monats, gruppiert nach Starttag
+            # (Jahre außerhalb von CALENDAR_YEARS: leerer Kalender statt 500)
+            if year in CALENDAR_YEARS:
+                projects_by_date = await load_month_projects(db, db_user.id, year, month)
 
     return templates.TemplateResponse("index.html", {
         "request": request,
@@ -68,4 +112,46 @@ async def home(request: Request, year: int = None, month: int = None, db: Sessio
         "view_year": year,
         "prev_year": prev_year, "prev_month": prev_month,
         "next_year": next_year, "next_month": next_month
-    })
\ No newline at end of file
+    }, headers=current.headers() if current else None)
+
+
+@router.get("/calendar/{year}/{month}")
+async def calendar_month_data(
+        request: Request,
+        year: int,
+        month: int,
+        counts_only: bool = False,
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Leichte Kalender-Daten als JSON: pro Tag die Anzahl und (ohne counts_only)
+    die ids/Titel der Projekte.
+    """
+    user_info = request.session.get('user')
+    if not user_info:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    if not 1 <= month <= 12:
+        return JSONResponse({"error": "Invalid month"}, status_code=400)
+    if year not in CALENDAR_YEARS:
+        return JSONResponse({"error": "Invalid year"}, status_code=400)
+
+    db_user = await get_session_user(request, db)
+    if not db_user:
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+
+    stamp = await load_stamp_async(db, calendar_scope(db_user.id))
+    current = validators(stamp, db_user.id, year, month, counts_only)
+    if is_not_modified(request, current):
+        return not_modified(current)
+
+    if counts_only:
+        counts = await count_month_projects(db, db_user.id, year, month)
+        days = {day: {"count": count} for day, count in counts.items()}
+    else:
+        projects_by_date = await load_month_projects(db, db_user.id, year, month)
+        days = {
+            day: {"count": len(rows), "projects": [{"id": r.id, "title": r.title} for r in rows]}
+            for day, rows in projects_by_date.items()
+        }
+
+    return JSONResponse({"year": year, "month": month, "days": days}, headers=current.headers())
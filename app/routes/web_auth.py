@@ -1,10 +1,11 @@
-import os
 from urllib.parse import urlencode
 from fastapi import APIRouter, Request, Depends
 from starlette.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from app.oauth_config import oauth
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.oauth_config import get_oauth
+from app.database import get_async_db
 from app.models.user import User
 
 # Kein Prefix, damit die URLs kurz bleiben (/login statt /auth/login)
@@ -16,7 +17,7 @@ async def register(request: Request):
     redirect_uri = request.url_for('auth_callback')
 
     # Der Parameter screen_hint='signup' sagt Auth0: "Zeig sofort das Registrier-Feld!"
-    return await oauth.auth0.authorize_redirect(
+    return await get_oauth().auth0.authorize_redirect(
         request,
         redirect_uri,
         screen_hint='signup'
@@ -26,14 +27,14 @@ async def login(request: Request):
     """Leitet den User zur Auth0-Anmeldeseite weiter."""
     # Wir bauen die URL für den Rückweg (Callback)
     redirect_uri = request.url_for('auth_callback')
-    return await oauth.auth0.authorize_redirect(request, redirect_uri)
+    return await get_oauth().auth0.authorize_redirect(request, redirect_uri)
 
 
 @router.get("/callback", name="auth_callback")
-async def auth_callback(request: Request, db: Session = Depends(get_db)):  # <--- DB injected
+async def auth_callback(request: Request, db: AsyncSession = Depends(get_async_db)):  # <--- DB injected
     try:
         # 1. Daten von Auth0 holen
-        token = await oauth.auth0.authorize_access_token(request)
+        token = await get_oauth().auth0.authorize_access_token(request)
         user_info = token.get('userinfo')
 
         if not user_info:
@@ -42,12 +43,14 @@ async def auth_callback(request: Request, db: Session = Depends(get_db)):  # <--
 
         # In Session speichern (für den Browser)
         request.session['user'] = dict(user_info)
+        request.session.pop('user_id', None)
 
         # 2. WICHTIG: User in die Datenbank synchronisieren 💾
         email = user_info.get('email')
 
         # User suchen
-        db_user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        db_user = result.scalars().first()
 
         if not db_user:
             print(f"🆕 Lege neuen User an: {email}")
@@ -65,15 +68,17 @@ async def auth_callback(request: Request, db: Session = Depends(get_db)):  # <--
 
             try:
                 db.add(new_user)
-                db.commit()
-                db.refresh(new_user)
+                await db.commit()
+                request.session['user_id'] = new_user.id
                 print(f"✅ User {email} erfolgreich in DB gespeichert (ID: {new_user.id})")
             except Exception as db_err:
                 print(f"❌ Datenbank-Fehler beim Anlegen: {db_err}")
-                db.rollback()
+                await db.rollback()
                 # Wir lassen den User trotzdem rein (Session ist ja da),
                 # aber er hat dann keine DB-ID für Tasks.
         else:
+            # Lokale ID merken -> spätere Requests brauchen keinen E-Mail-Lookup mehr
+            request.session['user_id'] = db_user.id
             print(f"👋 Willkommen zurück, {email} (ID: {db_user.id})")
 
         # 3. Weiter zum Dashboard
@@ -92,9 +97,9 @@ async def logout(request: Request):
     request.session.clear()
 
     # 2. Auth0 Logout URL bauen
-    # Wir brauchen die Domain und Client ID aus den Umgebungsvariablen
-    domain = os.getenv("AUTH0_DOMAIN")
-    client_id = os.getenv("AUTH0_CLIENT_ID")
+    # Domain und Client ID kommen aus den Settings (.env)
+    domain = settings.auth0_domain
+    client_id = settings.auth0_client_id
 
     # Wohin soll Auth0 uns nach dem Logout schicken?
     return_to = "http://localhost:8000"  # Muss im Dashboard bei "Allowed Logout URLs" stehen!
@@ -0,0 +1,23 @@
+# app/schemas/ai_job.py
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class AIJobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    tasks_created: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    project_id: int
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
+from datetime import date
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 class ProjectBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -9,4 +10,27 @@ class ProjectOut(ProjectBase):
     id: int
     owner_id: int | None = None
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Bulk-Anlage (POST /projects/bulk) ---
+
+class ProjectBulkItem(BaseModel):
+    title: str
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    # Gesetzt -> KI zerlegt das Projekt im Hintergrund (gebündelt mit den anderen)
+    ai_instructions: Optional[str] = None
+
+
+class ProjectBulkCreate(BaseModel):
+    projects: List[ProjectBulkItem]
+
+
+class ProjectBulkResultItem(BaseModel):
+    id: int
+    title: str
+    job_id: Optional[int] = None
+
+
+class ProjectBulkResult(BaseModel):
+    projects: List[ProjectBulkResultItem]
@@ -1,7 +1,7 @@
 # app/schemas/task.py
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -48,4 +48,34 @@ class TaskOut(TaskBase):
     # category: Optional[str] = "Personal"
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Batch-API (POST /tasks/batch) ---
+
+class TaskUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskMoveItem(BaseModel):
+    id: int
+    status: str
+
+
+class TaskBatch(BaseModel):
+    # Reihenfolge der Ausführung: create -> update -> move -> delete
+    create: List[TaskCreate] = []
+    update: List[TaskUpdateItem] = []
+    move: List[TaskMoveItem] = []
+    delete: List[int] = []
+
+
+class TaskBatchItemResult(BaseModel):
+    op: str
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItemResult]
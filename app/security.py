@@ -1,20 +1,116 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt
+from app import metrics
 from app.config import settings
 
 
-# Hashing Configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# =================================================================
+# Passwort-Hashing
+# Einziger CryptContext der App. Läuft auf einem eigenen, begrenzten
+# Thread-Pool, damit ein Login-Ansturm nicht den ganzen Threadpool
+# (und damit alle anderen Requests) blockiert.
+# =================================================================
+
+PASSWORD_HASH_SECONDS = metrics.histogram("password_hash_seconds", "Time spent hashing/verifying a password", ["op"])
+PASSWORD_HASH_REJECTED = metrics.counter("password_hash_rejected_total", "Hashing requests rejected because the queue was full")
+PASSWORD_REHASHED = metrics.counter("password_rehashed_total", "Password hashes upgraded on login")
+
+
+class HashingOverloaded(Exception):
+    """Die Warteschlange des Hashing-Pools ist voll -> Client soll es später nochmal versuchen."""
+
+
+def build_crypt_context(scheme: str, rounds: Optional[int]) -> CryptContext:
+    # bcrypt bleibt immer lesbar, damit alte Hashes beim Login umgestellt werden können
+    schemes = [scheme] + (["bcrypt"] if scheme != "bcrypt" else [])
+    options = {f"{scheme}__rounds": rounds} if rounds else {}
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **options)
+
+
+class PasswordHasher:
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        # Laufende + wartende Jobs zusammen
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # --- synchron (CPU-Arbeit) ---
+
+    def hash(self, password: str) -> str:
+        start = time.perf_counter()
+        try:
+            return self.context.hash(password)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, op="hash")
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Prüft das Passwort. Passen Schema oder Kosten nicht mehr zu den Settings,
+        kommt als zweiter Wert ein neuer Hash zurück (sonst None).
+        """
+        start = time.perf_counter()
+        try:
+            return self.context.verify_and_update(password, hashed_password)
+        except ValueError:
+            # Unbekanntes Format, z.B. "AUTH0_EXTERNAL_LOGIN" -> kein Passwort-Login möglich
+            return False, None
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, op="verify")
+
+    # --- async: läuft im Hashing-Pool, der Event-Loop bleibt frei ---
+
+    async def hash_async(self, password: str) -> str:
+        return await self._submit(self.hash, password)
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit(self.verify_and_update, password, hashed_password)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.inc()
+            raise HashingOverloaded("Password hashing queue is full")
+        with self._pending_lock:
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+
+password_hasher = PasswordHasher(
+    build_crypt_context(settings.password_scheme, settings.password_hash_rounds),
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+metrics.gauge("password_hash_pending", "Hashing jobs running or queued",
+              callback=lambda: {(): password_hasher.pending})
+
+# Bisheriger CryptContext-Name, falls ihn noch jemand importiert
+pwd_context = password_hasher.context
 
 def hash_password(password: str) -> str:
     """Nimmt ein Klartext-Passwort und gibt den Hash zurück."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vergleicht ein Klartext-Passwort mit einem Hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
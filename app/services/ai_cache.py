@@ -0,0 +1,178 @@
+"""
+Cache vor dem KI-Service.
+
+Viele Projekte heißen fast gleich ("Urlaub planen", "urlaub planen!"), jede
+Zerlegung wäre sonst ein neuer, bezahlter und langsamer Gemini-Aufruf.
+
+- Schlüssel: normalisierter Prompt-Text + Modell + Prompt-Version + Art
+- vorne ein TTL/LRU-Cache im Arbeitsspeicher,
+  dahinter eine lokale SQLite-Datei (Treffer überleben einen Neustart)
+- pro Request steuerbar über Cache-Control:
+    no-cache -> Cache nicht lesen, neues Ergebnis aber speichern
+    no-store -> Cache weder lesen noch schreiben
+"""
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+from app import metrics
+from app.config import settings
+
+AI_CACHE_LOOKUPS = metrics.counter("ai_cache_lookups_total", "AI cache lookups", ["kind", "result"])
+AI_CACHE_WRITES = metrics.counter("ai_cache_writes_total", "AI results written to the cache", ["kind"])
+
+# Cache-Modi (siehe cache_mode_from_headers)
+CACHE_DEFAULT = "default"
+CACHE_REFRESH = "refresh"   # no-cache
+CACHE_BYPASS = "bypass"     # no-store
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text_input: str) -> str:
+    """Groß/klein, Leerraum und Satzzeichen am Ende spielen für die KI keine Rolle."""
+    return _WHITESPACE.sub(" ", text_input).strip().strip(".!?;,").strip().casefold()
+
+
+def cache_key(kind: str, text_input: str, model: str, prompt_version: int) -> str:
+    raw = json.dumps([kind, normalize_prompt(text_input), model, prompt_version], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_mode_from_headers(headers) -> str:
+    directives = {d.strip().lower() for d in headers.get("cache-control", "").split(",")}
+    if "no-store" in directives:
+        return CACHE_BYPASS
+    if "no-cache" in directives:
+        return CACHE_REFRESH
+    return CACHE_DEFAULT
+
+
+class AICache:
+    def __init__(self, path: Optional[str], maxsize: int, ttl: float):
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+        self.path = path
+        self.purge_expired()
+
+    # --- Lesen ---
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._memory.get(key)
+        if value is not None:
+            AI_CACHE_LOOKUPS.inc(kind=kind, result="hit_memory")
+            return json.loads(value)
+
+        value = self._read_disk(key)
+        if value is None:
+            AI_CACHE_LOOKUPS.inc(kind=kind, result="miss")
+            return None
+        with self._lock:
+            self._memory[key] = value
+        AI_CACHE_LOOKUPS.inc(kind=kind, result="hit_disk")
+        return json.loads(value)
+
+    async def get_async(self, kind: str, key: str) -> Optional[Any]:
+        # Speicher-Treffer direkt, nur für die Datei in einen Thread
+        with self._lock:
+            in_memory = key in self._memory
+        if in_memory or self._db is None:
+            return self.get(kind, key)
+        return await asyncio.to_thread(self.get, kind, key)
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM ai_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    # --- Schreiben ---
+
+    def put(self, kind: str, key: str, value: Any):
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._memory[key] = encoded
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, kind, value, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, encoded, now, now + self.ttl),
+                )
+        AI_CACHE_WRITES.inc(kind=kind)
+
+    async def put_async(self, kind: str, key: str, value: Any):
+        if self._db is None:
+            self.put(kind, key, value)
+        else:
+            await asyncio.to_thread(self.put, kind, key, value)
+
+    # --- Verwalten ---
+
+    def purge(self, key: Optional[str] = None, kind: Optional[str] = None) -> int:
+        """Löscht einen Eintrag, alle einer Art oder (ohne Argumente) alles."""
+        with self._lock:
+            if key is not None:
+                removed = 1 if self._memory.pop(key, None) is not None else 0
+                if self._db is not None:
+                    removed = max(removed, self._db.execute("DELETE FROM ai_cache WHERE key = ?", (key,)).rowcount)
+                return removed
+            # Im Speicher steht die Art nicht dabei -> dort einfach alles verwerfen
+            removed = len(self._memory)
+            self._memory.clear()
+            if self._db is not None:
+                if kind is not None:
+                    removed = self._db.execute("DELETE FROM ai_cache WHERE kind = ?", (kind,)).rowcount
+                else:
+                    removed = self._db.execute("DELETE FROM ai_cache").rowcount
+            return removed
+
+    def purge_expired(self) -> int:
+        if self._db is None:
+            return 0
+        with self._lock:
+            return self._db.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            memory_entries = len(self._memory)
+            disk_entries = (
+                self._db.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0] if self._db is not None else 0
+            )
+        return {
+            "path": self.path,
+            "ttl_seconds": self.ttl,
+            "memory_entries": memory_entries,
+            "memory_max_size": self._memory.maxsize,
+            "disk_entries": disk_entries,
+            "lookups": AI_CACHE_LOOKUPS.snapshot(),   # "kind,result" -> Anzahl
+            "writes": AI_CACHE_WRITES.snapshot(),
+        }
+
+
+ai_cache = AICache(
+    path=settings.ai_cache_path or None,
+    maxsize=settings.ai_cache_max_size,
+    ttl=settings.ai_cache_ttl_seconds,
+)
@@ -0,0 +1,361 @@
+"""
+Hintergrund-Jobs für die KI-Zerlegung von Projekten.
+
+create_project_web legt nur noch eine AIJob-Zeile an und reiht sie ein;
+die Antwort geht sofort raus (POST /projects/bulk reiht viele Jobs als
+Batch ein -> mehrere Projekte pro KI-Aufruf). Ein kleiner Worker-Pool im Prozess (asyncio)
+holt die Jobs ab, fragt die KI und speichert die Tasks.
+
+- Einzel-Jobs streamen: jeder Task wird gespeichert und über den Änderungs-Feed
+  des Projekts (board_feed -> SSE) ans Board geschickt, sobald die KI ihn fertig
+  geschrieben hat
+- Zustand und Fortschritt stehen in der Tabelle ai_jobs
+- Fehler werden am Job gespeichert und mit Backoff erneut versucht,
+  nach ai_job_max_attempts ist der Job "failed" (statt Fallback-Task)
+- Laufende Jobs melden sich alle JOB_HEARTBEAT_SECONDS (heartbeat_at); beim Start
+  werden nur "running"-Jobs ohne frisches Lebenszeichen neu eingereiht - Jobs
+  anderer, noch laufender Worker-Prozesse bleiben unangetastet
+- Abgeholt wird mit einem einzigen UPDATE ... WHERE status='queued', damit
+  zwei Worker denselben Job nie gleichzeitig bekommen
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set
+
+from sqlalchemy import func, select, update
+
+from app import metrics
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.ai_job import AIJob, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from app.models.project import Project
+from app.models.task import Task
+from app.services.ai_services import AIServiceError, analyze_tasks_batch_async, stream_task_list_async
+from app.services.board_feed import publish_job, publish_task
+from app.services.version_stamps import board_scope, touch
+
+AI_JOBS_FINISHED = metrics.counter("ai_jobs_total", "AI jobs by outcome", ["outcome"])
+
+# So oft erneuert ein Worker heartbeat_at seiner laufenden Jobs; ohne Lebenszeichen
+# seit JOB_STALE_SECONDS gilt ein "running"-Job als verwaist (Worker abgestürzt)
+JOB_HEARTBEAT_SECONDS = 10.0
+JOB_STALE_SECONDS = 3 * JOB_HEARTBEAT_SECONDS
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def build_tasks(job: AIJob, project: Project, ai_tasks: list) -> list:
+    """KI-Antwort -> Task-Objekte. Einträge ohne Titel werden übersprungen."""
+    tasks = []
+    for t_data in ai_tasks:
+        if not isinstance(t_data, dict):
+            continue
+        title = str(t_data.get("title") or "").strip()
+        if not title:
+            continue
+        tasks.append(Task(
+            title=title,
+            description=t_data.get("estimated_time"),
+            owner_id=job.owner_id,
+            project_id=project.id,
+            created_at=project.start_date,  # Tasks starten am Projekttag
+        ))
+    return tasks
+
+
+class AIJobRunner:
+    def __init__(self, workers: int, retry_backoff: float):
+        self.workers = workers
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        for _ in range(self.workers):
+            self._spawn(self._worker())
+
+        # Offene Jobs vom letzten Lauf (und verwaiste anderer Worker) wieder aufnehmen
+        job_ids = await self.recover_jobs()
+        self.enqueue_batch(job_ids)
+        if job_ids:
+            print(f"🔁 {len(job_ids)} offene KI-Jobs wieder eingereiht")
+
+    async def recover_jobs(self) -> list:
+        """
+        Verwaiste "running"-Jobs zurück auf "queued"; gibt alle wartenden Job-IDs zurück.
+        Jobs mit frischem Lebenszeichen gehören einem anderen laufenden Worker.
+        Hat ein verwaister Job schon Tasks gespeichert (Streaming), ist er erledigt
+        wie in _abort - ein neuer Lauf würde sie doppelt anlegen.
+        """
+        now = utcnow()
+        stale = (AIJob.status == JOB_RUNNING,
+                 func.coalesce(AIJob.heartbeat_at, AIJob.started_at) < now - timedelta(seconds=JOB_STALE_SECONDS))
+        async with AsyncSessionLocal() as db:
+            reset = (await db.execute(
+                update(AIJob)
+                .where(*stale, AIJob.tasks_created == 0)
+                .values(status=JOB_QUEUED, heartbeat_at=None)
+                .returning(AIJob.project_id)
+            )).scalars().all()
+            completed = (await db.execute(
+                update(AIJob)
+                .where(*stale, AIJob.tasks_created > 0)
+                .values(status=JOB_DONE, progress=100, error="Unvollständig: Worker abgebrochen",
+                        finished_at=now, heartbeat_at=None)
+                .returning(AIJob.id, AIJob.project_id)
+            )).all()
+            touch(db, *(board_scope(project_id) for project_id in {*reset, *(row.project_id for row in completed)}))
+            job_ids = (await db.execute(
+                select(AIJob.id).where(AIJob.status == JOB_QUEUED).order_by(AIJob.id)
+            )).scalars().all()
+            await db.commit()
+
+            if completed:
+                AI_JOBS_FINISHED.inc(len(completed), outcome="done")
+                for job in (await db.execute(
+                    select(AIJob).where(AIJob.id.in_([row.id for row in completed]))
+                )).scalars():
+                    publish_job(job)
+                print(f"⚠️ {len(completed)} verwaiste KI-Jobs mit schon gespeicherten Tasks als unvollständig beendet")
+        return list(job_ids)
+
+    async def stop(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+
+    def enqueue(self, job_id: int):
+        if self._queue is None:
+            # Kein laufender Worker (z.B. Skript ohne Lifespan) -> bleibt "queued" bis zum nächsten Start
+            print(f"⚠️ KI-Job {job_id} eingereiht, aber kein Worker aktiv")
+            return
+        self._queue.put_nowait(job_id)
+
+    def enqueue_batch(self, job_ids):
+        """Jobs in Blöcken von ai_batch_max_items einreihen; ein Block = ein Batch-Aufruf."""
+        job_ids = list(job_ids)
+        size = max(1, settings.ai_batch_max_items)
+        for i in range(0, len(job_ids), size):
+            chunk = tuple(job_ids[i:i + size])
+            if self._queue is None:
+                print(f"⚠️ KI-Jobs {list(chunk)} eingereiht, aber kein Worker aktiv")
+            elif len(chunk) == 1:
+                self._queue.put_nowait(chunk[0])
+            else:
+                self._queue.put_nowait(chunk)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                if isinstance(item, tuple):
+                    await self.run_batch(item)
+                else:
+                    await self.run_job(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ KI-Job {item} abgestürzt: {e}")
+                await self._abort(item if isinstance(item, tuple) else (item,), e)
+            finally:
+                self._queue.task_done()
+
+    async def _abort(self, job_ids, error: Exception):
+        """
+        Unerwarteter Fehler (DB, Bug): Jobs nicht auf "running" hängen lassen.
+        Mit schon gespeicherten Tasks ist der Job erledigt (kein Retry -> keine Duplikate),
+        sonst normaler Fehlerweg mit Retry/Backoff.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                jobs = (await db.execute(
+                    select(AIJob).where(AIJob.id.in_(job_ids), AIJob.status == JOB_RUNNING)
+                )).scalars().all()
+                for job in jobs:
+                    if job.tasks_created:
+                        project = await db.get(Project, job.project_id)
+                        await self._complete(db, job, project, error=f"Unvollständig: {error}"[:2000])
+                    else:
+                        await self._fail(db, job, error)
+        except Exception as e:
+            print(f"❌ KI-Jobs {list(job_ids)} konnten nicht als fehlgeschlagen markiert werden: {e}")
+
+    async def _enqueue_later(self, job_id: int, delay: float):
+        await asyncio.sleep(delay)
+        self.enqueue(job_id)
+
+    async def _claim(self, db, job_ids) -> list:
+        """
+        Noch wartende Jobs (+ ihr Projekt) auf "running" setzen. Gelöschte/erledigte fallen raus.
+        Ein UPDATE mit Bedingung auf "queued": von zwei Workern bekommt nur einer den Job.
+        """
+        now = utcnow()
+        rows = (await db.execute(
+            update(AIJob)
+            .where(AIJob.id.in_(job_ids), AIJob.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, attempts=AIJob.attempts + 1, progress=10,
+                    started_at=now, heartbeat_at=now)
+            .returning(AIJob.id, AIJob.project_id)
+        )).all()
+        if not rows:
+            await db.commit()
+            return []
+        touch(db, *(board_scope(row.project_id) for row in rows))
+        await db.commit()
+
+        jobs = (await db.execute(
+            select(AIJob).where(AIJob.id.in_([row.id for row in rows])).order_by(AIJob.id)
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+        projects = {
+            project.id: project for project in (await db.execute(
+                select(Project).where(Project.id.in_({job.project_id for job in jobs}))
+            )).scalars()
+        }
+        claimed = []
+        for job in jobs:
+            if job.project_id in projects:
+                claimed.append((job, projects[job.project_id]))
+            else:
+                # Projekt inzwischen gelöscht -> nichts mehr zu tun
+                job.status = JOB_FAILED
+                job.error = "Project not found"
+                job.finished_at = utcnow()
+        if len(claimed) < len(jobs):
+            await db.commit()
+        return claimed
+
+    @asynccontextmanager
+    async def _heartbeat(self, job_ids):
+        """Solange der Block läuft, heartbeat_at der Jobs regelmäßig erneuern."""
+        async def beat():
+            while True:
+                await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await db.execute(
+                            update(AIJob).where(AIJob.id.in_(job_ids), AIJob.status == JOB_RUNNING)
+                            .values(heartbeat_at=utcnow())
+                        )
+                        await db.commit()
+                except Exception as e:
+                    print(f"⚠️ Heartbeat für KI-Jobs {list(job_ids)} fehlgeschlagen: {e}")
+
+        task = self._spawn(beat())
+        try:
+            yield
+        finally:
+            task.cancel()
+
+    async def _finish(self, db, job: AIJob, project: Project, result):
+        """result: Task-Liste der KI oder AIServiceError."""
+        if isinstance(result, Exception):
+            await self._fail(db, job, result)
+            return
+        job.progress = 70
+        tasks = build_tasks(job, project, result)
+        if not tasks:
+            await self._fail(db, job, AIServiceError("AI returned no usable tasks"))
+            return
+
+        db.add_all(tasks)
+        job.tasks_created = len(tasks)
+        await self._complete(db, job, project, new_tasks=tasks)
+
+    async def _complete(self, db, job: AIJob, project: Project, error: Optional[str] = None, new_tasks=()):
+        job.status = JOB_DONE
+        job.progress = 100
+        job.error = error
+        job.finished_at = utcnow()
+        await db.commit()
+        AI_JOBS_FINISHED.inc(outcome="done")
+        # Erst nach dem Commit veröffentlichen (sonst Karten ohne Zeile in der DB)
+        for task in new_tasks:
+            publish_task(task)
+        publish_job(job)
+        print(f"✅ KI-Job {job.id}: {job.tasks_created} Tasks für Projekt {project.id} angelegt")
+
+    async def run_job(self, job_id: int):
+        """
+        Einzelner Job mit Streaming: jeder Task wird gespeichert und ans Board
+        geschickt, sobald die KI ihn fertig geschrieben hat.
+        """
+        async with AsyncSessionLocal() as db:
+            claimed = await self._claim(db, [job_id])
+            if not claimed:
+                return
+            job, project = claimed[0]
+            publish_job(job)
+            try:
+                async with self._heartbeat([job.id]):
+                    async for t_data in stream_task_list_async(job.prompt, cache_mode=job.cache_mode):
+                        for task in build_tasks(job, project, [t_data]):
+                            db.add(task)
+                            job.tasks_created += 1
+                            job.progress = min(90, 10 + 15 * job.tasks_created)
+                            await db.commit()
+                            publish_task(task)
+                            publish_job(job)
+            except AIServiceError as e:
+                if not job.tasks_created:
+                    await self._fail(db, job, e)
+                    return
+                # Abbruch mitten im Stream: was schon da ist, bleibt (kein Retry -> keine Duplikate)
+                await self._complete(db, job, project, error=f"Unvollständig: {e}"[:2000])
+                return
+            await self._complete(db, job, project)
+
+    async def run_batch(self, job_ids):
+        """Mehrere Jobs mit einem Batch-Aufruf an die KI (siehe analyze_tasks_batch_async)."""
+        async with AsyncSessionLocal() as db:
+            claimed = await self._claim(db, job_ids)
+            # Pro Aufruf gilt ein Cache-Modus -> danach gruppieren
+            by_mode = {}
+            for job, project in claimed:
+                by_mode.setdefault(job.cache_mode, []).append((job, project))
+            async with self._heartbeat([job.id for job, _ in claimed]):
+                for cache_mode, group in by_mode.items():
+                    results = await analyze_tasks_batch_async([job.prompt for job, _ in group], cache_mode=cache_mode)
+                    for (job, project), result in zip(group, results):
+                        await self._finish(db, job, project, result)
+
+    async def _fail(self, db, job: AIJob, error: Exception):
+        job.error = str(error)[:2000]
+        job.progress = 0
+        if job.attempts < job.max_attempts:
+            job.status = JOB_QUEUED
+            await db.commit()
+            delay = self.retry_backoff * 2 ** (job.attempts - 1)
+            # Provider gesperrt -> nicht vor der nächsten Breaker-Probe / dem nächsten Token
+            delay = max(delay, getattr(error, "retry_after", 0.0))
+            AI_JOBS_FINISHED.inc(outcome="retried")
+            publish_job(job)
+            print(f"⚠️ KI-Job {job.id} Versuch {job.attempts}/{job.max_attempts} fehlgeschlagen: {error} "
+                  f"-> neuer Versuch in {delay:.1f}s")
+            self._spawn(self._enqueue_later(job.id, delay))
+        else:
+            job.status = JOB_FAILED
+            job.finished_at = utcnow()
+            await db.commit()
+            AI_JOBS_FINISHED.inc(outcome="failed")
+            publish_job(job)
+            print(f"❌ KI-Job {job.id} endgültig fehlgeschlagen: {error}")
+
+
+ai_job_runner = AIJobRunner(workers=settings.ai_job_workers, retry_backoff=settings.ai_job_retry_backoff_seconds)
+metrics.gauge("ai_jobs_queued", "AI jobs waiting for a worker", callback=lambda: {(): ai_job_runner.queued()})
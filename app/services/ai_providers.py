@@ -0,0 +1,248 @@
+"""
+KI-Provider: woher die Antworten kommen.
+
+Ausgewählt über settings.ai_provider:
+- "gemini"  -> Google Gemini (Standard)
+- "offline" -> deterministische Antworten ohne Netzwerk, mit künstlicher
+               Latenz und Fehlerrate (Lasttests, lokale Entwicklung)
+
+Alle Provider liefern ein AIResponse mit Text und (falls bekannt) Token-Zahlen.
+Begrenzung, Timeout, Cache und Single-Flight liegen eine Ebene höher
+in app/services/ai_services.py.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+
+
+# Zeile im Batch-Prompt, hinter der die Projekte als JSON stehen ([{"id", "projekt"}, ...])
+BATCH_ITEMS_MARKER = "PROJEKTE_JSON:"
+
+
+class AIProviderError(Exception):
+    """Der Provider hat keinen brauchbaren Text geliefert."""
+
+
+class AIQuotaError(AIProviderError):
+    """Quota/Rate-Limit beim Provider erschöpft (HTTP 429)."""
+
+
+def is_quota_error(error: BaseException) -> bool:
+    # google.api_core.exceptions.ResourceExhausted hat code 429 (ohne das SDK importieren zu müssen)
+    return isinstance(error, AIQuotaError) or getattr(error, "code", None) == 429
+
+
+@dataclass(frozen=True)
+class AIResponse:
+    text: str
+    model: str
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class AIProvider:
+    """
+    Schnittstelle. kind ist "decompose" (Liste von Tasks), "suggest" (ein Task)
+    oder "decompose_batch" (mehrere Projekte, Antwort [{"id", "tasks"}, ...]).
+    """
+    name = "base"
+    model = "base"   # Teil des Cache-Schlüssels
+
+    def generate(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        raise NotImplementedError
+
+    async def stream_async(self, prompt: str, kind: str, timeout: float) -> AsyncIterator[str]:
+        """Antwort stückweise. Standard: ohne echtes Streaming alles auf einmal."""
+        response = await self.generate_async(prompt, kind, timeout)
+        yield response.text
+
+
+# =================================================================
+# Gemini
+# =================================================================
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str], model: str):
+        self.api_key = api_key
+        self.model = model
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def _model(self):
+        # SDK (grpc, protobuf, ~1s Import) erst beim ersten Aufruf laden und konfigurieren
+        import google.generativeai as genai
+
+        if not self._configured:
+            with self._lock:
+                if not self._configured:
+                    if not self.api_key:
+                        print("❌ WARNUNG: Kein GEMINI_API_KEY gefunden! ")
+                    genai.configure(api_key=self.api_key)
+                    self._configured = True
+        return genai.GenerativeModel(self.model)
+
+    def _to_response(self, response) -> AIResponse:
+        usage = getattr(response, "usage_metadata", None)
+        return AIResponse(
+            text=response.text,
+            model=self.model,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+    def generate(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        response = self._model().generate_content(prompt, request_options={"timeout": timeout})
+        return self._to_response(response)
+
+    async def generate_async(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        response = await self._model().generate_content_async(prompt, request_options={"timeout": timeout})
+        return self._to_response(response)
+
+    async def stream_async(self, prompt: str, kind: str, timeout: float) -> AsyncIterator[str]:
+        response = await self._model().generate_content_async(
+            prompt, stream=True, request_options={"timeout": timeout})
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+# =================================================================
+# Offline (deterministisch)
+# =================================================================
+
+OFFLINE_TASK_TITLES = (
+    "Anforderungen klären", "Zeitplan erstellen", "Budget festlegen", "Material besorgen",
+    "Aufgaben verteilen", "Umsetzung starten", "Zwischenstand prüfen", "Ergebnis abnehmen",
+    "Dokumentation schreiben", "Abschluss feiern",
+)
+OFFLINE_PRIORITIES = ("High", "Medium", "Low")
+OFFLINE_STREAM_CHUNKS = 12
+OFFLINE_CATEGORIES = ("Work", "Private", "Shopping", "General")
+
+
+class OfflineProvider(AIProvider):
+    """
+    Gleicher Prompt -> gleiche Antwort (abgeleitet aus dem Hash des Prompts).
+    Latenz = latency_ms +/- jitter_ms, Fehler mit Wahrscheinlichkeit error_rate;
+    beides aus einem Zufallsgenerator mit festem Seed, damit Läufe vergleichbar sind.
+    """
+    name = "offline"
+    model = "offline"
+
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+    def build_text(self, prompt: str, kind: str) -> str:
+        if kind == "decompose_batch":
+            line = next(line for line in prompt.splitlines() if BATCH_ITEMS_MARKER in line)
+            items = json.loads(line.split(BATCH_ITEMS_MARKER, 1)[1])
+            return json.dumps([
+                {"id": item["id"], "tasks": json.loads(self.build_text(item["projekt"], "decompose"))}
+                for item in items
+            ], ensure_ascii=False)
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        if kind == "decompose":
+            count = 3 + digest[0] % 4
+            start = digest[1] % len(OFFLINE_TASK_TITLES)
+            tasks = [
+                {
+                    "title": OFFLINE_TASK_TITLES[(start + i) % len(OFFLINE_TASK_TITLES)],
+                    "estimated_time": f"{1 + digest[2 + i] % 8}h",
+                }
+                for i in range(count)
+            ]
+            return json.dumps(tasks, ensure_ascii=False)
+        return json.dumps({
+            "summary": OFFLINE_TASK_TITLES[digest[1] % len(OFFLINE_TASK_TITLES)],
+            "description": "Offline generierter Vorschlag",
+            "priority": OFFLINE_PRIORITIES[digest[2] % len(OFFLINE_PRIORITIES)],
+            "category": OFFLINE_CATEGORIES[digest[3] % len(OFFLINE_CATEGORIES)],
+        }, ensure_ascii=False)
+
+    def _response(self, prompt: str, kind: str, fail: bool) -> AIResponse:
+        if fail:
+            raise AIProviderError("Offline provider: simulated error")
+        text = self.build_text(prompt, kind)
+        # Grobe Schätzung wie bei echten Modellen (~4 Zeichen pro Token)
+        return AIResponse(text=text, model=self.model, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+
+    def generate(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        delay, fail = self._draw()
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Offline provider: {delay:.2f}s exceeds timeout {timeout}s")
+        time.sleep(delay)
+        return self._response(prompt, kind, fail)
+
+    async def generate_async(self, prompt: str, kind: str, timeout: float) -> AIResponse:
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        return self._response(prompt, kind, fail)
+
+    async def stream_async(self, prompt: str, kind: str, timeout: float) -> AsyncIterator[str]:
+        # Gleiche Gesamtlatenz wie generate_async, aber in Stücken verteilt (wie ein echtes Modell)
+        delay, fail = self._draw()
+        text = self.build_text(prompt, kind)
+        pieces = max(1, min(OFFLINE_STREAM_CHUNKS, len(text)))
+        size = -(-len(text) // pieces)
+        for i in range(0, len(text), size):
+            await asyncio.sleep(delay / pieces)
+            if fail and i >= len(text) // 2:
+                raise AIProviderError("Offline provider: simulated error mid-stream")
+            yield text[i:i + size]
+
+
+# =================================================================
+# Auswahl
+# =================================================================
+
+_provider: Optional[AIProvider] = None
+
+
+def build_provider(name: str) -> AIProvider:
+    if name == "gemini":
+        return GeminiProvider(api_key=settings.gemini_api_key, model=settings.ai_model)
+    if name == "offline":
+        return OfflineProvider(
+            latency_ms=settings.ai_offline_latency_ms,
+            jitter_ms=settings.ai_offline_jitter_ms,
+            error_rate=settings.ai_offline_error_rate,
+            seed=settings.ai_offline_seed,
+        )
+    raise ValueError(f"Unknown AI provider: {name!r} (expected 'gemini' or 'offline')")
+
+
+def get_provider() -> AIProvider:
+    global _provider
+    if _provider is None:
+        _provider = build_provider(settings.ai_provider)
+    return _provider
+
+
+def set_provider(provider: Optional[AIProvider]):
+    """Provider austauschen (Tests, Benchmarks). None -> wieder aus den Settings."""
+    global _provider
+    _provider = provider
@@ -1,31 +1,45 @@
-import os
+import copy
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
+import asyncio
+import threading
+import time
+from typing import AsyncIterator
+from app import metrics
+from app.config import settings
+from app.services.ai_cache import ai_cache, cache_key, CACHE_DEFAULT, CACHE_REFRESH, CACHE_BYPASS
+from app.services.ai_providers import get_provider, is_quota_error, OfflineProvider, BATCH_ITEMS_MARKER
+from app.services.ai_telemetry import current_trace, new_trace, record_call, record_parse_problem, record_result
+from app.services.json_stream import JSONArrayStreamParser
+from app.services.resilience import CircuitBreaker, TokenBucket
+from app.services.single_flight import SingleFlight, AsyncSingleFlight
 
-# .env laden
-load_dotenv()
 
-# API Key holen
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("❌ WARNUNG: Kein GEMINI_API_KEY gefunden! ")
+# Hochzählen, sobald sich ein Prompt-Template ändert -> alte Cache-Einträge gelten nicht mehr
+PROMPT_VERSION = 1
 
-# Gemini konfigurieren
-genai.configure(api_key=api_key)
+# Mehr Tasks pro Projekt nehmen wir von der KI nicht an
+MAX_TASKS_PER_PROJECT = 10
 
 
-def analyze_task_with_ai(text_input: str):
-    """
-    Nimmt eine Projektbeschreibung (z.B. "Urlaub planen")
-    und liefert eine LISTE von Aufgaben zurück.
-    """
-    try:
-        #model = genai.GenerativeModel("gemini-2.0-flash-exp")
-        model = genai.GenerativeModel("gemini-flash-latest")
+class AIServiceError(Exception):
+    """KI-Aufruf fehlgeschlagen, abgelehnt oder Zeitlimit überschritten."""
+
+
+class AIUnavailableError(AIServiceError):
+    """Provider gesperrt (Circuit-Breaker offen) oder Rate-Limit erschöpft -> gar nicht erst aufgerufen."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 
-        # Der Prompt zwingt die KI, eine saubere Liste zu liefern
-        prompt = f"""
+# =================================================================
+# Prompts
+# =================================================================
+
+def build_decompose_prompt(text_input: str) -> str:
+    # Der Prompt zwingt die KI, eine saubere Liste zu liefern
+    return f"""
         Du bist ein erfahrener Projektmanager.
         Zerlege das folgende Projekt in 3 bis 6 konkrete Einzelaufgaben (Tasks).
 
@@ -42,29 +56,610 @@ def analyze_task_with_ai(text_input: str):
         Kein Markdown, kein Text davor oder danach. Nur das JSON-Array.
         """
 
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
 
-        # Markdown-Code-Blöcke entfernen, falls Gemini welche macht
-        if raw_text.startswith("```json"):
-            raw_text = raw_text[7:]
-        if raw_text.startswith("```"):
-            raw_text = raw_text[3:]
-        if raw_text.endswith("```"):
-            raw_text = raw_text[:-3]
+def build_suggest_prompt(text_input: str) -> str:
+    return f"""
+        Du bist ein erfahrener Projektmanager.
+        Mach aus der folgenden Notiz GENAU EINE Aufgabe (Task).
+
+        Notiz: "{text_input}"
+
+        Antworte AUSSCHLIESSLICH mit gültigem JSON in diesem Format (ein einzelnes Objekt):
+        {{
+            "summary": "Kurzer Titel der Aufgabe",
+            "description": "Ein bis zwei Sätze, was zu tun ist",
+            "priority": "High | Medium | Low",
+            "category": "Kategorie (z.B. Work, Private, Shopping)"
+        }}
+        Kein Markdown, kein Text davor oder danach. Nur das JSON-Objekt.
+        """
+
+
+def build_batch_decompose_prompt(items: list) -> str:
+    """items: Liste von (id, Projektbeschreibung). Die ids kommen in der Antwort zurück."""
+    projects = json.dumps([{"id": item_id, "projekt": text} for item_id, text in items], ensure_ascii=False)
+    return f"""
+        Du bist ein erfahrener Projektmanager.
+        Zerlege JEDES der folgenden Projekte in 3 bis 6 konkrete Einzelaufgaben (Tasks).
+
+        {BATCH_ITEMS_MARKER} {projects}
+
+        Antworte AUSSCHLIESSLICH mit gültigem JSON in diesem Format (ein Eintrag pro Projekt, gleiche id):
+        [
+            {{
+                "id": "id des Projekts",
+                "tasks": [
+                    {{
+                        "title": "Titel der Aufgabe",
+                        "estimated_time": "Geschätzte Dauer (z.B. 2h)"
+                    }},
+                    ...
+                ]
+            }},
+            ...
+        ]
+        Kein Markdown, kein Text davor oder danach. Nur das JSON-Array.
+        """
+
+
+def parse_ai_json(raw_text: str, kind: str = "unknown"):
+    raw_text = raw_text.strip()
+
+    # Markdown-Code-Blöcke entfernen, falls Gemini welche macht
+    fenced = raw_text.startswith("```") or raw_text.endswith("```")
+    if raw_text.startswith("```json"):
+        raw_text = raw_text[7:]
+    if raw_text.startswith("```"):
+        raw_text = raw_text[3:]
+    if raw_text.endswith("```"):
+        raw_text = raw_text[:-3]
+    if fenced:
+        record_parse_problem(kind, "markdown_fence")
+
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        record_parse_problem(kind, "invalid_json")
+        raise
+
+
+def _as_task_list(data) -> list:
+    # Sicherheits-Check: Ist es wirklich eine Liste?
+    if isinstance(data, list):
+        print(f"✅ KI hat {len(data)} Aufgaben generiert.")
+        return data
+    print("⚠️ KI hat keine Liste zurückgegeben. Packe es in eine Liste.")
+    record_parse_problem("decompose", "not_a_list")
+    return [data]  # Notfall-Lösung
 
-        # JSON parsen
-        tasks_list = json.loads(raw_text)
 
-        # Sicherheits-Check: Ist es wirklich eine Liste?
-        if isinstance(tasks_list, list):
-            print(f"✅ KI hat {len(tasks_list)} Aufgaben generiert.")
-            return tasks_list
-        else:
-            print("⚠️ KI hat keine Liste zurückgegeben. Packe es in eine Liste.")
-            return [tasks_list]  # Notfall-Lösung
+def validate_task(t_data):
+    """Ein Task der KI mit Titel -> normalisiertes Dict, sonst None."""
+    if not isinstance(t_data, dict) or not str(t_data.get("title") or "").strip():
+        return None
+    return {"title": str(t_data["title"]).strip(), "estimated_time": t_data.get("estimated_time")}
 
+
+def validate_task_list(data):
+    """Gültige Task-Liste (1-10 Einträge, jeder mit Titel) oder None."""
+    if not isinstance(data, list) or not 1 <= len(data) <= MAX_TASKS_PER_PROJECT:
+        return None
+    tasks = [validate_task(t_data) for t_data in data]
+    return None if None in tasks else tasks
+
+
+def _as_suggestion(data, text_input: str) -> dict:
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return {
+        "summary": str(data.get("summary") or data.get("title") or text_input[:80]),
+        "description": str(data.get("description") or ""),
+        "priority": str(data.get("priority") or "Medium"),
+        "category": str(data.get("category") or "General"),
+    }
+
+
+def _fallback_task_list() -> list:
+    return [{"title": "KI-Fehler: Bitte manuell prüfen", "estimated_time": "0h"}]
+
+
+def _fallback_suggestion(text_input: str) -> dict:
+    return {"summary": text_input[:80] or "Neuer Task", "description": text_input,
+            "priority": "Medium", "category": "General"}
+
+
+# =================================================================
+# KI-Aufruf: synchron (Threadpool-Routen) und async (Event-Loop)
+# Woher die Antwort kommt, entscheidet der Provider (ai_providers.py).
+# Beide Wege sind pro Worker auf ai_max_concurrency gleichzeitige
+# Aufrufe begrenzt und haben ein Zeitlimit (ai_timeout_seconds).
+# =================================================================
+
+_sync_slots = threading.BoundedSemaphore(settings.ai_max_concurrency)
+_async_slots: dict = {}
+
+
+def _async_limiter() -> asyncio.Semaphore:
+    # Ein Semaphor pro Event-Loop (Tests/Skripte starten eigene Loops)
+    loop = asyncio.get_running_loop()
+    semaphore = _async_slots.get(loop)
+    if semaphore is None:
+        _async_slots.clear()
+        semaphore = _async_slots[loop] = asyncio.Semaphore(settings.ai_max_concurrency)
+    return semaphore
+
+
+# =================================================================
+# Schutz bei Provider-Störungen (siehe app/services/resilience.py):
+# Breaker offen oder Rate-Limit erschöpft -> AIUnavailableError sofort,
+# ohne Slot und ohne Zeitlimit abzuwarten.
+# =================================================================
+
+ai_breaker = CircuitBreaker(
+    "ai",
+    failure_threshold=settings.ai_breaker_failure_threshold,
+    recovery_seconds=settings.ai_breaker_recovery_seconds,
+    half_open_probes=settings.ai_breaker_half_open_probes,
+)
+ai_rate_limiter = TokenBucket("ai", rate_per_minute=settings.ai_rate_limit_per_minute,
+                              burst=settings.ai_rate_limit_burst)
+
+
+def _admit(kind: str, provider_name: str, started: float) -> float:
+    """Darf der Aufruf raus? Liefert die Wartezeit bis zum Rate-Limit-Token."""
+    error = None
+    if not ai_breaker.allow():
+        error = AIUnavailableError("AI provider unavailable (circuit open)", ai_breaker.retry_after())
+    else:
+        wait = ai_rate_limiter.reserve(settings.ai_rate_limit_max_wait_seconds)
+        if wait is not None:
+            return wait
+        ai_breaker.release()
+        error = AIUnavailableError("AI rate limit exceeded", ai_rate_limiter.retry_after())
+    record_call(kind, provider_name, "unavailable", started, error=error)
+    raise error
+
+
+def _judge(outcome: str, error: BaseException | None):
+    """Ausgang eines Provider-Aufrufs an Breaker und Rate-Limit melden."""
+    if outcome == "ok":
+        ai_breaker.record_success()
+        ai_rate_limiter.reward()
+    elif outcome in ("timeout", "error"):
+        if error is not None and is_quota_error(error):
+            ai_rate_limiter.penalize()
+        ai_breaker.record_failure()
+    else:
+        # Abgebrochen/abgewiesen: sagt nichts über den Provider
+        ai_breaker.release()
+
+
+def generate_text(prompt: str, kind: str, timeout: float | None = None) -> str:
+    """Synchroner Aufruf. Nur aus Sync-Routen / Skripten, nie aus dem Event-Loop!"""
+    timeout = timeout or settings.ai_timeout_seconds
+    provider = get_provider()
+    started = time.perf_counter()
+    wait = _admit(kind, provider.name, started)
+    if wait:
+        time.sleep(wait)
+    if not _sync_slots.acquire(timeout=timeout):
+        error = AIServiceError("Too many concurrent AI requests")
+        _judge("rejected", error)
+        record_call(kind, provider.name, "rejected", started, slot_wait=time.perf_counter() - started, error=error)
+        raise error
+    slot_wait = time.perf_counter() - started
+    outcome, response, error = "error", None, None
+    try:
+        response = provider.generate(prompt, kind, timeout)
+        outcome = "ok"
+        return response.text
+    except TimeoutError as e:
+        outcome, error = "timeout", e
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _sync_slots.release()
+        _judge(outcome, error)
+        record_call(kind, provider.name, outcome, started, slot_wait=slot_wait, response=response, error=error)
+
+
+async def generate_text_async(prompt: str, kind: str, timeout: float | None = None) -> str:
+    """
+    Async-Aufruf. Das Zeitlimit gilt inkl. Warten auf einen freien Slot;
+    bei Timeout oder Abbruch des Requests wird der Aufruf gecancelt.
+    Kein Slot frei -> "rejected" (zählt nicht gegen den Breaker, wie im Sync-Pfad).
+    """
+    timeout = timeout or settings.ai_timeout_seconds
+    provider = get_provider()
+    started = time.perf_counter()
+    wait = _admit(kind, provider.name, started)
+    loop = asyncio.get_running_loop()
+    limiter = _async_limiter()
+    try:
+        if wait:
+            await asyncio.sleep(wait)
+        deadline = loop.time() + timeout
+        await asyncio.wait_for(limiter.acquire(), timeout)
+    except asyncio.TimeoutError:
+        error = AIServiceError("Too many concurrent AI requests")
+        _judge("rejected", error)
+        record_call(kind, provider.name, "rejected", started, slot_wait=time.perf_counter() - started, error=error)
+        raise error
+    except asyncio.CancelledError:
+        _judge("cancelled", None)
+        record_call(kind, provider.name, "cancelled", started)
+        raise
+    slot_wait = time.perf_counter() - started
+
+    outcome, response, error = "error", None, None
+    try:
+        response = await asyncio.wait_for(provider.generate_async(prompt, kind, timeout),
+                                          timeout=max(deadline - loop.time(), 0))
+        outcome = "ok"
+        return response.text
+    except asyncio.TimeoutError as e:
+        outcome, error = "timeout", e
+        raise AIServiceError(f"AI request timed out after {timeout}s")
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
     except Exception as e:
-        print(f"❌ Fehler im KI-Service: {e}")
+        error = e
+        raise
+    finally:
+        limiter.release()
+        _judge(outcome, error)
+        record_call(kind, provider.name, outcome, started, slot_wait=slot_wait, response=response, error=error)
+
+
+# =================================================================
+# Aufruf mit Cache davor (siehe app/services/ai_cache.py)
+# Gleichzeitige identische Anfragen teilen sich einen Gemini-Aufruf
+# (Single-Flight, gleicher Schlüssel wie der Cache). Fallback-Ergebnisse
+# werden nie gecacht.
+# =================================================================
+
+AI_REQUESTS_COALESCED = metrics.counter(
+    "ai_requests_coalesced_total", "AI requests answered by an identical in-flight call", ["kind"])
+
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+metrics.gauge("ai_requests_in_flight", "Distinct AI calls currently running (after de-duplication)",
+              callback=lambda: {(): _flights.in_flight() + _async_flights.in_flight()})
+
+
+def ai_cache_key(kind: str, text_input: str) -> str:
+    return cache_key(kind, text_input, get_provider().model, PROMPT_VERSION)
+
+
+def _flight_key(key: str, cache_mode: str):
+    # no-store-Aufrufe dürfen kein Ergebnis in den Cache schreiben -> eigene Gruppe
+    return key, cache_mode == CACHE_BYPASS
+
+
+_degraded_provider = OfflineProvider(latency_ms=0, jitter_ms=0, error_rate=0, seed=0)
+
+
+def _degraded_answer(kind, text_input, build_prompt, convert):
+    """Ersatzantwort, solange der Provider gesperrt ist (ai_degraded_mode), sonst None. Wird nie gecacht."""
+    if settings.ai_degraded_mode != "offline":
+        return None
+    return convert(parse_ai_json(_degraded_provider.build_text(build_prompt(text_input), kind), kind))
+
+
+def _run(kind, text_input, build_prompt, convert, fallback, cache_mode):
+    new_trace()
+    key = ai_cache_key(kind, text_input)
+    if cache_mode == CACHE_DEFAULT:
+        cached = ai_cache.get(kind, key)
+        if cached is not None:
+            record_result(kind, "cache")
+            return cached
+
+    def call():
+        result = convert(parse_ai_json(generate_text(build_prompt(text_input), kind), kind))
+        if cache_mode != CACHE_BYPASS:
+            ai_cache.put(kind, key, result)
+        return result
+
+    try:
+        result, shared = _flights.do(_flight_key(key, cache_mode), call)
+    except AIUnavailableError as e:
+        # Gesperrt: lieber ein (bei no-cache eigentlich unerwünschter) Cache-Treffer als ein Platzhalter
+        cached = ai_cache.get(kind, key) if cache_mode == CACHE_REFRESH else None
+        if cached is not None:
+            record_result(kind, "cache")
+            return cached
+        degraded = _degraded_answer(kind, text_input, build_prompt, convert)
+        record_result(kind, "fallback" if degraded is None else "degraded")
+        print(f"⚡ KI-Service [{current_trace()}] gesperrt: {e}")
+        return fallback() if degraded is None else degraded
+    except Exception as e:
+        print(f"❌ Fehler im KI-Service [{current_trace()}]: {e}")
+        record_result(kind, "fallback")
         # Fallback, damit nichts abstürzt
-        return [{"title": "KI-Fehler: Bitte manuell prüfen", "estimated_time": "0h"}]
\ No newline at end of file
+        return fallback()
+    if shared:
+        AI_REQUESTS_COALESCED.inc(kind=kind)
+    record_result(kind, "coalesced" if shared else "model")
+    return result
+
+
+async def _run_async(kind, text_input, build_prompt, convert, fallback, cache_mode, strict):
+    new_trace()
+    key = ai_cache_key(kind, text_input)
+    if cache_mode == CACHE_DEFAULT:
+        cached = await ai_cache.get_async(kind, key)
+        if cached is not None:
+            record_result(kind, "cache")
+            return cached
+
+    async def call():
+        result = convert(parse_ai_json(await generate_text_async(build_prompt(text_input), kind), kind))
+        if cache_mode != CACHE_BYPASS:
+            await ai_cache.put_async(kind, key, result)
+        return result
+
+    try:
+        result, shared = await _async_flights.do(_flight_key(key, cache_mode), call)
+    except AIUnavailableError as e:
+        if strict:
+            # Jobs warten lieber (retry_after) als Ersatz-Tasks anzulegen
+            record_result(kind, "error")
+            raise
+        cached = await ai_cache.get_async(kind, key) if cache_mode == CACHE_REFRESH else None
+        if cached is not None:
+            record_result(kind, "cache")
+            return cached
+        degraded = _degraded_answer(kind, text_input, build_prompt, convert)
+        record_result(kind, "fallback" if degraded is None else "degraded")
+        print(f"⚡ KI-Service [{current_trace()}] gesperrt: {e}")
+        return fallback() if degraded is None else degraded
+    except Exception as e:
+        if strict:
+            record_result(kind, "error")
+            if isinstance(e, AIServiceError):
+                raise
+            raise AIServiceError(str(e)) from e
+        print(f"❌ Fehler im KI-Service [{current_trace()}]: {e}")
+        record_result(kind, "fallback")
+        return fallback()
+    if shared:
+        AI_REQUESTS_COALESCED.inc(kind=kind)
+    record_result(kind, "coalesced" if shared else "model")
+    return result
+
+
+# =================================================================
+# Öffentliche API
+# cache_mode: CACHE_DEFAULT, CACHE_REFRESH (nicht lesen) oder
+# CACHE_BYPASS (gar nicht), z.B. per cache_mode_from_headers(request.headers)
+# =================================================================
+
+def analyze_task_with_ai(text_input: str, cache_mode: str = CACHE_DEFAULT):
+    """
+    Nimmt eine Projektbeschreibung (z.B. "Urlaub planen")
+    und liefert eine LISTE von Aufgaben zurück.
+    """
+    return _run("decompose", text_input, build_decompose_prompt, _as_task_list,
+                _fallback_task_list, cache_mode)
+
+
+async def analyze_task_with_ai_async(text_input: str, strict: bool = False, cache_mode: str = CACHE_DEFAULT):
+    """Async-Variante von analyze_task_with_ai (blockiert den Event-Loop nicht).
+    strict=True wirft AIServiceError statt die Fallback-Liste zu liefern."""
+    return await _run_async("decompose", text_input, build_decompose_prompt, _as_task_list,
+                            _fallback_task_list, cache_mode, strict)
+
+
+def suggest_task_with_ai(text_input: str, cache_mode: str = CACHE_DEFAULT) -> dict:
+    """
+    Macht aus einem Satz EINEN Task-Vorschlag
+    (summary, description, priority, category).
+    """
+    return _run("suggest", text_input, build_suggest_prompt,
+                lambda data: _as_suggestion(data, text_input),
+                lambda: _fallback_suggestion(text_input), cache_mode)
+
+
+async def suggest_task_with_ai_async(text_input: str, strict: bool = False, cache_mode: str = CACHE_DEFAULT) -> dict:
+    """Async-Variante von suggest_task_with_ai."""
+    return await _run_async("suggest", text_input, build_suggest_prompt,
+                            lambda data: _as_suggestion(data, text_input),
+                            lambda: _fallback_suggestion(text_input), cache_mode, strict)
+
+
+# =================================================================
+# Batch: mehrere Projektbeschreibungen in EINEM Modell-Aufruf
+# =================================================================
+
+AI_BATCH_ITEMS = metrics.counter("ai_batch_items_total", "Items of batched AI decompositions", ["source"])
+
+
+async def _decompose_chunk(chunk: list) -> dict:
+    """Ein Aufruf für einen Block (id, text). Gibt {id: gültige Task-Liste} zurück; ungültige fehlen."""
+    try:
+        data = parse_ai_json(
+            await generate_text_async(build_batch_decompose_prompt(chunk), "decompose_batch"), "decompose_batch")
+    except Exception as e:
+        print(f"⚠️ KI-Batch mit {len(chunk)} Projekten fehlgeschlagen: {e}")
+        return {}
+    if not isinstance(data, list):
+        record_parse_problem("decompose_batch", "not_a_list")
+        return {}
+    valid = {}
+    expected = {item_id for item_id, _ in chunk}
+    for entry in data:
+        if not isinstance(entry, dict) or str(entry.get("id")) not in expected:
+            continue
+        tasks = validate_task_list(entry.get("tasks"))
+        if tasks is None:
+            record_parse_problem("decompose_batch", "invalid_item")
+            continue
+        valid[str(entry["id"])] = tasks
+    return valid
+
+
+async def analyze_tasks_batch_async(texts: list, cache_mode: str = CACHE_DEFAULT) -> list:
+    """
+    Zerlegt mehrere Projekte auf einmal. Ergebnis in derselben Reihenfolge wie texts:
+    je Eintrag eine Task-Liste oder eine AIServiceError-Instanz (wie gather(return_exceptions=True)).
+
+    - Cache-Treffer und doppelte Beschreibungen kosten keinen Platz im Prompt
+    - Blöcke von ai_batch_max_items Projekten pro Aufruf
+    - Einträge, die in der Batch-Antwort fehlen oder ungültig sind, werden einzeln nachgefragt
+    - gültige Ergebnisse landen unter demselben Schlüssel im Cache wie Einzelaufrufe
+    """
+    new_trace()
+    results: list = [None] * len(texts)
+    pending = {}   # Cache-Schlüssel -> (id, text, [Positionen])
+    for position, text_input in enumerate(texts):
+        key = ai_cache_key("decompose", text_input)
+        if key in pending:
+            pending[key][2].append(position)
+            continue
+        cached = await ai_cache.get_async("decompose", key) if cache_mode == CACHE_DEFAULT else None
+        if cached is not None:
+            results[position] = cached
+            AI_BATCH_ITEMS.inc(source="cache")
+            record_result("decompose", "cache")
+            continue
+        pending[key] = (str(len(pending) + 1), text_input, [position])
+
+    items = list(pending.items())
+    size = max(1, settings.ai_batch_max_items)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    answers = await asyncio.gather(*[
+        _decompose_chunk([(item_id, text_input) for _, (item_id, text_input, _) in chunk]) for chunk in chunks
+    ])
+
+    retry = []
+    for chunk, valid in zip(chunks, answers):
+        for key, (item_id, text_input, positions) in chunk:
+            tasks = valid.get(item_id)
+            if tasks is None:
+                retry.append((key, text_input, positions))
+                continue
+            AI_BATCH_ITEMS.inc(source="batch")
+            record_result("decompose", "batch")
+            if cache_mode != CACHE_BYPASS:
+                await ai_cache.put_async("decompose", key, tasks)
+            for position in positions:
+                results[position] = copy.deepcopy(tasks)
+
+    # Nur was im Batch nicht geklappt hat, einzeln nachfragen
+    async def single(text_input):
+        try:
+            return await analyze_task_with_ai_async(text_input, strict=True, cache_mode=cache_mode)
+        except AIServiceError as e:
+            return e
+
+    singles = await asyncio.gather(*[single(text_input) for _, text_input, _ in retry])
+    for (_, _, positions), result in zip(retry, singles):
+        AI_BATCH_ITEMS.inc(source="fallback")
+        for position in positions:
+            results[position] = copy.deepcopy(result) if isinstance(result, list) else result
+    return results
+
+
+# =================================================================
+# Streaming: jeder Task kommt, sobald sein JSON-Objekt vollständig ist
+# =================================================================
+
+async def stream_task_list_async(text_input: str, cache_mode: str = CACHE_DEFAULT) -> AsyncIterator[dict]:
+    """
+    Wie analyze_task_with_ai_async(strict=True), aber als Async-Iterator.
+    Cache-Treffer kommen sofort. Das Zeitlimit gilt für den ganzen Stream;
+    Fehler -> AIServiceError (auch nachdem schon Tasks geliefert wurden).
+    Kein Single-Flight: ein Stream gehört genau einem Job.
+    """
+    new_trace()
+    key = ai_cache_key("decompose", text_input)
+    if cache_mode == CACHE_DEFAULT:
+        cached = await ai_cache.get_async("decompose", key)
+        if cached is not None:
+            record_result("decompose", "cache")
+            for task in cached:
+                yield task
+            return
+
+    timeout = settings.ai_timeout_seconds
+    provider = get_provider()
+    started = time.perf_counter()
+    try:
+        wait = _admit("decompose", provider.name, started)
+    except AIUnavailableError:
+        record_result("decompose", "error")
+        raise
+    try:
+        if wait:
+            await asyncio.sleep(wait)
+    except BaseException:
+        ai_breaker.release()
+        raise
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    limiter = _async_limiter()
+    try:
+        await asyncio.wait_for(limiter.acquire(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        _judge("rejected", e)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        record_call("decompose", provider.name, "timeout", started, slot_wait=time.perf_counter() - started, error=e)
+        record_result("decompose", "error")
+        raise AIServiceError(f"AI request timed out after {timeout}s")
+    slot_wait = time.perf_counter() - started
+
+    tasks = []
+    parser = JSONArrayStreamParser()
+    # Kein AIResponse beim Streamen -> keine Token-Zahlen für diesen Weg
+    stream = provider.stream_async(build_decompose_prompt(text_input), "decompose", timeout)
+    outcome, error = "error", None
+    try:
+        while not parser.closed and len(tasks) < MAX_TASKS_PER_PROJECT:
+            remaining = deadline - loop.time()
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), max(remaining, 0))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError as e:
+                outcome, error = "timeout", e
+                raise AIServiceError(f"AI request timed out after {timeout}s")
+            for t_data in parser.feed(chunk):
+                task = validate_task(t_data)
+                if task is None:
+                    record_parse_problem("decompose", "invalid_item")
+                elif len(tasks) < MAX_TASKS_PER_PROJECT:
+                    tasks.append(task)
+                    yield task
+        outcome = "ok"
+    except AIServiceError as e:
+        error = error or e
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        error = e
+        raise AIServiceError(str(e)) from e
+    finally:
+        limiter.release()
+        await stream.aclose()
+        _judge(outcome, error)
+        record_call("decompose", provider.name, outcome, started, slot_wait=slot_wait, error=error)
+        if outcome != "ok" and outcome != "cancelled":
+            record_result("decompose", "error")
+
+    if not tasks:
+        if not parser.closed:
+            record_parse_problem("decompose", "invalid_json")
+        record_result("decompose", "error")
+        raise AIServiceError("AI returned no usable tasks")
+    record_result("decompose", "model")
+    print(f"✅ KI hat {len(tasks)} Aufgaben gestreamt.")
+    # Nur vollständige Antworten cachen
+    if parser.closed and cache_mode != CACHE_BYPASS:
+        await ai_cache.put_async("decompose", key, tasks)
@@ -0,0 +1,106 @@
+"""
+Messwerte rund um die KI-Aufrufe (Ausgabe unter /internal/metrics).
+
+- ai_calls_total / ai_call_duration_seconds: jeder Provider-Aufruf nach
+  Art, Provider und Ausgang (ok, timeout, rejected, error, cancelled)
+- ai_call_slot_wait_seconds: Wartezeit auf einen freien Slot (ai_max_concurrency)
+- ai_tokens_total: Prompt- und Antwort-Tokens laut Provider
+- ai_parse_problems_total: Markdown-Zäune, kaputtes JSON, falsche Form
+- ai_results_total: woher das Ergebnis kam (model, cache, coalesced, fallback, error)
+  -> daraus z.B. die Fallback-Quote
+
+Jeder Aufruf bekommt eine Trace-ID (contextvar). Cache-Lookup, Modellaufruf,
+Parsen und Fallback derselben Anfrage tragen dieselbe ID; die letzten
+Aufrufe liegen in einem Ringpuffer (/internal/ai-calls).
+"""
+import contextvars
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+from app import metrics
+
+# Modellaufrufe dauern Sekunden, nicht Millisekunden
+AI_DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+RECENT_CALLS_MAX = 200
+
+AI_CALLS = metrics.counter("ai_calls_total", "AI provider calls by outcome", ["kind", "provider", "outcome"])
+AI_CALL_SECONDS = metrics.histogram(
+    "ai_call_duration_seconds", "Latency of an AI provider call incl. slot wait", ["kind", "provider", "outcome"],
+    buckets=AI_DURATION_BUCKETS)
+AI_SLOT_WAIT_SECONDS = metrics.histogram(
+    "ai_call_slot_wait_seconds", "Time spent waiting for a free AI concurrency slot", ["kind"])
+AI_TOKENS = metrics.counter("ai_tokens_total", "Tokens reported by the AI provider", ["kind", "type"])
+AI_PARSE_PROBLEMS = metrics.counter(
+    "ai_parse_problems_total", "AI answers that needed repair or could not be used", ["kind", "problem"])
+AI_RESULTS = metrics.counter("ai_results_total", "AI service results by source", ["kind", "source"])
+
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("ai_trace_id", default=None)
+_recent = deque(maxlen=RECENT_CALLS_MAX)
+_recent_lock = threading.Lock()
+
+
+def new_trace() -> str:
+    """Neue Trace-ID für eine KI-Anfrage (gilt im aktuellen Kontext weiter)."""
+    trace_id = uuid.uuid4().hex[:12]
+    _trace_id.set(trace_id)
+    return trace_id
+
+
+def current_trace() -> str:
+    return _trace_id.get() or new_trace()
+
+
+def record_call(kind: str, provider: str, outcome: str, started: float, slot_wait: Optional[float] = None,
+                response=None, error: Optional[BaseException] = None):
+    """Einen Provider-Aufruf verbuchen. started = time.perf_counter() vor dem Slot-Warten."""
+    duration = time.perf_counter() - started
+    AI_CALLS.inc(kind=kind, provider=provider, outcome=outcome)
+    AI_CALL_SECONDS.observe(duration, kind=kind, provider=provider, outcome=outcome)
+    if slot_wait is not None:
+        AI_SLOT_WAIT_SECONDS.observe(slot_wait, kind=kind)
+
+    prompt_tokens = getattr(response, "prompt_tokens", None)
+    output_tokens = getattr(response, "output_tokens", None)
+    if prompt_tokens:
+        AI_TOKENS.inc(prompt_tokens, kind=kind, type="prompt")
+    if output_tokens:
+        AI_TOKENS.inc(output_tokens, kind=kind, type="output")
+
+    call = {
+        "trace_id": current_trace(),
+        "at": time.time(),
+        "kind": kind,
+        "provider": provider,
+        "model": getattr(response, "model", None),
+        "outcome": outcome,
+        "duration_ms": round(duration * 1000, 1),
+        "slot_wait_ms": round(slot_wait * 1000, 1) if slot_wait is not None else None,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "error": str(error)[:300] if error is not None else None,
+    }
+    with _recent_lock:
+        _recent.append(call)
+    if outcome != "ok":
+        print(f"⚠️ KI-Aufruf [{call['trace_id']}] {kind}/{provider}: {outcome} nach {call['duration_ms']:.0f}ms"
+              + (f" ({call['error']})" if call["error"] else ""))
+
+
+def record_parse_problem(kind: str, problem: str):
+    """problem: markdown_fence, invalid_json, not_a_list, invalid_item"""
+    AI_PARSE_PROBLEMS.inc(kind=kind, problem=problem)
+
+
+def record_result(kind: str, source: str):
+    """source: model, cache, coalesced, fallback, error"""
+    AI_RESULTS.inc(kind=kind, source=source)
+
+
+def recent_calls(limit: int = 50) -> list:
+    """Die letzten Provider-Aufrufe, neueste zuerst."""
+    with _recent_lock:
+        calls = list(_recent)
+    return calls[::-1][:limit]
@@ -0,0 +1,52 @@
+"""
+Board-Events auf dem Änderungs-Feed (Kanal "project:<id>").
+
+    task            Task angelegt/geändert/verschoben; fertiges Karten-HTML +
+                    previous_status (None = neu), damit das Board die Zähler anpasst
+    task_deleted    {id, status}
+    job             Status/Fortschritt eines KI-Jobs
+    project_deleted Board schließen
+
+Das HTML wird beim Veröffentlichen einmal gerendert, nicht pro Verbindung.
+"""
+from typing import Optional
+
+from app.services.change_feed import change_feed
+from app.templating import env
+
+
+def project_channel(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+def render_task_card(task) -> str:
+    return env.get_template("partials/task_card.html").render(task=task)
+
+
+def job_event(job) -> dict:
+    return {
+        "id": job.id, "status": job.status, "progress": job.progress, "attempts": job.attempts,
+        "max_attempts": job.max_attempts, "tasks_created": job.tasks_created, "error": job.error,
+    }
+
+
+def publish_task(task, previous_status: Optional[str] = None):
+    if task.project_id is None:
+        return
+    change_feed.publish(project_channel(task.project_id), "task", {
+        "id": task.id, "status": task.status, "previous_status": previous_status, "html": render_task_card(task),
+    })
+
+
+def publish_task_deleted(project_id: Optional[int], task_id: int, status: str):
+    if project_id is None:
+        return
+    change_feed.publish(project_channel(project_id), "task_deleted", {"id": task_id, "status": status})
+
+
+def publish_job(job):
+    change_feed.publish(project_channel(job.project_id), "job", job_event(job))
+
+
+def publish_project_deleted(project_id: int):
+    change_feed.publish(project_channel(project_id), "project_deleted", {"id": project_id})
@@ -0,0 +1,272 @@
+"""
+Änderungs-Feed pro Kanal (z.B. "project:7"): Routen und Job-Runner
+veröffentlichen, offene Boards lesen per Server-Sent Events mit.
+
+Lesen funktioniert wie Long-Polling: read(channel, after, timeout) liefert
+alle Events nach der ID `after` (wartet bis zu timeout Sekunden auf neue),
+[] bei Timeout und None, wenn `after` zu alt oder unbekannt ist (Events
+schon verworfen, anderer Prozess-Lauf) -> der Client muss neu laden.
+cursor(channel) ist die ID des letzten Events im Kanal; wer danach liest,
+verpasst nichts. Ohne neue Events bleibt der Cursor gleich (das Board-HTML
+und damit sein ETag auch).
+
+Backends (settings.change_feed_backend):
+- "memory": im Prozess, Ringpuffer pro Kanal. Nur mit einem Worker-Prozess.
+- "redis":  Redis Streams (XADD/XREAD) für mehrere Worker; braucht das Paket redis.
+
+publish() ist thread-sicher (Sync-Routen im Threadpool) und wirft nie:
+die Änderung ist zu dem Zeitpunkt schon committet.
+"""
+import asyncio
+import json
+import threading
+import uuid
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app import metrics
+from app.config import settings
+
+FEED_EVENTS = metrics.counter("change_feed_events_total", "Events published to the change feed", ["event"])
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    id: str
+    event: str
+    data: dict
+
+
+class FeedBackend:
+    def publish(self, channel: str, event: str, data: dict) -> str:
+        raise NotImplementedError
+
+    def cursor(self, channel: str) -> str:
+        raise NotImplementedError
+
+    async def read(self, channel: str, after: str, timeout: float) -> Optional[List[FeedEvent]]:
+        raise NotImplementedError
+
+
+# =================================================================
+# Im Prozess
+# =================================================================
+
+class _Channel:
+    def __init__(self, replay_size: int, dropped: int):
+        self.events = deque(maxlen=replay_size)   # (seq, event, data)
+        self.dropped = dropped                    # bis zu dieser seq ist nichts mehr nachzuliefern
+        self.waiters = set()                      # (loop, future)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class MemoryFeedBackend(FeedBackend):
+    """
+    IDs sind "<epoch>-<seq>": seq zählt über alle Kanäle hoch, epoch ändert
+    sich bei jedem Start (alte IDs -> neu laden). Höchstens max_channels
+    Kanäle bleiben im Speicher (zuletzt benutzte).
+    """
+
+    def __init__(self, replay_size: int, max_channels: int = 1000):
+        self.replay_size = replay_size
+        self.max_channels = max_channels
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+
+    def _id(self, seq: int) -> str:
+        return f"{self._epoch}-{seq}"
+
+    def _parse(self, event_id: str) -> Optional[int]:
+        epoch, _, seq = event_id.partition("-")
+        return int(seq) if epoch == self._epoch and seq.isdigit() else None
+
+    def _channel(self, channel: str) -> _Channel:
+        # Nur mit gehaltenem Lock aufrufen
+        ch = self._channels.get(channel)
+        if ch is None:
+            # Ein verdrängter Kanal könnte Events gehabt haben -> ältere IDs gelten als verloren
+            ch = self._channels[channel] = _Channel(self.replay_size, self._evicted)
+            while len(self._channels) > self.max_channels:
+                name, old = next((item for item in self._channels.items()
+                                  if item[0] != channel and not item[1].waiters), (None, None))
+                if old is None:
+                    break
+                del self._channels[name]
+                self._evicted = max(self._evicted, old.events[-1][0] if old.events else old.dropped)
+        self._channels.move_to_end(channel)
+        return ch
+
+    def publish(self, channel: str, event: str, data: dict) -> str:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            ch = self._channel(channel)
+            if len(ch.events) == ch.events.maxlen:
+                ch.dropped = ch.events[0][0]
+            ch.events.append((seq, event, data))
+            waiters, ch.waiters = ch.waiters, set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass   # Loop schon beendet
+        return self._id(seq)
+
+    def cursor(self, channel: str) -> str:
+        with self._lock:
+            ch = self._channels.get(channel)
+            if ch is None:
+                # Kanal (noch) unbekannt: wird er angelegt, beginnt er bei _evicted
+                return self._id(self._evicted)
+            return self._id(ch.events[-1][0] if ch.events else ch.dropped)
+
+    async def read(self, channel: str, after: str, timeout: float) -> Optional[List[FeedEvent]]:
+        after_seq = self._parse(after)
+        if after_seq is None:
+            return None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._lock:
+                ch = self._channel(channel)
+                if after_seq < ch.dropped or after_seq > self._seq:
+                    return None
+                events = [FeedEvent(self._id(seq), event, data) for seq, event, data in ch.events if seq > after_seq]
+                if events:
+                    return events
+                waiter = (loop, loop.create_future())
+                ch.waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                return []
+            finally:
+                with self._lock:
+                    ch.waiters.discard(waiter)
+
+
+# =================================================================
+# Redis Streams (mehrere Worker-Prozesse)
+# =================================================================
+
+def _stream_id(event_id: str) -> tuple:
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class RedisFeedBackend(FeedBackend):
+    """
+    Ein Stream pro Kanal ("feed:<kanal>"), gekappt auf ~replay_size Einträge.
+    publish/cursor nutzen den Sync-Client (kurzer Roundtrip, auch aus Threads),
+    read den Async-Client mit XREAD BLOCK.
+    """
+
+    def __init__(self, url: str, replay_size: int):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise RuntimeError("change_feed_backend='redis' braucht das Paket 'redis' (pip install redis)") from e
+        self.url = url
+        self.replay_size = replay_size
+        self._redis_asyncio = redis.asyncio
+        self._sync = redis.Redis.from_url(url, decode_responses=True)
+        # Async-Clients hängen an ihrem Event-Loop
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+
+    def _key(self, channel: str) -> str:
+        return f"feed:{channel}"
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async.get(loop)
+        if client is None:
+            client = self._async[loop] = self._redis_asyncio.Redis.from_url(self.url, decode_responses=True)
+        return client
+
+    def publish(self, channel: str, event: str, data: dict) -> str:
+        return self._sync.xadd(self._key(channel), {"event": event, "data": json.dumps(data, default=str)},
+                               maxlen=self.replay_size, approximate=True)
+
+    def cursor(self, channel: str) -> str:
+        last = self._sync.xrevrange(self._key(channel), count=1)
+        return last[0][0] if last else "0-0"
+
+    async def read(self, channel: str, after: str, timeout: float) -> Optional[List[FeedEvent]]:
+        try:
+            after_id = _stream_id(after)
+        except ValueError:
+            return None
+        client = self._client()
+        key = self._key(channel)
+        if after_id != (0, 0):
+            # Gekappt und `after` liegt vor dem ältesten Eintrag -> Lücke
+            first = await client.xrange(key, count=1)
+            if first and after_id < _stream_id(first[0][0]) and await client.xlen(key) >= self.replay_size:
+                return None
+        response = await client.xread({key: after}, count=self.replay_size, block=max(1, int(timeout * 1000)))
+        if not response:
+            return []
+        _, entries = response[0]
+        return [FeedEvent(entry_id, fields["event"], json.loads(fields["data"])) for entry_id, fields in entries]
+
+
+# =================================================================
+# Feed
+# =================================================================
+
+class ChangeFeed:
+    def __init__(self, backend: FeedBackend):
+        self.backend = backend
+        self._listeners = 0
+        metrics.gauge("change_feed_listeners", "Open change feed connections", callback=lambda: {(): self._listeners})
+
+    def publish(self, channel: str, event: str, data: dict) -> Optional[str]:
+        try:
+            event_id = self.backend.publish(channel, event, data)
+        except Exception as e:
+            print(f"⚠️ Change-Feed: {event} für {channel} nicht veröffentlicht: {e}")
+            return None
+        FEED_EVENTS.inc(event=event)
+        return event_id
+
+    def cursor(self, channel: str) -> Optional[str]:
+        try:
+            return self.backend.cursor(channel)
+        except Exception as e:
+            print(f"⚠️ Change-Feed: kein Cursor für {channel}: {e}")
+            return None
+
+    async def read(self, channel: str, after: str, timeout: float) -> Optional[List[FeedEvent]]:
+        return await self.backend.read(channel, after, timeout)
+
+    @contextmanager
+    def listening(self):
+        self._listeners += 1
+        try:
+            yield
+        finally:
+            self._listeners -= 1
+
+
+def build_feed_backend(name: str) -> FeedBackend:
+    if name == "memory":
+        return MemoryFeedBackend(replay_size=settings.change_feed_replay_size)
+    if name == "redis":
+        if not settings.redis_url:
+            raise ValueError("change_feed_backend='redis' braucht REDIS_URL")
+        return RedisFeedBackend(settings.redis_url, replay_size=settings.change_feed_replay_size)
+    raise ValueError(f"Unknown change feed backend: {name!r} (expected 'memory' or 'redis')")
+
+
+change_feed = ChangeFeed(build_feed_backend(settings.change_feed_backend))
@@ -0,0 +1,67 @@
+"""
+Inkrementeller Parser für ein JSON-Array von Objekten, das stückweise
+ankommt (Streaming-Antwort der KI).
+
+    parser = JSONArrayStreamParser()
+    for chunk in chunks:
+        for obj in parser.feed(chunk):
+            ...   # jedes Objekt, sobald seine schließende Klammer da ist
+
+Alles vor der ersten "[" (z.B. ```json) und nach der letzten "]" wird
+ignoriert. Nur Objekte direkt im äußeren Array werden geliefert;
+verschachtelte Objekte gehören zu ihrem Elternobjekt.
+"""
+import json
+from typing import Iterator, List
+
+
+class JSONArrayStreamParser:
+    def __init__(self):
+        self._buffer: List[str] = []   # Text des aktuellen Objekts
+        self._depth = 0                # 0 = vor dem Array, 1 = im Array, >1 = in einem Objekt
+        self._in_string = False
+        self._escape = False
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """True, sobald das äußere Array geschlossen wurde."""
+        return self._closed
+
+    def feed(self, chunk: str) -> Iterator[dict]:
+        for char in chunk:
+            if self._closed:
+                return
+            if self._depth == 0:
+                if char == "[":
+                    self._depth = 1
+                continue
+
+            if self._depth > 1:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 1:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    text = "".join(self._buffer)
+                    self._buffer = []
+                    value = json.loads(text)
+                    if isinstance(value, dict):
+                        yield value
+                elif self._depth == 0:
+                    self._closed = True
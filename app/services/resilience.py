@@ -0,0 +1,183 @@
+"""
+Schutz vor einem kranken KI-Provider.
+
+- CircuitBreaker: nach failure_threshold Fehlern in Folge "open" -> Aufrufe
+  scheitern sofort statt jeweils das volle Zeitlimit zu warten. Nach
+  recovery_seconds "half_open": einzelne Probe-Aufrufe dürfen durch;
+  Erfolg -> "closed", Fehler -> wieder "open".
+- TokenBucket: clientseitiges Limit passend zur Quota (Aufrufe pro Minute,
+  kurze Spitzen bis burst). Adaptiv: bei Quota-Fehlern (429) wird die Rate
+  halbiert, jeder Erfolg hebt sie wieder ein Stück an (AIMD).
+
+Beide sind thread-sicher (Sync-Routen im Threadpool + Event-Loop) und
+blockieren nie selbst; wer warten muss, bekommt die Wartezeit genannt.
+"""
+import threading
+import time
+import weakref
+from typing import Optional
+
+from app import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_TRANSITIONS = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ["breaker", "state"])
+RATE_LIMIT_CHANGES = metrics.counter(
+    "rate_limit_adjustments_total", "Adaptive rate limit changes", ["limiter", "direction"])
+
+_breakers: "weakref.WeakValueDictionary[str, CircuitBreaker]" = weakref.WeakValueDictionary()
+_buckets: "weakref.WeakValueDictionary[str, TokenBucket]" = weakref.WeakValueDictionary()
+metrics.gauge("circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["breaker"],
+              callback=lambda: {(name,): _STATE_VALUES[b.state] for name, b in list(_breakers.items())})
+metrics.gauge("rate_limit_per_minute", "Current adaptive rate limit", ["limiter"],
+              callback=lambda: {(name,): b.rate * 60 for name, b in list(_buckets.items()) if b.enabled})
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float, half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        _breakers[name] = self
+
+    def _set_state(self, state: str):
+        # Nur mit gehaltenem Lock aufrufen
+        if state == self._state:
+            return
+        self._state = state
+        BREAKER_TRANSITIONS.inc(breaker=self.name, state=state)
+        print(f"🔌 Circuit-Breaker {self.name}: {state}")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self._set_state(HALF_OPEN)
+                self._probes = 0
+            return self._state
+
+    def retry_after(self) -> float:
+        """Sekunden bis zur nächsten Probe (0 = jetzt)."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.recovery_seconds - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Darf ein Aufruf raus? Im half_open-Zustand nur half_open_probes gleichzeitig."""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def release(self):
+        """Aufruf ohne Urteil beendet (z.B. abgebrochen) -> Probe-Platz wieder frei."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def stats(self) -> dict:
+        state = self.state
+        return {"state": state, "consecutive_failures": self._failures, "retry_after": round(self.retry_after(), 1),
+                "failure_threshold": self.failure_threshold, "recovery_seconds": self.recovery_seconds}
+
+
+class TokenBucket:
+    """
+    rate_per_minute <= 0 schaltet das Limit ab. reserve() bucht sofort einen
+    Token (auch "auf Pump") und sagt, wie lange bis dahin zu warten ist.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, min_rate_per_minute: Optional[float] = None):
+        self.name = name
+        self.max_rate = rate_per_minute / 60
+        self.min_rate = (min_rate_per_minute if min_rate_per_minute is not None else rate_per_minute / 8) / 60
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        _buckets[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Wartezeit in Sekunden für den nächsten Token, oder None (länger als max_wait -> nichts gebucht)."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def retry_after(self) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def penalize(self):
+        """Quota-Fehler: Rate halbieren (nicht unter min_rate)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            new_rate = max(self.min_rate, self.rate / 2)
+            if new_rate < self.rate:
+                self.rate = new_rate
+                RATE_LIMIT_CHANGES.inc(limiter=self.name, direction="down")
+                print(f"🐢 Rate-Limit {self.name}: {self.rate * 60:.1f}/min")
+
+    def reward(self):
+        """Erfolg: Rate um 5% des Maximums anheben (bis max_rate)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+                RATE_LIMIT_CHANGES.inc(limiter=self.name, direction="up")
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            self._refill()
+            return {"enabled": True, "rate_per_minute": round(self.rate * 60, 2),
+                    "max_rate_per_minute": round(self.max_rate * 60, 2), "burst": self.burst,
+                    "tokens": round(self._tokens, 2)}
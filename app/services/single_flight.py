@@ -0,0 +1,99 @@
+"""
+Single-Flight: gleichzeitige Aufrufe mit demselben Schlüssel teilen sich
+EINEN laufenden Aufruf und dessen Ergebnis (bzw. dessen Fehler).
+
+- SingleFlight      für Sync-Code (Threadpool-Routen, Skripte)
+- AsyncSingleFlight für den Event-Loop
+
+do() liefert (ergebnis, shared). shared=True heißt: jemand anderes hat den
+Aufruf gemacht, das Ergebnis ist eine Kopie.
+"""
+import asyncio
+import copy
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Der eigentliche Aufruf läuft als eigener Task. Bricht ein Wartender ab
+    (z.B. Client weg), laufen die anderen weiter; erst wenn niemand mehr
+    wartet, wird auch der Aufruf gecancelt.
+    """
+
+    def __init__(self):
+        # Pro Event-Loop getrennt (Tests/Skripte starten eigene Loops)
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _Flight]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        flight = calls.get(key)
+        leader = flight is None
+        if leader:
+            flight = calls[key] = _Flight(loop.create_task(fn()))
+            flight.task.add_done_callback(lambda _task, f=flight: calls.get(key) is f and calls.pop(key))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                calls.pop(key, None)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+        return (result, False) if leader else (copy.deepcopy(result), True)
+
+    def in_flight(self) -> int:
+        return sum(len(calls) for calls in list(self._calls.values()))
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from starlette.datastructures import Headers
+
+from app.services.ai_cache import (
+    AICache, CACHE_BYPASS, CACHE_DEFAULT, CACHE_REFRESH, cache_key, cache_mode_from_headers,
+)
+
+
+def test_key_ignores_case_whitespace_and_trailing_punctuation():
+    key = cache_key("decompose", "Urlaub  planen", "m", 1)
+    assert cache_key("decompose", " urlaub planen! ", "m", 1) == key
+    assert cache_key("decompose", "Urlaub planen", "m", 2) != key
+    assert cache_key("suggest", "Urlaub planen", "m", 1) != key
+
+
+def test_cache_control_selects_the_mode():
+    assert cache_mode_from_headers(Headers({})) == CACHE_DEFAULT
+    assert cache_mode_from_headers(Headers({"cache-control": "No-Cache"})) == CACHE_REFRESH
+    assert cache_mode_from_headers(Headers({"cache-control": "no-cache, no-store"})) == CACHE_BYPASS
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "ai.sqlite3")
+    AICache(path, maxsize=10, ttl=60).put("decompose", "k", [{"title": "A"}])
+
+    restarted = AICache(path, maxsize=10, ttl=60)
+    assert restarted.stats()["memory_entries"] == 0
+    assert asyncio.run(restarted.get_async("decompose", "k")) == [{"title": "A"}]
+    # Datei-Treffer wandert in den Speicher
+    assert restarted.stats()["memory_entries"] == 1
+
+
+def test_expired_entries_are_ignored_and_purged(tmp_path):
+    cache = AICache(str(tmp_path / "ai.sqlite3"), maxsize=10, ttl=0.05)
+    cache.put("suggest", "k", {"summary": "S"})
+    time.sleep(0.1)
+    assert cache.get("suggest", "k") is None
+    assert cache.purge_expired() == 1
+
+
+def test_purge_by_key_kind_and_everything(tmp_path):
+    cache = AICache(str(tmp_path / "ai.sqlite3"), maxsize=10, ttl=60)
+    cache.put("decompose", "a", [])
+    cache.put("decompose", "b", [])
+    cache.put("suggest", "c", {})
+
+    assert cache.purge(key="a") == 1
+    assert cache.get("decompose", "a") is None
+    assert cache.purge(kind="decompose") == 1
+    assert cache.get("suggest", "c") == {}
+    assert cache.purge() == 1
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_memory_only_cache_without_path():
+    cache = AICache(None, maxsize=1, ttl=60)
+    cache.put("suggest", "a", 1)
+    cache.put("suggest", "b", 2)
+    assert cache.get("suggest", "a") is None
+    assert cache.get("suggest", "b") == 2
@@ -0,0 +1,175 @@
+import asyncio
+import itertools
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.ai_job import AIJob, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from app.models.project import Project
+from app.models.task import Task
+from app.services import ai_jobs, ai_services
+from app.services.ai_jobs import AIJobRunner, JOB_STALE_SECONDS
+from app.services.ai_providers import AIProvider, AIProviderError, OfflineProvider, set_provider
+from app.services.resilience import CircuitBreaker, TokenBucket
+
+_prompts = itertools.count(1)
+
+
+class DownProvider(AIProvider):
+    """Scheitert sofort, noch bevor ein Task ankommt."""
+    name = "down"
+    model = "down"
+
+    async def generate_async(self, prompt, kind, timeout):
+        raise AIProviderError("Provider nicht erreichbar")
+
+
+@pytest.fixture
+def project(app_started, make_user):
+    user_id, _ = make_user()
+    with SessionLocal() as db:
+        project = Project(title="Jobs", owner_id=user_id)
+        db.add(project)
+        db.commit()
+        return SimpleNamespace(id=project.id, owner_id=user_id)
+
+
+@pytest.fixture(autouse=True)
+def guards(monkeypatch):
+    # Fehlschläge dieser Tests sollen den globalen Breaker nicht öffnen
+    monkeypatch.setattr(ai_services, "ai_breaker", CircuitBreaker("test-ai-jobs", failure_threshold=100,
+                                                                  recovery_seconds=60))
+    monkeypatch.setattr(ai_services, "ai_rate_limiter", TokenBucket("test-ai-jobs", rate_per_minute=0, burst=1))
+    yield
+    set_provider(None)
+
+
+def make_job(project, **values) -> int:
+    values = {"prompt": f"Projekt {next(_prompts)} planen", "cache_mode": "bypass", **values}
+    with SessionLocal() as db:
+        job = AIJob(owner_id=project.owner_id, project_id=project.id, **values)
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def load_job(job_id: int) -> AIJob:
+    with SessionLocal() as db:
+        return db.get(AIJob, job_id)
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            # Verbindungen gehören zu diesem Event-Loop
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+async def process(runner: AIJobRunner, job_ids, done, timeout: float = 5.0):
+    """Einen Worker laufen lassen, bis done() für alle Jobs gilt."""
+    runner._queue = asyncio.Queue()
+    runner._spawn(runner._worker())
+    runner.enqueue_batch(job_ids)
+    deadline = asyncio.get_running_loop().time() + timeout
+    try:
+        while not all(done(load_job(job_id)) for job_id in job_ids):
+            assert asyncio.get_running_loop().time() < deadline, "Jobs nicht fertig geworden"
+            await asyncio.sleep(0.02)
+    finally:
+        await runner.stop()
+
+
+def finished(job: AIJob) -> bool:
+    return job.status in (JOB_DONE, JOB_FAILED)
+
+
+def test_two_workers_never_claim_the_same_job(project):
+    job_id = make_job(project)
+    runner = AIJobRunner(workers=1, retry_backoff=0)
+
+    async def claim():
+        async with AsyncSessionLocal() as db:
+            return await runner._claim(db, [job_id])
+
+    async def race():
+        return await asyncio.gather(claim(), claim())
+
+    results = run(race())
+    assert sorted(len(claimed) for claimed in results) == [0, 1]
+    job = load_job(job_id)
+    assert job.status == JOB_RUNNING and job.attempts == 1 and job.heartbeat_at is not None
+
+
+def test_startup_only_recovers_jobs_without_recent_heartbeat(project):
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(seconds=JOB_STALE_SECONDS * 2)
+    alive = make_job(project, status=JOB_RUNNING, started_at=old, heartbeat_at=now)
+    stale = make_job(project, status=JOB_RUNNING, started_at=old, heartbeat_at=old)
+    legacy = make_job(project, status=JOB_RUNNING, started_at=old)
+
+    job_ids = run(AIJobRunner(workers=1, retry_backoff=0).recover_jobs())
+
+    assert stale in job_ids and legacy in job_ids and alive not in job_ids
+    assert load_job(alive).status == JOB_RUNNING
+    assert load_job(stale).status == JOB_QUEUED
+
+
+def test_startup_completes_stale_jobs_that_already_streamed_tasks(project):
+    old = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS * 2)
+    partial = make_job(project, status=JOB_RUNNING, started_at=old, heartbeat_at=old, tasks_created=2)
+    with SessionLocal() as db:
+        db.add_all(Task(title=f"Gestreamt {i}", owner_id=project.owner_id, project_id=project.id) for i in range(2))
+        db.commit()
+
+    job_ids = run(AIJobRunner(workers=1, retry_backoff=0).recover_jobs())
+
+    assert partial not in job_ids
+    job = load_job(partial)
+    assert job.status == JOB_DONE and job.progress == 100 and job.error.startswith("Unvollständig")
+    with SessionLocal() as db:
+        assert db.query(Task).filter(Task.project_id == project.id).count() == 2
+
+
+def test_job_creates_tasks_from_the_ai_answer(project):
+    set_provider(OfflineProvider(latency_ms=0, jitter_ms=0, error_rate=0, seed=1))
+    job_id = make_job(project)
+
+    run(process(AIJobRunner(workers=1, retry_backoff=0), [job_id], finished))
+
+    job = load_job(job_id)
+    assert job.status == JOB_DONE and job.progress == 100 and job.tasks_created >= 3
+    with SessionLocal() as db:
+        assert db.query(Task).filter(Task.project_id == project.id).count() == job.tasks_created
+
+
+def test_failed_ai_call_is_retried_then_marked_failed(project):
+    set_provider(DownProvider())
+    job_id = make_job(project, max_attempts=2)
+
+    run(process(AIJobRunner(workers=1, retry_backoff=0.01), [job_id], finished))
+
+    job = load_job(job_id)
+    assert job.status == JOB_FAILED and job.attempts == 2 and job.error
+
+
+def test_unexpected_error_does_not_leave_the_job_running(project, monkeypatch):
+    set_provider(OfflineProvider(latency_ms=0, jitter_ms=0, error_rate=0, seed=1))
+
+    def broken(*args):
+        raise RuntimeError("Bug in build_tasks")
+
+    monkeypatch.setattr(ai_jobs, "build_tasks", broken)
+    single = make_job(project, max_attempts=1)
+    batch = [make_job(project, max_attempts=1) for _ in range(2)]
+
+    run(process(AIJobRunner(workers=1, retry_backoff=0), [single], finished))
+    run(process(AIJobRunner(workers=1, retry_backoff=0), batch, finished))
+
+    for job_id in [single, *batch]:
+        job = load_job(job_id)
+        assert job.status == JOB_FAILED and "Bug in build_tasks" in job.error
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.ai_providers import AIProviderError, BATCH_ITEMS_MARKER, OfflineProvider, build_provider
+
+
+def offline(**values) -> OfflineProvider:
+    return OfflineProvider(**{"latency_ms": 0, "jitter_ms": 0, "error_rate": 0, "seed": 1, **values})
+
+
+def test_same_prompt_gives_the_same_answer():
+    first = offline(seed=1).generate("Umzug planen", "decompose", timeout=1).text
+    again = offline(seed=2).generate("Umzug planen", "decompose", timeout=1).text
+    assert first == again
+    assert offline().generate("Hochzeit planen", "decompose", timeout=1).text != first
+
+
+def test_decompose_and_suggest_have_the_expected_shape():
+    tasks = json.loads(offline().generate("Umzug planen", "decompose", timeout=1).text)
+    assert 3 <= len(tasks) <= 6
+    assert all(task["title"] and task["estimated_time"].endswith("h") for task in tasks)
+
+    suggestion = json.loads(offline().generate("Umzug planen", "suggest", timeout=1).text)
+    assert set(suggestion) == {"summary", "description", "priority", "category"}
+
+
+def test_batch_answer_is_keyed_by_id():
+    prompt = "Zerlege die Projekte.\n" + BATCH_ITEMS_MARKER + " " + json.dumps(
+        [{"id": 0, "projekt": "Umzug planen"}, {"id": 1, "projekt": "Hochzeit planen"}])
+    provider = offline()
+
+    answer = json.loads(provider.generate(prompt, "decompose_batch", timeout=1).text)
+    assert [item["id"] for item in answer] == [0, 1]
+    assert answer[1]["tasks"] == json.loads(provider.build_text("Hochzeit planen", "decompose"))
+
+
+def test_errors_follow_the_seed():
+    def outcomes(seed):
+        provider = offline(error_rate=0.5, seed=seed)
+        results = []
+        for _ in range(20):
+            try:
+                provider.generate("p", "suggest", timeout=1)
+                results.append(True)
+            except AIProviderError:
+                results.append(False)
+        return results
+
+    assert outcomes(7) == outcomes(7)
+    assert True in outcomes(7) and False in outcomes(7)
+
+
+def test_stream_joins_to_the_full_answer():
+    provider = offline()
+
+    async def collect():
+        return "".join([piece async for piece in provider.stream_async("Umzug planen", "decompose", timeout=1)])
+
+    assert asyncio.run(collect()) == provider.build_text("Umzug planen", "decompose")
+
+
+def test_latency_over_timeout_raises():
+    with pytest.raises(TimeoutError):
+        offline(latency_ms=50).generate("p", "suggest", timeout=0.01)
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError, match="Unknown AI provider"):
+        build_provider("nope")
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import ai_services
+from app.services.ai_cache import CACHE_BYPASS
+from app.services.ai_providers import AIProvider, AIResponse, BATCH_ITEMS_MARKER, set_provider
+from app.services.ai_services import (
+    AIServiceError, analyze_tasks_batch_async, build_batch_decompose_prompt, generate_text, generate_text_async,
+)
+from app.services.resilience import CLOSED, OPEN, CircuitBreaker, TokenBucket
+
+
+class SlowProvider(AIProvider):
+    """Antwortet nach delay Sekunden und merkt sich, wie viele Aufrufe gleichzeitig liefen."""
+    name = "slow"
+    model = "slow"
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def generate(self, prompt, kind, timeout):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+        finally:
+            self._leave()
+        return AIResponse(text=prompt, model=self.model)
+
+    async def generate_async(self, prompt, kind, timeout):
+        self._enter()
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self._leave()
+        return AIResponse(text=prompt, model=self.model)
+
+
+@pytest.fixture
+def guards(monkeypatch):
+    """Eigener Breaker/Rate-Limit und 2 Slots pro Test; gibt den Breaker zurück."""
+    breaker = CircuitBreaker("test-ai-services", failure_threshold=1, recovery_seconds=60)
+    monkeypatch.setattr(ai_services, "ai_breaker", breaker)
+    monkeypatch.setattr(ai_services, "ai_rate_limiter", TokenBucket("test-ai-services", rate_per_minute=0, burst=1))
+    monkeypatch.setattr(settings, "ai_max_concurrency", 2)
+    monkeypatch.setattr(ai_services, "_sync_slots", threading.BoundedSemaphore(2))
+    yield breaker
+    set_provider(None)
+
+
+def test_async_calls_are_limited_per_worker(guards):
+    provider = SlowProvider(delay=0.05)
+    set_provider(provider)
+
+    async def scenario():
+        return await asyncio.gather(*(generate_text_async(f"p{i}", "suggest", timeout=5) for i in range(6)))
+
+    assert asyncio.run(scenario()) == [f"p{i}" for i in range(6)]
+    assert provider.max_active == 2
+
+
+def test_sync_calls_are_limited_per_worker(guards):
+    provider = SlowProvider(delay=0.05)
+    set_provider(provider)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(generate_text(f"p{i}", "suggest", timeout=5)))
+               for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [f"p{i}" for i in range(5)]
+    assert provider.max_active == 2
+
+
+def test_slow_provider_call_times_out_and_counts_against_the_breaker(guards):
+    set_provider(SlowProvider(delay=1.0))
+    started = time.perf_counter()
+    with pytest.raises(AIServiceError, match="timed out"):
+        asyncio.run(generate_text_async("p", "suggest", timeout=0.05))
+    assert time.perf_counter() - started < 0.5
+    assert guards.state == OPEN
+
+
+def test_waiting_for_a_slot_does_not_count_against_the_breaker(guards, monkeypatch):
+    monkeypatch.setattr(settings, "ai_max_concurrency", 1)
+    set_provider(SlowProvider(delay=0.2))
+
+    async def scenario():
+        busy = asyncio.ensure_future(generate_text_async("lang", "suggest", timeout=5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AIServiceError, match="Too many concurrent"):
+            await generate_text_async("wartet", "suggest", timeout=0.05)
+        return await busy
+
+    assert asyncio.run(scenario()) == "lang"
+    assert guards.state == CLOSED
+
+
+class PartialBatchProvider(AIProvider):
+    """Beantwortet im Batch nur das erste Projekt gültig; Einzelaufrufe klappen immer."""
+    name = "partial"
+    model = "partial"
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_async(self, prompt, kind, timeout):
+        self.calls.append(kind)
+        if kind == "decompose_batch":
+            line = next(line for line in prompt.splitlines() if BATCH_ITEMS_MARKER in line)
+            items = json.loads(line.split(BATCH_ITEMS_MARKER, 1)[1])
+            answer = [{"id": items[0]["id"], "tasks": [{"title": "Aus dem Batch"}]},
+                      {"id": items[1]["id"], "tasks": "kaputt"},
+                      {"id": "fremd", "tasks": [{"title": "Gehört zu keinem Projekt"}]}]
+            return AIResponse(text="```json\n" + json.dumps(answer) + "\n```", model=self.model)
+        return AIResponse(text=json.dumps([{"title": "Einzeln", "estimated_time": "1h"}]), model=self.model)
+
+
+def test_batch_prompt_carries_ids_and_texts():
+    prompt = build_batch_decompose_prompt([("1", "Umzug planen"), ("2", "Größe \"XL\"")])
+    line = next(line for line in prompt.splitlines() if BATCH_ITEMS_MARKER in line)
+    assert json.loads(line.split(BATCH_ITEMS_MARKER, 1)[1]) == [
+        {"id": "1", "projekt": "Umzug planen"}, {"id": "2", "projekt": 'Größe "XL"'}]
+
+
+def test_batch_keeps_order_dedupes_and_asks_invalid_items_again(guards):
+    provider = PartialBatchProvider()
+    set_provider(provider)
+    texts = ["Umzug planen", "Hochzeit planen", "Umzug planen"]
+
+    results = asyncio.run(analyze_tasks_batch_async(texts, cache_mode=CACHE_BYPASS))
+
+    assert results[0] == results[2] and results[0][0]["title"] == "Aus dem Batch"
+    assert results[0] is not results[2]
+    assert results[1][0]["title"] == "Einzeln"
+    # Ein Batch-Aufruf für zwei verschiedene Projekte, ein Nachfragen für das ungültige
+    assert provider.calls.count("decompose_batch") == 1
+    assert len(provider.calls) == 2
+
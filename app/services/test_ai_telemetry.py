@@ -0,0 +1,33 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.services import ai_telemetry
+
+
+def test_record_call_counts_outcome_and_tokens():
+    before = ai_telemetry.AI_TOKENS.value(kind="test", type="output")
+    trace_id = ai_telemetry.new_trace()
+
+    ai_telemetry.record_call("test", "offline", "ok", time.perf_counter(), slot_wait=0.0,
+                             response=SimpleNamespace(model="offline", prompt_tokens=12, output_tokens=5))
+
+    assert ai_telemetry.AI_CALLS.value(kind="test", provider="offline", outcome="ok") >= 1
+    assert ai_telemetry.AI_TOKENS.value(kind="test", type="output") == before + 5
+    last = ai_telemetry.recent_calls(1)[0]
+    assert last["trace_id"] == trace_id
+    assert last["prompt_tokens"] == 12 and last["outcome"] == "ok"
+
+
+def test_trace_ids_are_per_context():
+    async def request():
+        trace_id = ai_telemetry.new_trace()
+        await asyncio.sleep(0)
+        return trace_id, ai_telemetry.current_trace()
+
+    async def main():
+        return await asyncio.gather(request(), request())
+
+    (a, a_seen), (b, b_seen) = asyncio.run(main())
+    assert a != b
+    assert (a, b) == (a_seen, b_seen)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from app.services.change_feed import ChangeFeed, FeedBackend, MemoryFeedBackend
+
+
+def read(backend: MemoryFeedBackend, channel: str, after: str, timeout: float = 0.01):
+    return asyncio.run(backend.read(channel, after, timeout))
+
+
+def test_replays_events_after_the_cursor_per_channel():
+    backend = MemoryFeedBackend(replay_size=10)
+    start = backend.cursor("project:1")
+    first = backend.publish("project:1", "task", {"id": 1})
+    backend.publish("project:2", "task", {"id": 99})
+    backend.publish("project:1", "task", {"id": 2})
+
+    assert [e.data["id"] for e in read(backend, "project:1", start)] == [1, 2]
+    assert [e.data["id"] for e in read(backend, "project:1", first)] == [2]
+    assert backend.cursor("project:1") == read(backend, "project:1", first)[-1].id
+
+
+def test_no_new_events_gives_an_empty_list_and_a_stable_cursor():
+    backend = MemoryFeedBackend(replay_size=10)
+    backend.publish("project:1", "task", {})
+    cursor = backend.cursor("project:1")
+    assert read(backend, "project:1", cursor) == []
+    assert backend.cursor("project:1") == cursor
+
+
+def test_cursor_that_fell_out_of_the_ring_buffer_needs_a_resync():
+    backend = MemoryFeedBackend(replay_size=2)
+    start = backend.cursor("project:1")
+    for i in range(3):
+        backend.publish("project:1", "task", {"id": i})
+    assert read(backend, "project:1", start) is None
+    # Nach dem Neuladen (aktueller Cursor) geht es normal weiter
+    assert read(backend, "project:1", backend.cursor("project:1")) == []
+
+
+def test_foreign_or_future_ids_need_a_resync():
+    backend = MemoryFeedBackend(replay_size=10)
+    backend.publish("project:1", "task", {})
+    other_run = MemoryFeedBackend(replay_size=10).cursor("project:1")
+    assert read(backend, "project:1", other_run) is None
+    assert read(backend, "project:1", "kaputt") is None
+    epoch = backend.cursor("project:1").split("-")[0]
+    assert read(backend, "project:1", f"{epoch}-999") is None
+
+
+def test_evicted_channel_needs_a_resync():
+    backend = MemoryFeedBackend(replay_size=10, max_channels=1)
+    start = backend.cursor("project:1")
+    backend.publish("project:1", "task", {})
+    backend.publish("project:2", "task", {})
+    assert read(backend, "project:1", start) is None
+
+
+def test_waiting_reader_wakes_up_on_publish_from_a_thread():
+    backend = MemoryFeedBackend(replay_size=10)
+    cursor = backend.cursor("project:1")
+
+    async def scenario():
+        reader = asyncio.ensure_future(backend.read("project:1", cursor, timeout=5))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=backend.publish, args=("project:1", "task", {"id": 7})).start()
+        return await asyncio.wait_for(reader, 1)
+
+    assert [e.data["id"] for e in asyncio.run(scenario())] == [7]
+
+
+def test_publish_never_raises():
+    class Broken(FeedBackend):
+        def publish(self, channel, event, data):
+            raise ConnectionError("weg")
+
+    assert ChangeFeed(Broken()).publish("project:1", "task", {}) is None
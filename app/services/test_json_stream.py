@@ -0,0 +1,52 @@
+# Inkrementeller JSON-Array-Parser: Objekte kommen raus, sobald sie vollständig sind.
+
+import json
+
+import pytest
+
+from app.services.json_stream import JSONArrayStreamParser
+
+TASKS = [
+    {"title": "Flug buchen", "estimated_time": "1h"},
+    {"title": "Hotel {Zimmer} [Meer]", "estimated_time": "2h"},
+    {"title": 'Koffer "packen" \\ los', "details": {"items": ["a", {"b": 1}]}},
+]
+
+
+def chunks_of(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_objects_are_emitted_regardless_of_chunking(size):
+    text = "```json\n" + json.dumps(TASKS, ensure_ascii=False, indent=2) + "\n```"
+    parser = JSONArrayStreamParser()
+    result = [obj for chunk in chunks_of(text, size) for obj in parser.feed(chunk)]
+    assert result == TASKS
+    assert parser.closed
+
+
+def test_object_is_emitted_as_soon_as_it_is_complete():
+    parser = JSONArrayStreamParser()
+    assert list(parser.feed('[{"title": "A"}')) == [{"title": "A"}]
+    assert list(parser.feed(', {"title": "B"')) == []
+    assert list(parser.feed('}')) == [{"title": "B"}]
+    assert not parser.closed
+    assert list(parser.feed(']')) == []
+    assert parser.closed
+
+
+def test_text_before_and_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    assert list(parser.feed('Hier die Liste: [{"title": "A"}] Viel Erfolg! [{"title": "X"}]')) == [{"title": "A"}]
+
+
+def test_non_object_items_are_skipped():
+    parser = JSONArrayStreamParser()
+    assert list(parser.feed('[1, "zwei", [3], {"title": "A"}]')) == [{"title": "A"}]
+
+
+def test_broken_object_raises():
+    parser = JSONArrayStreamParser()
+    with pytest.raises(json.JSONDecodeError):
+        list(parser.feed('[{"title": }]'))
@@ -0,0 +1,88 @@
+import time
+
+from app.services.resilience import CircuitBreaker, TokenBucket, CLOSED, OPEN, HALF_OPEN
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("test-open", failure_threshold=3, recovery_seconds=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert 59 < breaker.retry_after() <= 60
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("test-reset", failure_threshold=2, recovery_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_one_probe_and_closes_on_success():
+    breaker = CircuitBreaker("test-probe", failure_threshold=1, recovery_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()   # nur eine Probe gleichzeitig
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test-reopen", failure_threshold=5, recovery_seconds=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+
+
+def test_cancelled_probe_frees_the_slot():
+    breaker = CircuitBreaker("test-release", failure_threshold=1, recovery_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket("test-bucket", rate_per_minute=60, burst=2)
+    assert bucket.reserve(max_wait=0) == 0
+    assert bucket.reserve(max_wait=0) == 0
+
+    assert bucket.reserve(max_wait=0.5) is None      # nächster Token erst in ~1s
+    wait = bucket.reserve(max_wait=2)
+    assert 0.9 < wait <= 1.0
+    assert bucket.reserve(max_wait=1.5) is None      # der Token ist schon vergeben
+
+
+def test_token_bucket_adapts_to_quota_errors():
+    bucket = TokenBucket("test-aimd", rate_per_minute=60, burst=1, min_rate_per_minute=20)
+    bucket.penalize()
+    assert bucket.stats()["rate_per_minute"] == 30
+    bucket.penalize()
+    assert bucket.stats()["rate_per_minute"] == 20
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.stats()["rate_per_minute"] == 60
+
+
+def test_disabled_token_bucket_never_waits():
+    bucket = TokenBucket("test-off", rate_per_minute=0, burst=1)
+    assert all(bucket.reserve(max_wait=0) == 0 for _ in range(100))
@@ -0,0 +1,109 @@
+# Single-Flight: gleichzeitige identische Aufrufe -> genau ein echter Aufruf.
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_async_callers_share_one_call():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"tasks": ["a", "b"]}
+
+    async def main():
+        return await asyncio.gather(*[flights.do("urlaub", fetch) for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == {"tasks": ["a", "b"]} for result, _ in results)
+    # Mitläufer bekommen eine Kopie, nicht dasselbe Objekt
+    assert len({id(result) for result, _ in results}) == 5
+    assert flights.in_flight() == 0
+
+
+def test_async_error_reaches_every_caller():
+    flights = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*[flights.do("k", fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_async_cancelled_caller_does_not_cancel_the_others():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("k", fetch))
+        second = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == (42, True)
+    assert len(calls) == 1
+
+
+def test_async_call_is_cancelled_when_nobody_waits():
+    flights = AsyncSingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def main():
+        waiter = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert finished == []
+    assert flights.in_flight() == 0
+
+
+def test_threads_share_one_call():
+    flights = SingleFlight()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["a"]
+
+    def worker():
+        results.append(flights.do("k", fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flights.in_flight() == 0
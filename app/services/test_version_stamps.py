@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.models.base import Base
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.services.version_stamps import (
+    Stamp, board_scope, calendar_scope, is_not_modified, load_stamp, tasks_scope, touch, validators,
+)
+
+
+def make_session() -> Session:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return Session(engine)
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def versions(db, *scopes):
+    return load_stamp(db, *scopes).versions
+
+
+def seed(db):
+    user = User(username="anna", email="a@b.de", hashed_password="x")
+    db.add(user)
+    db.flush()
+    project = Project(title="P", owner_id=user.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="T", owner_id=user.id, project_id=project.id)
+    db.add(task)
+    db.commit()
+    return user.id, project.id, task
+
+
+def test_orm_writes_bump_affected_scopes():
+    db = make_session()
+    user_id, project_id, task = seed(db)
+    assert versions(db, board_scope(project_id), tasks_scope(user_id), calendar_scope(user_id)) == (1, 1, 1)
+
+    task.title = "T2"
+    db.commit()
+    assert versions(db, board_scope(project_id), tasks_scope(user_id), calendar_scope(user_id)) == (2, 2, 1)
+
+    db.delete(task)
+    db.commit()
+    assert versions(db, board_scope(project_id), tasks_scope(user_id)) == (3, 3)
+
+
+def test_moving_a_task_bumps_both_boards():
+    db = make_session()
+    user_id, project_id, task = seed(db)
+    other = Project(title="Q", owner_id=user_id)
+    db.add(other)
+    db.commit()
+
+    task.project_id = other.id
+    db.commit()
+
+    assert versions(db, board_scope(project_id), board_scope(other.id)) == (2, 1)
+
+
+def test_core_statements_need_touch_and_rollback_forgets():
+    db = make_session()
+    user_id, project_id, task = seed(db)
+
+    db.execute(delete(Task).where(Task.id == task.id))
+    touch(db, board_scope(project_id))
+    db.rollback()
+    db.commit()
+    assert versions(db, board_scope(project_id)) == (1,)
+
+    db.execute(delete(Task).where(Task.id == task.id))
+    touch(db, board_scope(project_id))
+    db.commit()
+    assert versions(db, board_scope(project_id)) == (2,)
+
+
+def test_unknown_scope_has_version_zero_and_no_date():
+    db = make_session()
+    assert load_stamp(db, board_scope(99)) == Stamp((0,), None)
+
+
+def test_etag_matches_only_same_stamp_and_variant():
+    stamp = Stamp((3,), None)
+    current = validators(stamp, "user-1")
+
+    assert is_not_modified(make_request(if_none_match=current.etag), current)
+    assert is_not_modified(make_request(if_none_match=f'"other", {current.etag}'), current)
+    assert not is_not_modified(make_request(if_none_match=validators(Stamp((4,), None), "user-1").etag), current)
+    assert not is_not_modified(make_request(if_none_match=validators(stamp, "user-2").etag), current)
+    assert not is_not_modified(make_request(), current)
+
+
+def test_last_modified_and_if_modified_since():
+    changed = datetime(2026, 3, 1, 12, 0, 0, 500000)
+    current = validators(Stamp((1,), changed))
+    assert current.headers()["Last-Modified"] == "Sun, 01 Mar 2026 12:00:00 GMT"
+
+    assert is_not_modified(make_request(if_modified_since="Sun, 01 Mar 2026 12:00:00 GMT"), current)
+    assert not is_not_modified(make_request(if_modified_since="Sun, 01 Mar 2026 11:59:59 GMT"), current)
+    # If-None-Match hat Vorrang
+    assert not is_not_modified(make_request(if_none_match='"x"', if_modified_since="Sun, 01 Mar 2026 12:00:00 GMT"),
+                               current)
+
+
+def test_change_in_current_second_sends_no_last_modified():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert validators(Stamp((1,), now)).last_modified is None
+    assert validators(Stamp((1,), now - timedelta(seconds=5))).last_modified is not None
@@ -0,0 +1,233 @@
+"""
+Versionsstempel für bedingte GETs (ETag / Last-Modified -> 304 Not Modified).
+
+Jeder Schreibzugriff auf Tasks, Projekte und KI-Jobs zählt in derselben
+Transaktion die betroffenen Stempel hoch:
+    board:<project_id>   Kanban-Board (Tasks, Projekt, KI-Job-Banner)
+    calendar:<user_id>   Startseite / Kalender (Projekte des Users)
+    tasks:<user_id>      GET /tasks/ (Tasks des Users)
+
+ORM-Änderungen (add/delete/Attribute) sammelt ein before_flush-Listener
+automatisch. Core-Statements an der Unit of Work vorbei (insert/update/delete,
+Query.delete) müssen die Scopes selbst per touch(db, ...) melden.
+Geschrieben wird einmal pro Commit (before_commit), ein Upsert für alle Scopes.
+
+Ein Request liest nur die Stempel-Zeile(n) per Primärschlüssel. Ist der ETag
+unverändert, gibt es 304 - ohne Task-Queries und ohne Template-Rendering.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.models.ai_job import AIJob
+from app.models.project import Project
+from app.models.task import Task
+from app.models.version_stamp import VersionStamp
+
+_PENDING = "version_stamp_scopes"
+
+# Clients müssen jedes Mal nachfragen (no-cache), dürfen die Antwort aber behalten
+CACHE_CONTROL = "private, no-cache"
+
+
+def board_scope(project_id: int) -> str:
+    return f"board:{project_id}"
+
+
+def calendar_scope(user_id: int) -> str:
+    return f"calendar:{user_id}"
+
+
+def tasks_scope(user_id: int) -> str:
+    return f"tasks:{user_id}"
+
+
+# =================================================================
+# Schreiben
+# =================================================================
+
+def _values(obj, attr: str) -> set:
+    """Aktueller und (bei Änderung) vorheriger Wert eines Attributs."""
+    history = inspect(obj).attrs[attr].history
+    values = {getattr(obj, attr)} | set(history.deleted)
+    values.discard(None)
+    return values
+
+
+def scopes_for(obj) -> set:
+    if isinstance(obj, Task):
+        return ({board_scope(pid) for pid in _values(obj, "project_id")}
+                | {tasks_scope(uid) for uid in _values(obj, "owner_id")})
+    if isinstance(obj, Project):
+        return ({board_scope(obj.id)} if obj.id is not None else set()) \
+               | {calendar_scope(uid) for uid in _values(obj, "owner_id")}
+    if isinstance(obj, AIJob):
+        return {board_scope(pid) for pid in _values(obj, "project_id")}
+    return set()
+
+
+def touch(session, *scopes: str):
+    """Scopes für den nächsten Commit vormerken (auch AsyncSession: .info ist dieselbe)."""
+    session.info.setdefault(_PENDING, set()).update(scope for scope in scopes if scope)
+
+
+def bump(connection, scopes: Iterable[str], now: Optional[datetime] = None):
+    """version += 1 für alle Scopes (fehlende Zeilen werden angelegt)."""
+    # Feste Reihenfolge -> keine Deadlocks zwischen parallelen Transaktionen (Postgres)
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    table = VersionStamp.__table__
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(connection.dialect.name)
+    if dialect is not None:
+        stmt = dialect.insert(table).values([{"scope": s, "version": 1, "updated_at": now} for s in scopes])
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.scope],
+            set_={"version": table.c.version + 1, "updated_at": now},
+        ))
+        return
+    # Andere Datenbanken: erst hochzählen, dann fehlende anlegen
+    connection.execute(update(table).where(table.c.scope.in_(scopes))
+                       .values(version=table.c.version + 1, updated_at=now))
+    existing = set(connection.execute(select(table.c.scope).where(table.c.scope.in_(scopes))).scalars())
+    missing = [{"scope": s, "version": 1, "updated_at": now} for s in scopes if s not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Nach einem Commit sind Attribute abgelaufen; ohne active_history kennt die History beim
+# Umhängen (Task in ein anderes Projekt) den alten Wert nicht -> altes Board bliebe stehen
+for _attr in (Task.project_id, Task.owner_id, Project.owner_id, AIJob.project_id):
+    event.listen(_attr, "set", _keep_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_scopes(session, flush_context, instances):
+    # Vor dem Flush: gelöschte Zeilen gibt es noch (abgelaufene Attribute lassen sich laden)
+    scopes = set()
+    for obj in session.new:
+        scopes |= scopes_for(obj)
+    for obj in session.deleted:
+        scopes |= scopes_for(obj)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            scopes |= scopes_for(obj)
+    if scopes:
+        touch(session, *scopes)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    # commit() flusht erst NACH before_commit - vorher selbst flushen, damit nichts fehlt
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    scopes = session.info.pop(_PENDING, None)
+    if scopes:
+        bump(session.connection(), scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_scopes(session):
+    session.info.pop(_PENDING, None)
+
+
+# =================================================================
+# Lesen + HTTP
+# =================================================================
+
+@dataclass(frozen=True)
+class Stamp:
+    versions: tuple
+    updated_at: Optional[datetime]   # None = noch nie geschrieben
+
+
+def _stamp_query(scopes: tuple):
+    return select(VersionStamp.scope, VersionStamp.version, VersionStamp.updated_at) \
+        .where(VersionStamp.scope.in_(scopes))
+
+
+def _to_stamp(scopes: tuple, rows) -> Stamp:
+    found = {row.scope: row for row in rows}
+    versions = tuple(found[s].version if s in found else 0 for s in scopes)
+    times = [found[s].updated_at for s in scopes if s in found]
+    return Stamp(versions, max(times) if len(times) == len(scopes) else None)
+
+
+def load_stamp(db: Session, *scopes: str) -> Stamp:
+    return _to_stamp(scopes, db.execute(_stamp_query(scopes)))
+
+
+async def load_stamp_async(db, *scopes: str) -> Stamp:
+    return _to_stamp(scopes, await db.execute(_stamp_query(scopes)))
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime]   # UTC, auf Sekunden abgerundet
+    vary: str
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL, "Vary": self.vary}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+
+def validators(stamp: Stamp, *variant, vary: str = "Cookie", not_before: Optional[datetime] = None) -> Validators:
+    """
+    variant: alles außer den Daten, wovon die Antwort abhängt (User, Query-String,
+    Template-Version, ...). not_before: frühester Last-Modified-Zeitpunkt (UTC),
+    z.B. Tageswechsel, wenn die Seite "heute" markiert.
+    """
+    key = "|".join(str(part) for part in (*stamp.versions, *variant))
+    etag = '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+    last_modified = stamp.updated_at
+    if last_modified is not None and not_before is not None:
+        last_modified = max(last_modified, not_before)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+        # Noch in dieser Sekunde geändert? Dann ist die Sekunde kein sicherer Validator
+        # (eine zweite Änderung in derselben Sekunde wäre unsichtbar) -> nur ETag
+        if last_modified >= datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0):
+            last_modified = None
+    return Validators(etag, last_modified, vary)
+
+
+def is_not_modified(request: Request, current: Validators) -> bool:
+    """
+    If-None-Match hat Vorrang und vergleicht schwach (W/ zählt nicht - die Komprimierung
+    macht aus dem ETag einen schwachen); If-Modified-Since nur ohne If-None-Match (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or current.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and current.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return current.last_modified <= since.astimezone(timezone.utc).replace(tzinfo=None)
+    return False
+
+
+def not_modified(current: Validators) -> Response:
+    return Response(status_code=304, headers=current.headers())
@@ -0,0 +1,411 @@
+"""
+Serverseitige Sessions: im Cookie steht nur noch eine kurze, signierte
+Session-ID ("<id>.<signatur>", ~70 Bytes), die Daten (z.B. das komplette
+Auth0-userinfo) liegen im Store.
+
+Ersetzt Starlette's SessionMiddleware, request.session bleibt ein dict:
+- Store (settings.session_backend):
+    "sqlite" (Standard): lokale Datei, Sessions überleben einen Neustart
+    "redis":  für mehrere Hosts, braucht das Paket redis + REDIS_URL
+    "memory": nur im Prozess (Tests, ein Worker), LRU mit session_cache_size
+- Vor SQLite/Redis sitzt ein kleiner TTL/LRU-Cache im Prozess; ein Treffer
+  kostet weder I/O noch HMAC über die Daten noch JSON.
+  Achtung: mit mehreren Workern sieht ein anderer Worker eine Änderung
+  (z.B. Logout) erst nach session_cache_ttl_seconds (Standard 5 s).
+- Gespeichert wird nur, wenn sich die Session geändert hat (Zuweisungen auf
+  oberster Ebene: session["x"] = ..., pop, clear). Verschachtelte Änderungen
+  (session["user"]["name"] = ...) bitte als neue Zuweisung schreiben.
+- Beim Login (neuer Wert unter "user") gibt es eine neue ID (Session Fixation).
+- Ablauf gleitend: max_age nach der letzten Verlängerung, verlängert wird
+  höchstens einmal pro SESSION_REFRESH_SECONDS. Dabei ändert sich nur der
+  Ablauf (touch), die Daten werden nicht neu geschrieben - ein gleichzeitiger
+  Logout in einem anderen Request bleibt also bestehen.
+"""
+import asyncio
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import itsdangerous
+from cachetools import TTLCache
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+
+SESSION_LOOKUPS = metrics.counter("session_lookups_total", "Session lookups by result", ["result"])
+SESSION_WRITES = metrics.counter("session_writes_total", "Session store writes", ["op"])
+
+# Ablauf höchstens so oft verlängern (sonst wäre jeder Request ein Schreibzugriff)
+SESSION_REFRESH_SECONDS = 24 * 3600
+# Ein neuer Wert unter diesen Keys = Login -> neue Session-ID
+SESSION_ROTATE_KEYS = ("user",)
+
+Entry = Tuple[dict, float]   # (Daten, expires_at)
+
+
+def _changed(method):
+    """dict-Methode, die die Session als geändert markiert."""
+    def wrapper(self, *args, **kwargs):
+        self.modified = True
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class Session(dict):
+    """dict, das sich Änderungen auf oberster Ebene merkt."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+    clear = _changed(dict.clear)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    setdefault = _changed(dict.setdefault)
+    update = _changed(dict.update)
+
+
+# =================================================================
+# Stores
+# =================================================================
+
+class SessionStore:
+    def get(self, sid: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(self, sid: str, data: dict, expires_at: float):
+        raise NotImplementedError
+
+    def touch(self, sid: str, expires_at: float) -> bool:
+        """Nur den Ablauf verschieben; False, wenn es die Session nicht (mehr) gibt."""
+        raise NotImplementedError
+
+    def delete(self, sid: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """Nur im Prozess; bei mehr als max_size Sessions fliegt die älteste raus."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+
+    def get(self, sid: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return entry
+
+    def set(self, sid: str, data: dict, expires_at: float):
+        with self._lock:
+            self._entries[sid] = (data, expires_at)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def touch(self, sid: str, expires_at: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return False
+            self._entries[sid] = (entry[0], expires_at)
+            return True
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_size": self.max_size}
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.purge_expired()
+
+    def get(self, sid: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, sid: str, data: dict, expires_at: float):
+        encoded = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)", (sid, encoded, expires_at)
+            )
+
+    def touch(self, sid: str, expires_at: float) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "UPDATE sessions SET expires_at = ? WHERE sid = ? AND expires_at > ?", (expires_at, sid, time.time())
+            ).rowcount > 0
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"path": self.path, "entries": entries}
+
+
+class RedisSessionStore(SessionStore):
+    """Ein Key pro Session ("session:<id>"), Ablauf über das TTL von Redis."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("session_backend='redis' braucht das Paket 'redis' (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, sid: str) -> str:
+        return f"session:{sid}"
+
+    def get(self, sid: str) -> Optional[Entry]:
+        # Ablauf aus dem TTL des Keys (touch ändert nur das TTL, nicht den Wert)
+        value, ttl = self._redis.pipeline().get(self._key(sid)).pttl(self._key(sid)).execute()
+        if value is None:
+            return None
+        entry = json.loads(value)
+        return entry["data"], (time.time() + ttl / 1000 if ttl > 0 else entry["expires_at"])
+
+    def set(self, sid: str, data: dict, expires_at: float):
+        ttl = max(1, int(expires_at - time.time()))
+        self._redis.set(self._key(sid), json.dumps({"data": data, "expires_at": expires_at}), ex=ttl)
+
+    def touch(self, sid: str, expires_at: float) -> bool:
+        return bool(self._redis.expire(self._key(sid), max(1, int(expires_at - time.time()))))
+
+    def delete(self, sid: str):
+        self._redis.delete(self._key(sid))
+
+
+class CachedSessionStore(SessionStore):
+    """TTL/LRU-Cache im Prozess vor einem langsameren Store."""
+
+    def __init__(self, store: SessionStore, max_size: int, ttl: float):
+        self.store = store
+        self._lock = threading.Lock()
+        self._cache = TTLCache(maxsize=max_size, ttl=ttl)
+
+    def cached(self, sid: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._cache.get(sid)
+        if entry is not None and entry[1] <= time.time():
+            return None
+        return entry
+
+    def get(self, sid: str) -> Optional[Entry]:
+        entry = self.cached(sid)
+        if entry is not None:
+            SESSION_LOOKUPS.inc(result="hit_memory")
+            return entry
+        entry = self.store.get(sid)
+        SESSION_LOOKUPS.inc(result="hit_store" if entry else "miss")
+        if entry is not None:
+            with self._lock:
+                self._cache[sid] = entry
+        return entry
+
+    def set(self, sid: str, data: dict, expires_at: float):
+        self.store.set(sid, data, expires_at)
+        with self._lock:
+            self._cache[sid] = (data, expires_at)
+
+    def touch(self, sid: str, expires_at: float) -> bool:
+        touched = self.store.touch(sid, expires_at)
+        with self._lock:
+            entry = self._cache.pop(sid, None)
+            if touched and entry is not None:
+                self._cache[sid] = (entry[0], expires_at)
+        return touched
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._cache.pop(sid, None)
+        self.store.delete(sid)
+
+    def stats(self) -> dict:
+        with self._lock:
+            cached = len(self._cache)
+        return {**self.store.stats(), "cached": cached, "cache_max_size": self._cache.maxsize,
+                "cache_ttl_seconds": self._cache.ttl}
+
+
+def build_session_store(name: str) -> SessionStore:
+    from app.config import settings
+
+    if name == "memory":
+        return MemorySessionStore(max_size=settings.session_cache_size)
+    if name == "sqlite":
+        store = SQLiteSessionStore(settings.session_store_path)
+    elif name == "redis":
+        if not settings.redis_url:
+            raise ValueError("session_backend='redis' braucht REDIS_URL")
+        store = RedisSessionStore(settings.redis_url)
+    else:
+        raise ValueError(f"Unknown session backend: {name!r} (expected 'memory', 'sqlite' or 'redis')")
+    return CachedSessionStore(store, max_size=settings.session_cache_size, ttl=settings.session_cache_ttl_seconds)
+
+
+# =================================================================
+# Middleware
+# =================================================================
+
+def session_signer(secret_key: str) -> itsdangerous.Signer:
+    return itsdangerous.Signer(secret_key, salt="session-id")
+
+
+def create_session(store: SessionStore, secret_key: str, data: dict, max_age: int) -> str:
+    """Session direkt im Store anlegen und den Cookie-Wert zurückgeben (Tests, Benchmarks)."""
+    sid = secrets.token_urlsafe(24)
+    store.set(sid, dict(data), time.time() + max_age)
+    return session_signer(secret_key).sign(sid).decode("utf-8")
+
+
+class ServerSessionMiddleware:
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: SessionStore,
+            secret_key: str,
+            session_cookie: str = "session",
+            max_age: int = 14 * 24 * 3600,
+            path: str = "/",
+            same_site: str = "lax",
+            https_only: bool = False,
+    ):
+        self.app = app
+        self.store = store
+        self.signer = session_signer(secret_key)
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site + ("; secure" if https_only else "")
+
+    # --- ID + Cookie ---
+
+    def new_session_id(self) -> str:
+        return secrets.token_urlsafe(24)
+
+    def cookie_value(self, sid: str) -> str:
+        return self.signer.sign(sid).decode("utf-8")
+
+    def _session_id(self, cookie: Optional[str]) -> Optional[str]:
+        if not cookie:
+            return None
+        try:
+            return self.signer.unsign(cookie).decode("utf-8")
+        except itsdangerous.BadSignature:
+            return None   # z.B. noch ein altes Starlette-Cookie -> neu anmelden
+
+    def _set_cookie(self, message: Message, sid: Optional[str]):
+        headers = MutableHeaders(scope=message)
+        if sid is None:
+            value = f"{self.session_cookie}=null; path={self.path}; expires=Thu, 01 Jan 1970 00:00:00 GMT; "
+        else:
+            value = f"{self.session_cookie}={self.cookie_value(sid)}; path={self.path}; Max-Age={self.max_age}; "
+        headers.append("Set-Cookie", value + self.security_flags)
+
+    # --- Store (Cache-Treffer direkt, sonst in einen Thread) ---
+
+    async def _load(self, sid: str) -> Optional[Entry]:
+        if isinstance(self.store, MemorySessionStore):
+            return self.store.get(sid)
+        if isinstance(self.store, CachedSessionStore):
+            entry = self.store.cached(sid)
+            if entry is not None:
+                SESSION_LOOKUPS.inc(result="hit_memory")
+                return entry
+        return await asyncio.to_thread(self.store.get, sid)
+
+    async def _call_store(self, method, *args):
+        if isinstance(self.store, MemorySessionStore):
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    # --- ASGI ---
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        sid = self._session_id(HTTPConnection(scope).cookies.get(self.session_cookie))
+        entry = await self._load(sid) if sid else None
+        if entry is None:
+            sid, expires_at = None, 0.0
+            scope["session"] = Session()
+        else:
+            data, expires_at = entry
+            # Flache Kopie: Änderungen dieses Requests landen nicht ungefragt im Cache
+            scope["session"] = Session(data)
+        initial = {key: scope["session"].get(key) for key in SESSION_ROTATE_KEYS}
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                await self._persist(message, scope["session"], sid, expires_at, initial)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _persist(self, message: Message, session: Session, sid: Optional[str], expires_at: float,
+                       initial: dict):
+        now = time.time()
+        if session.modified:
+            if not session:
+                if sid is not None:
+                    await self._call_store(self.store.delete, sid)
+                    SESSION_WRITES.inc(op="delete")
+                    self._set_cookie(message, None)
+                return
+            if sid is not None and any(session.get(key) != value for key, value in initial.items()):
+                # Login/Benutzerwechsel: alte ID verwerfen
+                await self._call_store(self.store.delete, sid)
+                sid = None
+            sid = sid or self.new_session_id()
+            await self._call_store(self.store.set, sid, dict(session), now + self.max_age)
+            SESSION_WRITES.inc(op="set")
+            self._set_cookie(message, sid)
+        elif sid is not None and expires_at - now < self.max_age - SESSION_REFRESH_SECONDS:
+            # Unverändert, aber länger nicht verlängert -> nur den Ablauf nach hinten schieben
+            if await self._call_store(self.store.touch, sid, now + self.max_age):
+                SESSION_WRITES.inc(op="refresh")
+                self._set_cookie(message, sid)
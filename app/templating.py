@@ -0,0 +1,61 @@
+"""
+Gemeinsame Jinja2-Umgebung für alle HTML-Routen (views, project_routes,
+task_routes) und die Board-Events (board_feed).
+
+Jinja2 hält kompilierte Templates im Speicher (cache_size). Mit auto_reload
+wird trotzdem bei jedem Render das mtime der Datei geprüft - das ist nur in
+der Entwicklung nötig (TEMPLATES_AUTO_RELOAD=true). warm_templates() kompiliert
+beim Start alles vor, damit der erste Request nicht dafür bezahlt.
+
+Fragment-Modus: schickt der Client den Header "X-Fragment: 1", antworten die
+Task-Routen statt mit einem Redirect aufs ganze Board nur mit der betroffenen
+Karte (partials/task_card.html).
+"""
+import hashlib
+from functools import lru_cache
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader
+from starlette.requests import Request
+from starlette.responses import HTMLResponse
+
+from app.config import settings
+
+TEMPLATE_DIR = "app/templates"
+FRAGMENT_HEADER = "x-fragment"
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=settings.templates_auto_reload,
+    cache_size=settings.templates_cache_size,
+)
+templates = Jinja2Templates(env=env)
+
+
+def warm_templates() -> int:
+    """Alle Templates einmal kompilieren (landen im Cache der Umgebung)."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+@lru_cache(maxsize=1)
+def template_fingerprint() -> str:
+    """Hash über alle Template-Quellen: neues Deployment mit geänderten Templates -> neue ETags."""
+    digest = hashlib.sha256()
+    for name in sorted(env.list_templates(extensions=["html"])):
+        digest.update(name.encode("utf-8"))
+        digest.update(env.loader.get_source(env, name)[0].encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def wants_fragment(request: Request) -> bool:
+    return request.headers.get(FRAGMENT_HEADER) == "1"
+
+
+def render_fragment(name: str, status_code: int = 200, headers: Optional[dict] = None, **context) -> HTMLResponse:
+    """Ein Partial ohne Request-Kontext rendern (kein base.html, keine Board-Queries)."""
+    return HTMLResponse(env.get_template(name).render(**context), status_code=status_code, headers=headers)
@@ -0,0 +1,22 @@
+# Start-Check: schwere Abhängigkeiten (Gemini-SDK, Authlib) dürfen erst bei
+# der ersten Nutzung geladen werden, nicht schon beim Import von main.
+
+from app.check_startup import eagerly_loaded, startup_profile
+
+
+def test_eagerly_loaded_matches_submodules():
+    assert eagerly_loaded(["grpc._channel", "authlibx", "fastapi"]) == ["grpc"]
+
+
+def test_app_starts_without_lazy_modules(tmp_path, monkeypatch):
+    for key, value in {
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+        "JWT_SECRET_KEY": "test", "AUTH0_DOMAIN": "example.invalid", "AUTH0_CLIENT_ID": "test",
+        "AUTH0_CLIENT_SECRET": "test", "APP_SECRET_KEY": "test", "AI_CACHE_PATH": "",
+    }.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+
+    startup = startup_profile()
+
+    assert eagerly_loaded(startup["loaded"]) == []
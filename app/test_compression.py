@@ -0,0 +1,71 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, choose_encoding
+
+BIG = "x" * 5000
+
+
+def make_client() -> TestClient:
+    async def big(request):
+        return PlainTextResponse(BIG, headers={"ETag": '"abc"'})
+
+    async def small(request):
+        return PlainTextResponse("klein")
+
+    async def events(request):
+        return StreamingResponse(iter(["data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    async def stream(request):
+        return StreamingResponse(iter([f"zeile {i}\n" for i in range(1000)]), media_type="text/csv")
+
+    async def encoded(request):
+        return Response(gzip.compress(BIG.encode()), headers={"Content-Encoding": "gzip"})
+
+    app = Starlette(routes=[Route("/big", big), Route("/small", small), Route("/events", events),
+                            Route("/stream", stream), Route("/encoded", encoded)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_choose_encoding_respects_q_values(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("identity") is None
+
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_large_response_is_gzipped_with_weak_etag():
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.text == BIG
+
+
+def test_small_sse_and_encoded_responses_pass_through():
+    client = make_client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.text == BIG
+
+
+def test_streamed_response_is_compressed_in_chunks():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"zeile {i}\n" for i in range(1000))
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.security import HashingOverloaded, PasswordHasher, build_crypt_context, password_hasher
+
+
+class BlockingContext:
+    """Hasht erst, wenn release gesetzt ist - hält die Pool-Slots belegt."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.release.wait(5)
+        return "hash:" + password
+
+
+def test_full_queue_rejects_immediately_and_frees_slots():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, workers=1, max_queue=1)
+
+    async def scenario():
+        running = [asyncio.ensure_future(hasher.hash_async("a")), asyncio.ensure_future(hasher.hash_async("b"))]
+        await asyncio.sleep(0)
+        assert hasher.pending == 2
+        with pytest.raises(HashingOverloaded):
+            await hasher.hash_async("c")
+
+        context.release.set()
+        assert await asyncio.gather(*running) == ["hash:a", "hash:b"]
+        assert hasher.pending == 0
+        assert await hasher.hash_async("d") == "hash:d"
+
+    asyncio.run(scenario())
+
+
+def test_login_answers_503_when_hashing_is_overloaded(client, monkeypatch):
+    async def overloaded(*args):
+        raise HashingOverloaded("full")
+
+    with SessionLocal() as db:
+        db.add(User(username="busy", email="busy@example.com", hashed_password="x"))
+        db.commit()
+    monkeypatch.setattr(password_hasher, "verify_and_update_async", overloaded)
+
+    response = client.post("/auth/login", data={"username": "busy@example.com", "password": "pw"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_login_upgrades_outdated_hash(client, monkeypatch):
+    old_hash = build_crypt_context("bcrypt", 4).hash("geheim")
+    with SessionLocal() as db:
+        db.add(User(username="rehash", email="rehash@example.com", hashed_password=old_hash))
+        db.commit()
+    monkeypatch.setattr(password_hasher, "context", build_crypt_context("bcrypt", 5))
+
+    response = client.post("/auth/login", data={"username": "rehash@example.com", "password": "geheim"})
+    assert response.status_code == 200
+
+    with SessionLocal() as db:
+        new_hash = db.query(User).filter(User.email == "rehash@example.com").one().hashed_password
+    assert new_hash != old_hash and new_hash.startswith("$2b$05$")
+    assert password_hasher.verify_and_update("geheim", new_hash) == (True, None)
@@ -0,0 +1,137 @@
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.sessions import (CachedSessionStore, MemorySessionStore, ServerSessionMiddleware, SQLiteSessionStore,
+                          create_session)
+
+SECRET = "test-secret"
+
+
+def make_client(store) -> TestClient:
+    async def login(request):
+        request.session["user"] = {"email": request.query_params["email"], "picture": "x" * 2000}
+        return JSONResponse({})
+
+    async def me(request):
+        return JSONResponse(dict(request.session))
+
+    async def logout(request):
+        request.session.clear()
+        return JSONResponse({})
+
+    app = Starlette(routes=[Route("/login", login), Route("/me", me), Route("/logout", logout)])
+    app.add_middleware(ServerSessionMiddleware, store=store, secret_key=SECRET)
+    return TestClient(app)
+
+
+def test_session_roundtrip_keeps_cookie_small():
+    store = MemorySessionStore(max_size=10)
+    client = make_client(store)
+    response = client.get("/login", params={"email": "a@b.de"})
+    assert len(response.cookies["session"]) < 100
+    assert client.get("/me").json()["user"]["email"] == "a@b.de"
+
+    # Lesen ohne Änderung setzt kein neues Cookie
+    assert "set-cookie" not in client.get("/me").headers
+
+    client.get("/logout")
+    assert client.get("/me").json() == {}
+    assert store.stats()["entries"] == 0
+
+
+def test_anonymous_requests_store_nothing():
+    store = MemorySessionStore(max_size=10)
+    response = make_client(store).get("/me")
+    assert "set-cookie" not in response.headers
+    assert store.stats()["entries"] == 0
+
+
+def test_forged_or_unknown_session_id_is_ignored():
+    store = MemorySessionStore(max_size=10)
+    client = make_client(store)
+    client.cookies.set("session", "erfunden.signatur")
+    assert client.get("/me").json() == {}
+    client.cookies.set("session", create_session(store, "anderes-secret", {"user": {"email": "x"}}, 60))
+    assert client.get("/me").json() == {}
+
+
+def test_login_rotates_session_id():
+    store = MemorySessionStore(max_size=10)
+    client = make_client(store)
+    first = client.get("/login", params={"email": "a@b.de"}).cookies["session"]
+    second = client.get("/login", params={"email": "c@d.de"}).cookies["session"]
+    assert first != second
+    assert store.stats()["entries"] == 1
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_size=2)
+    store.set("a", {"n": 1}, 2e9)
+    store.set("b", {"n": 2}, 2e9)
+    store.get("a")
+    store.set("c", {"n": 3}, 2e9)
+    assert store.get("b") is None
+    assert store.get("a") is not None
+
+
+def test_sqlite_store_behind_cache(tmp_path):
+    sqlite_store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    cookie = create_session(CachedSessionStore(sqlite_store, max_size=10, ttl=60), SECRET,
+                            {"user": {"email": "a@b.de"}}, 60)
+    # Neuer Prozess = leerer Cache, Session kommt aus der Datei
+    client = make_client(CachedSessionStore(sqlite_store, max_size=10, ttl=60))
+    client.cookies.set("session", cookie)
+    assert client.get("/me").json()["user"]["email"] == "a@b.de"
+    sqlite_store.set("alt", {}, 1.0)
+    assert sqlite_store.purge_expired() == 1
+
+
+def test_refresh_only_moves_the_expiry(tmp_path):
+    sqlite_store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    cookie = create_session(sqlite_store, SECRET, {"user": {"email": "a@b.de"}}, 60)
+    sid = cookie.rsplit(".", 1)[0]
+    client = make_client(CachedSessionStore(sqlite_store, max_size=10, ttl=60))
+    client.cookies.set("session", cookie)
+
+    response = client.get("/me")
+    assert response.json()["user"]["email"] == "a@b.de"
+    assert response.cookies["session"] == cookie
+    data, expires_at = sqlite_store.get(sid)
+    assert data == {"user": {"email": "a@b.de"}} and expires_at > time.time() + 3600
+
+
+def test_refresh_does_not_undo_a_concurrent_logout(tmp_path):
+    sqlite_store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    cookie = create_session(sqlite_store, SECRET, {"user": {"email": "a@b.de"}}, 60)
+    sid = cookie.rsplit(".", 1)[0]
+
+    async def me_while_logging_out(request):
+        # Logout in einem anderen Worker, während dieser Request läuft
+        sqlite_store.delete(sid)
+        return JSONResponse(dict(request.session))
+
+    app = Starlette(routes=[Route("/me", me_while_logging_out)])
+    app.add_middleware(ServerSessionMiddleware, store=sqlite_store, secret_key=SECRET)
+    client = TestClient(app)
+    client.cookies.set("session", cookie)
+
+    response = client.get("/me")
+    assert response.json()["user"]["email"] == "a@b.de"
+    assert "set-cookie" not in response.headers
+    assert sqlite_store.get(sid) is None
+
+
+def test_touch_keeps_data_and_ignores_missing_sessions(tmp_path):
+    sqlite_store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    for store in (MemorySessionStore(max_size=10), CachedSessionStore(sqlite_store, max_size=10, ttl=60)):
+        store.set("a", {"n": 1}, time.time() + 60)
+        assert store.touch("a", 2e9) is True
+        assert store.get("a") == ({"n": 1}, 2e9)
+        store.delete("a")
+        assert store.touch("a", 2e9) is False
+        assert store.get("a") is None
+
@@ -1,10 +1,3 @@
-from passlib.context import CryptContext
-
-# Wir nutzen bcrypt zum Verschlüsseln – das ist der Industriestandard
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str):
-    return pwd_context.hash(password)
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+# Hashing liegt jetzt zentral in app/security.py (ein CryptContext, eigener Thread-Pool).
+# Die Namen hier bleiben für bestehende Importe erhalten.
+from app.security import pwd_context, hash_password, verify_password
@@ -0,0 +1,82 @@
+# Test-Defaults für die Pflicht-Settings, bevor irgendein Test app.config importiert
+# (eigene Umgebungsvariablen gewinnen). Datenbank, KI-Cache und Sessions bleiben temporär.
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="tests_")
+for _key, _value in {
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    "JWT_SECRET_KEY": "test",
+    "AUTH0_DOMAIN": "example.invalid",
+    "AUTH0_CLIENT_ID": "test",
+    "AUTH0_CLIENT_SECRET": "test",
+    "APP_SECRET_KEY": "test",
+    "AI_PROVIDER": "offline",
+    "AI_OFFLINE_LATENCY_MS": "0",
+    "AI_OFFLINE_JITTER_MS": "0",
+    "AI_CACHE_PATH": "",
+    "SESSION_BACKEND": "memory",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import itertools  # noqa: E402
+
+import pytest  # noqa: E402
+
+_user_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app_started():
+    """Startet die App einmal pro Testlauf (Lifespan legt die Tabellen an)."""
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app):
+        yield main.app
+
+
+@pytest.fixture
+def client(app_started):
+    from fastapi.testclient import TestClient
+
+    return TestClient(app_started)
+
+
+@pytest.fixture
+def make_user(app_started):
+    """Legt einen (Auth0-)User an und gibt (id, email) zurück."""
+    from app.database import SessionLocal
+    from app.models.user import User
+
+    def make():
+        n = next(_user_numbers)
+        with SessionLocal() as db:
+            user = User(email=f"user{n}@example.com", username=f"user{n}", hashed_password="AUTH0_EXTERNAL_LOGIN")
+            db.add(user)
+            db.commit()
+            return user.id, user.email
+    return make
+
+
+@pytest.fixture
+def login(app_started):
+    """Session-Login wie nach dem Auth0-Callback: login(client, email)."""
+    import main
+    from app.config import settings
+    from app.sessions import create_session
+
+    def set_cookie(test_client, email):
+        test_client.cookies.clear()
+        test_client.cookies.set("session", create_session(
+            main.session_store, settings.app_secret_key, {"user": {"email": email}}, 3600))
+        return test_client
+    return set_cookie
+
+
+@pytest.fixture
+def bearer(app_started):
+    """Authorization-Header für die JSON-API: bearer(user_id)."""
+    from app.oauth2 import create_access_token
+
+    return lambda user_id: {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
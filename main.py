@@ -1,15 +1,22 @@
 from fastapi import FastAPI
-from app.database import init_db
+from app.database import init_db, async_engine
 from contextlib import asynccontextmanager # <--- NEU
 from app.routes import project_routes
 from app.routes import user_routes
 from app.routes import task_routes
 from app.routes import ai_routes
 from app.routes import auth
-from starlette.middleware.sessions import SessionMiddleware
 from app.config import settings
 from app.routes import web_auth
 from app.routes import views
+from app.routes import internal_routes
+from app.routes import export_routes
+from app.routes import job_routes
+from app.services.ai_jobs import ai_job_runner
+from app.templating import warm_templates
+from app.responses import FastJSONResponse
+from app.compression import CompressionMiddleware
+from app.sessions import ServerSessionMiddleware, build_session_store
 
 
 # 1. Der neue "Lifespan" Manager (ersetzt startup event)
@@ -17,13 +24,30 @@ from app.routes import views
 async def lifespan(app: FastAPI):
     # Was hier steht, passiert VOR dem Start
     init_db()
+    print(f"🧩 {warm_templates()} Templates vorkompiliert")
+    await ai_job_runner.start()
     yield
-    # Was hier stünde, passiert NACH dem Stoppen (brauchen wir gerade nicht)
+    # Was hier steht, passiert NACH dem Stoppen: KI-Worker anhalten, Async-Verbindungen sauber schließen
+    await ai_job_runner.stop()
+    await async_engine.dispose()
 
 # 2. Wir übergeben lifespan an die App
 # app = FastAPI(lifespan=lifespan)
-app = FastAPI(title="Smart Task Manager V2", lifespan=lifespan)
-app.add_middleware(SessionMiddleware, secret_key=settings.app_secret_key)
+app = FastAPI(title="Smart Task Manager V2", lifespan=lifespan, default_response_class=FastJSONResponse)
+# Sessions serverseitig: im Cookie steht nur eine kurze signierte ID
+session_store = build_session_store(settings.session_backend)
+app.add_middleware(
+    ServerSessionMiddleware,
+    store=session_store,
+    secret_key=settings.app_secret_key,
+    max_age=settings.session_max_age_seconds,
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
 # 3. Router einbinden
 app.include_router(user_routes.router)
 app.include_router(project_routes.router)
@@ -32,6 +56,9 @@ app.include_router(ai_routes.router)
 app.include_router(auth.router)
 app.include_router(web_auth.router)
 app.include_router(views.router)
+app.include_router(export_routes.router)
+app.include_router(job_routes.router)
+app.include_router(internal_routes.router)
 
 #@app.get("/")
 #def read_root():
@@ -1,9 +1,13 @@
-from app.services.ai_services import analyze_task_with_ai
+# Manueller Test gegen die echte Gemini-API: python test_ai_manual.py
+# (kein pytest-Test -> beim Einsammeln durch pytest passiert nichts)
 
-text = "Nächste Woche unbedingt Mama anrufen wegen Geburtstag"
-print(f"🤖 Frage Gemini: {text}")
+if __name__ == "__main__":
+    from app.services.ai_services import analyze_task_with_ai
 
-ergebnis = analyze_task_with_ai(text)
+    text = "Nächste Woche unbedingt Mama anrufen wegen Geburtstag"
+    print(f"🤖 Frage Gemini: {text}")
 
-print("\n📦 Ergebnis:")
-print(ergebnis)
+    ergebnis = analyze_task_with_ai(text)
+
+    print("\n📦 Ergebnis:")
+    print(ergebnis)